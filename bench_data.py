@@ -0,0 +1,364 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from scoring import VIDEO_BUCKET_EDGES, VIDEO_BUCKETS
+
+
+# =====================================================
+# 벤치마크 로딩 레이어 (Streamlit 없이 import 가능)
+# - 인코딩은 파일당 한 번만 감지
+# - 파싱 결과는 디스크 스냅샷에 (mtime, sha256) 키로 보관
+#   → 콜드 스타트에서도 CSV 파싱을 건너뜀
+# =====================================================
+VIEW_FILE = "online viewing.csv"
+USAGE_FILE = "daily_usage.csv"
+REQUIRED_BENCH_FILES = [VIEW_FILE, USAGE_FILE]
+GRADE_FILE = "youth_digital_wellbeing_apps_cleaned.csv"  # 선택 파일(없으면 학년 위험군 카드 생략)
+
+SNAPSHOT_FILE = ".bench_snapshot.json"
+SNAPSHOT_VERSION = 2
+
+ENCODINGS = ["utf-8-sig", "utf-8", "cp949"]
+SNIFF_BYTES = 1 << 20   # 스트리밍 읽기 때 인코딩 판정에 쓰는 앞부분 크기
+
+# 시청 분포 구간 경계(분). 마지막 "6시간 이상" 구간의 상한은 슬라이더 최대값(600분)으로 가정
+VIEW_MAX_MIN = 600
+VIEW_BIN_EDGES = [0] + VIDEO_BUCKET_EDGES + [VIEW_MAX_MIN]
+
+
+# =====================================================
+# 유틸: 인코딩 감지 / CSV 읽기
+# =====================================================
+def detect_encoding(raw: bytes, path: str = "") -> str:
+    """바이트를 한 번만 디코딩해 보고 첫 번째로 성공한 인코딩을 돌려줌"""
+    for enc in ENCODINGS:
+        try:
+            raw.decode(enc)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"CSV 인코딩을 읽지 못했어요: {path}")
+
+def sniff_encoding(path: str, size: int = SNIFF_BYTES) -> str:
+    """큰 파일용: 앞부분만 읽어서 인코딩 판정(마지막 줄은 잘렸을 수 있어 버림)"""
+    with open(path, "rb") as f:
+        raw = f.read(size)
+        if f.read(1):
+            raw = raw[: raw.rfind(b"\n") + 1] or raw
+    return detect_encoding(raw, path)
+
+def read_csv_best_effort(path: str, encoding: str | None = None) -> pd.DataFrame:
+    try:
+        if encoding is None:
+            with open(path, "rb") as f:
+                encoding = detect_encoding(f.read(), path)
+        return pd.read_csv(path, encoding=encoding)
+    except ValueError:
+        raise
+    except Exception:
+        raise ValueError(f"CSV 인코딩을 읽지 못했어요: {path}")
+
+def bench_mtimes(paths: list[str] = REQUIRED_BENCH_FILES) -> tuple:
+    """캐시 키용: (경로, mtime_ns, 크기) 튜플 — stat만 하므로 매 rerun 호출해도 가벼움"""
+    out = []
+    for p in paths:
+        st_ = os.stat(p)
+        out.append((p, st_.st_mtime_ns, st_.st_size))
+    return tuple(out)
+
+
+# =====================================================
+# 벤치마크 파싱 (화면에 “공공데이터”라는 말은 안 씀)
+# =====================================================
+def parse_viewing_distribution(df: pd.DataFrame) -> dict:
+    """
+    online viewing.csv:
+    - 0행에 구간 라벨
+    - 전체/소계/소계 행의 2022 분포(%) 사용
+    """
+    bins = list(df.iloc[0, 3:9].astype(str).values)
+    mask = (df["응답자특성별(1)"] == "전체") & (df["응답자특성별(2)"] == "소계") & (df["응답자특성별(3)"] == "소계")
+    row = df[mask]
+    if row.empty:
+        row = df.iloc[[1]]
+    vals = row.iloc[0, 3:9].astype(float).values
+    return dict(zip(bins, vals))
+
+def parse_study_share(df: pd.DataFrame) -> tuple[float, float]:
+    """
+    daily_usage.csv:
+    전체/소계/소계 행의 평균(%)
+    - 2022.5: 학습 목적 평균(%)
+    - 2022.11: 비학습 목적 평균(%)
+    """
+    mask = (df["응답자특성별(1)"] == "전체") & (df["응답자특성별(2)"] == "소계") & (df["응답자특성별(3)"] == "소계")
+    row = df[mask]
+    if row.empty:
+        row = df.iloc[[2]]
+    study_mean = float(row.iloc[0]["2022.5"])
+    nonstudy_mean = float(row.iloc[0]["2022.11"])
+    return study_mean, nonstudy_mean
+
+
+# =====================================================
+# 응답자 특성별 세그먼트 인덱스
+# - 두 CSV의 모든 행을 (응답자특성별(1), (2), (3)) 키로 한 번만 파싱
+# - 조회는 dict 키 조회(O(1)), 프로필 → 가장 가까운 또래 그룹은 resolve_segment
+# =====================================================
+SEGMENT_COLS = ["응답자특성별(1)", "응답자특성별(2)", "응답자특성별(3)"]
+TOTAL_SEGMENT = ("전체", "소계", "소계")
+TEEN_SEGMENT = ("연령대별", "청소년(만10~19세)", "소계")
+GENDER_SEGMENTS = {"남": ("성별", "남성", "소계"), "여": ("성별", "여성", "소계")}
+
+def parse_segments(view_df: pd.DataFrame, usage_df: pd.DataFrame) -> list:
+    """
+    모든 응답자 특성 행 → [c1, c2, c3, 시청 분포 6개(%), 학습 평균(%), 비학습 평균(%)] 목록
+    (JSON 스냅샷에 그대로 넣을 수 있는 모양)
+    """
+    def data_rows(df):
+        keys = df[SEGMENT_COLS].astype(str).apply(lambda c: c.str.strip())
+        body = keys[SEGMENT_COLS[0]] != SEGMENT_COLS[0]  # 헤더 반복 행 제외
+        return keys[body], df[body]
+
+    vkeys, vrows = data_rows(view_df)
+    ukeys, urows = data_rows(usage_df)
+    view_by_key = {
+        tuple(k): [float(x) for x in vals]
+        for k, vals in zip(vkeys.itertuples(index=False), vrows.iloc[:, 3:9].astype(float).values)
+    }
+    out = []
+    for k, study, nonstudy in zip(
+        ukeys.itertuples(index=False),
+        urows["2022.5"].astype(float),
+        urows["2022.11"].astype(float),
+    ):
+        key = tuple(k)
+        if key in view_by_key:
+            out.append([*key, view_by_key[key], float(study), float(nonstudy)])
+    return out
+
+def _segment_label(c1: str, c2: str, c3: str) -> str:
+    """("전체","소계","소계") → 전체, ("성별","남성","소계") → 남성, 그 밖에는 c2·c3"""
+    if c2 == "소계":
+        return c1
+    return c2 if c3 == "소계" else f"{c2}·{c3}"
+
+def segment_index(data: dict) -> dict:
+    """스냅샷 data → {(c1, c2, c3): {"label", "view_dist", "view_cdf", "study_mean", "nonstudy_mean"}}"""
+    index = {}
+    for c1, c2, c3, shares, study, nonstudy in data.get("segments", []):
+        dist = dict(zip(VIDEO_BUCKETS, shares))
+        index[(c1, c2, c3)] = {
+            "label": _segment_label(c1, c2, c3),
+            "view_dist": dist,
+            "view_cdf": build_view_cdf(dist),
+            "study_mean": study,
+            "nonstudy_mean": nonstudy,
+        }
+    if TOTAL_SEGMENT not in index:
+        index[TOTAL_SEGMENT] = {
+            "label": "전체",
+            "view_dist": data["view_dist"],
+            "view_cdf": build_view_cdf(data["view_dist"]),
+            "study_mean": data["study_mean"],
+            "nonstudy_mean": data["nonstudy_mean"],
+        }
+    return index
+
+def school_segment(age: int) -> tuple:
+    """만 나이 → 학령별 세그먼트 (초 ~12세, 중 13~15세, 고 16~18세, 그 이상 대학생)"""
+    if age <= 12: return ("학령별", "초등학생", "소계")
+    if age <= 15: return ("학령별", "중학생", "소계")
+    if age <= 18: return ("학령별", "고등학생", "소계")
+    return ("학령별", "대학생", "소계")
+
+def resolve_segment(index: dict, age: int | None = None, gender: str | None = None) -> tuple:
+    """
+    프로필 → 인덱스에 있는 가장 가까운 세그먼트 키
+    우선순위: 학령(나이) → 성별 → 청소년 연령대 → 전체
+    """
+    candidates = []
+    if age is not None:
+        candidates.append(school_segment(int(age)))
+    if gender in GENDER_SEGMENTS:
+        candidates.append(GENDER_SEGMENTS[gender])
+    if age is not None and 10 <= int(age) <= 19:
+        candidates.append(TEEN_SEGMENT)
+    candidates.append(TOTAL_SEGMENT)
+    return next(k for k in candidates if k in index)
+
+
+# =====================================================
+# 퍼센타일: 구간 분포 → 누적분포(CDF) → 구간 안 선형 보간
+# =====================================================
+def build_view_cdf(dist: dict) -> tuple[np.ndarray, np.ndarray]:
+    """구간 분포(%) → (경계 분, 경계별 누적 %) — 합이 100이 되도록 정규화"""
+    shares = np.array([float(dist.get(b, 0.0)) for b in VIDEO_BUCKETS])
+    cum = np.concatenate([[0.0], np.cumsum(shares)])
+    if cum[-1] > 0:
+        cum = cum / cum[-1] * 100.0
+    return np.array(VIEW_BIN_EDGES, dtype=float), cum
+
+def view_percentile(minutes, cdf: tuple[np.ndarray, np.ndarray]):
+    """
+    시청 시간(분) → 나보다 적게 보는 사람 비율(%)
+    - 구간은 이진 탐색(searchsorted)으로 찾고, 구간 안에서는 균등 분포로 보고 보간
+    - 숫자 하나면 float, 배열/Series면 같은 모양의 배열을 돌려줌
+    """
+    edges, cum = cdf
+    m = np.asarray(minutes, dtype=float)
+    idx = np.clip(np.searchsorted(edges, m, side="right") - 1, 0, len(edges) - 2)
+    lo, hi = edges[idx], edges[idx + 1]
+    frac = np.clip((m - lo) / (hi - lo), 0.0, 1.0)
+    pct = cum[idx] + (cum[idx + 1] - cum[idx]) * frac
+    return float(pct) if pct.ndim == 0 else pct
+
+
+# =====================================================
+# 학년별 과의존 위험군 (youth_digital_wellbeing_apps_cleaned.csv)
+# - 구분(초4/중1/고1)별 조사 인원, 위험/주의 사용자 수, 위험군(위험+주의) 성별 인원
+# - 한 번 파싱해 비율 표로 만들고, 나이 → 가장 가까운 학년 조회는 dict
+# =====================================================
+GRADE_AGES = {"초4": 10, "중1": 13, "고1": 16}   # 학년별 대표 만 나이
+GRADE_MEDIA = {"인터넷": "internet", "스마트폰": "smartphone"}
+
+def parse_grade_risk(df: pd.DataFrame) -> dict:
+    """
+    → {학년: {"internet"|"smartphone": {surveyed, risk, caution, risk_pct, caution_pct,
+                                         at_risk_pct, male_pct, female_pct}}}
+    - *_pct: 조사 인원 대비 %
+    - male_pct/female_pct: 위험군(위험+주의) 안에서 남/여 비중 %
+      (조사 인원은 성별로 나뉘어 있지 않아서 성별 위험률 대신 구성비로 제공)
+    """
+    df = df.copy()
+    df.columns = [str(c).replace(" ", "") for c in df.columns]
+    table = {}
+    for _, row in df.iterrows():
+        grade = str(row["구분"]).strip()
+        if grade not in GRADE_AGES:
+            continue
+        entry = {}
+        for media, key in GRADE_MEDIA.items():
+            surveyed = float(row[f"{media}과의존현황_조사인원"])
+            risk = float(row[f"{media}과의존현황_위험사용자군"])
+            caution = float(row[f"{media}과의존현황_주의사용자군"])
+            male = float(row[f"{media}과의존위험군_남"])
+            female = float(row[f"{media}과의존위험군_여"])
+            at_risk = male + female
+            entry[key] = {
+                "surveyed": surveyed,
+                "risk": risk,
+                "caution": caution,
+                "risk_pct": risk / surveyed * 100.0,
+                "caution_pct": caution / surveyed * 100.0,
+                "at_risk_pct": (risk + caution) / surveyed * 100.0,
+                "male_pct": male / at_risk * 100.0 if at_risk else 0.0,
+                "female_pct": female / at_risk * 100.0 if at_risk else 0.0,
+            }
+        table[grade] = entry
+    return table
+
+def load_grade_risk(path: str = GRADE_FILE) -> dict | None:
+    """파일이 없거나 형식이 다르면 None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        table = parse_grade_risk(read_csv_best_effort(path))
+    except (ValueError, KeyError):
+        return None
+    return table or None
+
+def grade_for_age(age: int, grades=GRADE_AGES) -> str:
+    """만 나이 → 대표 나이가 가장 가까운 학년"""
+    return min(grades, key=lambda g: abs(grades[g] - int(age)))
+
+def grade_lookup(table: dict, ages=range(10, 20)) -> dict:
+    """{나이: (학년, 비율 표)} — 화면에서는 dict 조회만 하도록 미리 계산"""
+    grades = {g: a for g, a in GRADE_AGES.items() if g in table}
+    if not grades:
+        return {}
+    return {age: (g, table[g]) for age in ages for g in [grade_for_age(age, grades)]}
+
+
+# =====================================================
+# 스냅샷: 파싱 결과를 JSON 한 파일로 저장/복원
+# =====================================================
+def _read_snapshot(path: str) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snap = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snap.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snap
+
+def _write_snapshot(path: str, snap: dict) -> None:
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snap, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass  # 읽기 전용 환경이면 스냅샷 없이 동작
+
+def _parse_all(raws: dict, encodings: dict) -> dict:
+    raw_view = pd.read_csv(io.BytesIO(raws[VIEW_FILE]), encoding=encodings[VIEW_FILE])
+    raw_usage = pd.read_csv(io.BytesIO(raws[USAGE_FILE]), encoding=encodings[USAGE_FILE])
+    study_mean, nonstudy_mean = parse_study_share(raw_usage)
+    return {
+        "view_dist": {k: float(v) for k, v in parse_viewing_distribution(raw_view).items()},
+        "study_mean": study_mean,
+        "nonstudy_mean": nonstudy_mean,
+        "segments": parse_segments(raw_view, raw_usage),
+    }
+
+def load_benchmarks(snapshot_path: str = SNAPSHOT_FILE) -> dict:
+    """
+    벤치마크 dict를 돌려줌: {"view_dist": {구간: %}, "study_mean": %, "nonstudy_mean": %, "segments": [...]}
+    1) 스냅샷의 (mtime, 크기)가 그대로면 → 파일을 열지도 않고 반환
+    2) mtime만 바뀌었으면 → sha256 비교 후 같으면 스냅샷 재사용(mtime만 갱신)
+    3) 내용이 바뀌었으면 → 인코딩 감지 1회 + 파싱 1회 후 스냅샷 갱신
+    """
+    stats = {p: os.stat(p) for p in REQUIRED_BENCH_FILES}
+    snap = _read_snapshot(snapshot_path)
+
+    def same_stat(p):
+        fp = snap["files"].get(p, {})
+        return fp.get("mtime_ns") == stats[p].st_mtime_ns and fp.get("size") == stats[p].st_size
+
+    if snap and all(same_stat(p) for p in REQUIRED_BENCH_FILES):
+        return snap["data"]
+
+    raws = {}
+    for p in REQUIRED_BENCH_FILES:
+        with open(p, "rb") as f:
+            raws[p] = f.read()
+    digests = {p: hashlib.sha256(raws[p]).hexdigest() for p in REQUIRED_BENCH_FILES}
+
+    if snap and all(snap["files"].get(p, {}).get("sha256") == digests[p] for p in REQUIRED_BENCH_FILES):
+        data = snap["data"]
+        encodings = {p: snap["files"][p]["encoding"] for p in REQUIRED_BENCH_FILES}
+    else:
+        encodings = {p: detect_encoding(raws[p], p) for p in REQUIRED_BENCH_FILES}
+        data = _parse_all(raws, encodings)
+
+    _write_snapshot(snapshot_path, {
+        "version": SNAPSHOT_VERSION,
+        "files": {
+            p: {
+                "mtime_ns": stats[p].st_mtime_ns,
+                "size": stats[p].st_size,
+                "sha256": digests[p],
+                "encoding": encodings[p],
+            }
+            for p in REQUIRED_BENCH_FILES
+        },
+        "data": data,
+    })
+    return data
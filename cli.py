@@ -0,0 +1,315 @@
+"""
+디지털 밸런스 기록 관리 CLI (Streamlit 없이 실행)
+
+    python cli.py import history.csv                  # 같은 날짜+닉네임 기록은 새 값으로 교체
+    python cli.py import history.csv --keep-existing  # 이미 있는 날짜+닉네임은 건너뜀
+    python cli.py import history.csv --db other.db --no-bench
+    python cli.py calibrate --n 1000000               # 합성 코호트로 점수 기준 점검
+    python cli.py calibrate --segment 학령별/중학생/소계 --json calib.json
+    python cli.py score records.csv scored.csv.gz      # 큰 기록 파일을 청크 단위로 다시 점수화
+    python cli.py score records.csv scored.csv --chunksize 200000 --no-bench
+    python cli.py compact                             # 지난 날짜 중복 정리 + 180일 지난 기록은 주간 요약
+                                                      # (지운 행은 digi_balance_log_archive/*.parquet로 백업)
+    python cli.py compact --keep-days 365 --vacuum
+    python cli.py compact --no-archive                # 중복 정리만
+    python cli.py compact --backup-keep 10            # 백업 파일은 최근 10개만 남김(기본 30, 0이면 전부)
+    python cli.py restore digi_balance_log_archive/log-20261017-031500-42.parquet   # compact로 지운 행 그대로 되돌리기
+    python cli.py rescore                             # 가중치/기준을 바꾼 뒤 저장된 기록 전체 다시 점수화
+    python cli.py export backup.parquet               # 기록 백업(.parquet / .csv / .csv.gz)
+    python cli.py export weekly.csv --weekly          # compact로 보관된 주간 요약
+    python cli.py export me.csv --nickname 민지 --columns date,nickname,total_min,score
+    python cli.py import backup.parquet --db new.db   # export 백업 되살리기(.parquet도 가져오기 가능)
+
+가져올 CSV: date, nickname + 카테고리별 분(gaming, youtube, social, study_video, creation,
+decorate, chat, music, web). age/gender/daytype/mood/focus/sleep/time/avatar는 있으면 사용.
+점수/레벨/학습 비율은 현재 기준으로 다시 계산.
+compact 백업은 import가 아니라 restore로 되돌림(import는 같은 날짜+닉네임을 하나로 합치고 교체 → 남아 있던 기록이 지워짐).
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import sys
+import time
+
+from log_compact import KEEP_DAYS
+from log_store import BACKUP_KEEP, LEGACY_LOG_CSV, LOG_DB, LogStore, read_parquet_log
+
+
+# =====================================================
+# import
+# =====================================================
+def _segments():
+    """벤치마크 CSV가 있으면 비교 집단 인덱스, 없으면 None"""
+    from bench_data import REQUIRED_BENCH_FILES, load_benchmarks, segment_index
+
+    if not all(os.path.exists(p) for p in REQUIRED_BENCH_FILES):
+        return None
+    return segment_index(load_benchmarks())
+
+def cmd_import(args) -> int:
+    from log_import import prepare_import, read_import_csv
+
+    t0 = time.perf_counter()
+    try:
+        raw = read_parquet_log(args.path) if args.path.endswith(".parquet") else read_import_csv(args.path)
+    except (OSError, ValueError) as e:
+        print(f"읽기 실패: {e}", file=sys.stderr)
+        return 1
+    rows, report = prepare_import(raw, segments=None if args.no_bench else _segments())
+    store = LogStore(args.db, legacy_csv=LEGACY_LOG_CSV if args.db == LOG_DB else None)
+    result = store.import_rows(rows, replace=not args.keep_existing)
+
+    print(f"읽은 행 {report['rows']:,} · 버린 행 {report['invalid']:,} · 범위 보정 {report['clipped_cells']:,}칸 · "
+          f"파일 내 중복 {report['duplicates']:,}")
+    print(f"저장 {result['inserted']:,}행 · 교체 {result['replaced']:,}행 · 건너뜀 {result['skipped']:,}행 "
+          f"({time.perf_counter() - t0:.2f}s)")
+    return 0
+
+
+# =====================================================
+# calibrate
+# =====================================================
+def cmd_calibrate(args) -> int:
+    from bench_data import TOTAL_SEGMENT
+    from cohort import calibrate, sample_cohort
+
+    segments = _segments()
+    if segments is None:
+        print("벤치마크 CSV가 없어요.", file=sys.stderr)
+        return 1
+    segment = tuple(args.segment.split("/")) if args.segment else None
+    if segment and segment not in segments:
+        print(f"없는 세그먼트: {args.segment}", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    report = calibrate(sample_cohort(args.n, segments, seed=args.seed, segment=segment),
+                       segments[segment or TOTAL_SEGMENT])
+    elapsed = time.perf_counter() - t0
+
+    print(f"합성 코호트 {report['n']:,}명 ({elapsed:.2f}s) · 기준 /{report['score_divisor']} · 컷 {report['level_cutoffs']}")
+    print("레벨 비중(%): " + "  ".join(f"{k} {v:.1f}" for k, v in report["level_share"].items()))
+    print("점수 퍼센타일: " + "  ".join(f"{k}={v:.0f}" for k, v in report["score_percentiles"].items()))
+    print("총합(분) 퍼센타일: " + "  ".join(f"{k}={v:.0f}" for k, v in report["total_min_percentiles"].items()))
+    print(f"학습 비율 평균: {report['study_ratio_mean']:.1f}% (벤치마크 {report['bench_label']} {report['bench_study_mean']:.1f}%)")
+    print(f"시청 구간 비중(%): 표본 / 벤치마크 {report['bench_label']}")
+    for b, share in report["video_bucket_share"].items():
+        print(f"  {b:<16} {share:6.1f} / {report['bench_view_dist'].get(b, float('nan')):6.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"저장: {args.json}")
+    return 0
+
+
+# =====================================================
+# score
+# =====================================================
+SCORE_CHUNK_ROWS = 100_000
+
+def cmd_score(args) -> int:
+    """입력 CSV를 청크로 읽어 점수/레벨/비교 값을 붙여 씀(메모리는 청크 크기만큼만 사용)"""
+    import pandas as pd
+
+    from bench_data import sniff_encoding
+    from log_import import SCORE_COLUMNS, score_records
+    from scoring import LEVELS
+
+    segments = None if args.no_bench else _segments()
+    t0 = time.perf_counter()
+    try:
+        encoding = sniff_encoding(args.path)
+        reader = pd.read_csv(args.path, encoding=encoding, chunksize=args.chunksize)
+    except (OSError, ValueError) as e:
+        print(f"읽기 실패: {e}", file=sys.stderr)
+        return 1
+
+    n = 0
+    header_written = False
+    levels = dict.fromkeys(LEVELS, 0)
+    compress = args.out.endswith(".gz")
+    with open(args.out, "wb") as f:
+        sink = gzip.GzipFile(fileobj=f, mode="wb", mtime=0) if compress else f
+        text = io.TextIOWrapper(sink, encoding="utf-8-sig", newline="")
+        try:
+            for chunk in reader:
+                out = score_records(chunk, segments)
+                out.to_csv(text, index=False, header=not header_written)
+                header_written = True
+                n += len(out)
+                for lv, cnt in out["level"].value_counts().items():
+                    levels[lv] += int(cnt)
+            if not header_written:
+                text.write(",".join(SCORE_COLUMNS) + "\n")
+            text.flush()
+        except (ValueError, pd.errors.ParserError) as e:
+            print(f"읽기 실패: {e}", file=sys.stderr)
+            return 1
+        finally:
+            text.detach()
+            if compress:
+                sink.close()
+
+    print(f"점수화 {n:,}행 ({time.perf_counter() - t0:.2f}s) → {args.out}")
+    print("레벨: " + "  ".join(f"{lv} {cnt:,}" for lv, cnt in levels.items()))
+    return 0
+
+
+# =====================================================
+# compact
+# =====================================================
+def cmd_compact(args) -> int:
+    import sqlite3
+    from datetime import date
+
+    store = LogStore(args.db, legacy_csv=LEGACY_LOG_CSV if args.db == LOG_DB else None)
+    t0 = time.perf_counter()
+    try:
+        result = store.compact(date.today().isoformat(), keep_days=None if args.no_archive else args.keep_days,
+                               backup=not args.no_backup, backup_keep=args.backup_keep or None)
+        if args.vacuum:
+            store.vacuum()
+    except (ValueError, ImportError, OSError, sqlite3.Error) as e:
+        print(f"정리 실패: {e}", file=sys.stderr)
+        return 1
+
+    print(f"기록 {result['rows_before']:,}행 → {result['rows_after']:,}행 ({time.perf_counter() - t0:.2f}s)")
+    print(f"같은 날짜 중복 정리 {result['deduped']:,}행")
+    if result["cutoff"]:
+        print(f"{result['cutoff']} 이전 {result['archived_days']:,}일 → 주간 요약 ({result['archived_rows']:,}행 삭제)")
+    if result["backup"]:
+        print(f"지운 행 백업: {result['backup']}")
+    if result["pruned_backups"]:
+        print(f"오래된 백업 {result['pruned_backups']:,}개 삭제(최근 {args.backup_keep}개만 남김)")
+    return 0
+
+
+# =====================================================
+# restore
+# =====================================================
+def cmd_restore(args) -> int:
+    """compact 백업을 저장돼 있던 값 그대로(원래 id) 되돌림 — 가져오기와 달리 합치기/재점수/교체 없음"""
+    import sqlite3
+
+    store = LogStore(args.db, legacy_csv=LEGACY_LOG_CSV if args.db == LOG_DB else None)
+    t0 = time.perf_counter()
+    try:
+        result = store.restore(args.path)
+    except (ValueError, ImportError, OSError, sqlite3.Error) as e:
+        print(f"되돌리기 실패: {e}", file=sys.stderr)
+        return 1
+    print(f"되돌림 {result['restored']:,}행 (이미 있어 건너뜀 {result['skipped']:,}행, {time.perf_counter() - t0:.2f}s)")
+    if result["unarchived"]:
+        print(f"주간 요약에서 하루 기록으로 되돌린 날 {result['unarchived']:,}일")
+    return 0
+
+
+# =====================================================
+# rescore
+# =====================================================
+def cmd_rescore(args) -> int:
+    import sqlite3
+
+    store = LogStore(args.db, legacy_csv=LEGACY_LOG_CSV if args.db == LOG_DB else None)
+    t0 = time.perf_counter()
+    try:
+        n = store.rescore_all()
+    except sqlite3.Error as e:
+        print(f"재점수화 실패: {e}", file=sys.stderr)
+        return 1
+    print(f"다시 점수화 {n:,}행 ({time.perf_counter() - t0:.2f}s)")
+    return 0
+
+
+# =====================================================
+# export
+# =====================================================
+def cmd_export(args) -> int:
+    """
+    확장자로 형식 결정: .parquet → Parquet(export_parquet), 그 외 CSV(.gz면 gzip).
+    --weekly면 하루 기록 대신 보관 주간 요약(log_weekly)
+    """
+    import sqlite3
+
+    store = LogStore(args.db, legacy_csv=LEGACY_LOG_CSV if args.db == LOG_DB else None)
+    columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+    t0 = time.perf_counter()
+    try:
+        if args.weekly:
+            weekly = store.user_weekly(args.nickname)
+            if args.out.endswith(".parquet"):
+                weekly.to_parquet(args.out, index=False, compression="zstd")
+            else:
+                weekly.to_csv(args.out, index=False, encoding="utf-8-sig")
+            n = len(weekly)
+        elif args.out.endswith(".parquet"):
+            n = store.export_parquet(args.out, nickname=args.nickname, columns=columns)
+        else:
+            if columns is not None:
+                print("--columns는 .parquet 내보내기에서만 쓸 수 있어요.", file=sys.stderr)
+                return 1
+            with open(args.out, "wb") as f:
+                n = store.write_csv(f, nickname=args.nickname, compress=args.out.endswith(".gz"))
+    except (ValueError, ImportError, OSError, sqlite3.Error) as e:
+        print(f"내보내기 실패: {e}", file=sys.stderr)
+        return 1
+    print(f"내보냄 {n:,}행 ({time.perf_counter() - t0:.2f}s) → {args.out}")
+    return 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=LOG_DB, help="기록 DB 경로")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", parents=[common], help="지난 기록 CSV 일괄 가져오기")
+    p.add_argument("path", help="가져올 CSV 경로(export로 만든 .parquet도 가능)")
+    p.add_argument("--keep-existing", action="store_true", help="이미 있는 날짜+닉네임 기록은 건너뜀")
+    p.add_argument("--no-bench", action="store_true", help="비교 집단 값(bench_*) 계산 생략")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("calibrate", help="합성 코호트로 점수 기준/레벨 컷 점검")
+    p.add_argument("--n", type=int, default=1_000_000, help="코호트 크기")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--segment", help="한 그룹만 뽑기: 응답자특성별(1)/(2)/(3) (예: 학령별/중학생/소계)")
+    p.add_argument("--json", help="결과 JSON 저장 경로")
+    p.set_defaults(func=cmd_calibrate)
+
+    p = sub.add_parser("score", help="기록 CSV 일괄 점수화 + 비교 집단 값(스트리밍)")
+    p.add_argument("path", help="입력 CSV 경로(카테고리별 분, age/gender는 있으면 사용)")
+    p.add_argument("out", help="출력 CSV 경로(.gz로 끝나면 gzip)")
+    p.add_argument("--chunksize", type=int, default=SCORE_CHUNK_ROWS, help="한 번에 읽는 행 수")
+    p.add_argument("--no-bench", action="store_true", help="비교 집단 값(view_pct/bench_*) 계산 생략")
+    p.set_defaults(func=cmd_score)
+
+    p = sub.add_parser("compact", parents=[common], help="기록 정리(중복 정리 + 오래된 기록 주간 요약)")
+    p.add_argument("--keep-days", type=int, default=KEEP_DAYS, help="하루 단위로 남길 기간(일)")
+    p.add_argument("--no-archive", action="store_true", help="주간 요약 없이 같은 날짜 중복만 정리")
+    p.add_argument("--vacuum", action="store_true", help="정리 뒤 DB 파일 크기 줄이기")
+    p.add_argument("--no-backup", action="store_true", help="지울 행을 <DB 이름>_archive/에 백업하지 않음")
+    p.add_argument("--backup-keep", type=int, default=BACKUP_KEEP, help="남길 최근 백업 파일 수(0이면 지우지 않음)")
+    p.set_defaults(func=cmd_compact)
+
+    p = sub.add_parser("restore", parents=[common], help="compact 백업(.parquet)을 그대로 되돌리기")
+    p.add_argument("path", help="<DB 이름>_archive/log-*.parquet 경로")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser("rescore", parents=[common], help="저장된 기록을 현재 점수 기준으로 다시 계산")
+    p.set_defaults(func=cmd_rescore)
+
+    p = sub.add_parser("export", parents=[common], help="저장된 기록 내보내기(.parquet / .csv / .csv.gz)")
+    p.add_argument("out", help="출력 경로(확장자로 형식 결정)")
+    p.add_argument("--nickname", help="이 닉네임 기록만")
+    p.add_argument("--columns", help="쉼표로 구분한 컬럼만(.parquet 전용)")
+    p.add_argument("--weekly", action="store_true", help="compact로 보관된 주간 요약(닉네임/주/일수/하루 평균)")
+    p.set_defaults(func=cmd_export)
+
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
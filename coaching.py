@@ -0,0 +1,83 @@
+import numpy as np
+
+
+# =====================================================
+# 카테고리 라벨 / 레벨 배지 / 추천 활동 (Streamlit 없이 import 가능)
+# - 화면(main.py)과 배치 작업(cli.py)이 같은 문구를 씀
+# =====================================================
+
+# =====================================================
+# 입력 카테고리(세부화 / 시각화 가능)
+# =====================================================
+CATEGORIES = [
+    ("gaming",      "🎮 게임",               "게임 플레이/모바일 게임/콘솔"),
+    ("youtube",     "📺 유튜브·영상",         "유튜브/넷플릭스/숏폼 포함"),
+    ("social",      "📸 인스타·SNS",           "인스타/틱톡/DM/피드"),
+    ("study_video", "🧠 동영상 강의(학습)",    "인강/강의/학습 영상"),
+    ("creation",    "🎬 영상 제작",           "촬영/편집/업로드/자막/썸네일"),
+    ("decorate",    "✨ 꾸미미·편집",         "스토리 꾸미기/프로필/스티커/템플릿"),
+    ("chat",        "💬 채팅·메신저",         "카톡/DM/단체채팅"),
+    ("music",       "🎧 음악",               "스트리밍/플리"),
+    ("web",         "🌐 웹서핑",             "검색/커뮤니티/뉴스/쇼핑"),
+]
+LABEL_MAP = {k: label for k, label, _ in CATEGORIES}
+
+
+# =====================================================
+# 추천 활동 풀(영상 말고 다양)
+# =====================================================
+OFFLINE_RECO_POOL = {
+    "movement": ["산책 10분 🚶", "스트레칭 5분 🧘", "스쿼트 15회 🏋️", "계단 오르기 5분 🪜"],
+    "eyes": ["20-20-20 눈 휴식 👀", "먼 곳 보기 2분 🌿", "물 마시고 창밖 보기 2분 💧"],
+    "focus": ["책 10페이지 📖", "책상 정리 5분 🧹", "투두 3개 적기 ✍️", "타이머 15분 집중 ⏳"],
+    "social": ["친구/가족 안부 한 줄 💬", "대화 산책 🚶‍♀️", "감사한 일 1개 공유 💛"],
+    "creative": ["낙서/스케치 5분 🎨", "사진 찍기(밖에서) 📷", "짧은 일기 3줄 📝"],
+    "calm": ["호흡 1분 🌬️", "음악 들으며 눈 감기 5분 🎧", "미니 명상 2분 🫧"],
+}
+
+
+# =====================================================
+# 레벨 배지 / OFF 계획
+# =====================================================
+def level_badge(level: str):
+    if level == "LOW": return "🟢 안정", "good"
+    if level == "MEDIUM": return "🟡 주의", "warn"
+    return "🔴 과다", "bad"
+
+def suggest_off_plan(level: str, total_min: int) -> str:
+    if level == "LOW": return "추천: 90분 사용 → 10분 OFF"
+    if level == "MEDIUM": return "추천: 60분 사용 → 15분 OFF"
+    if total_min >= 420: return "추천: 40분 사용 → 20분 OFF (오늘은 강하게 쉬자)"
+    return "추천: 45분 사용 → 20분 OFF"
+
+
+# =====================================================
+# 추천/퀘스트 생성
+# =====================================================
+def pick_recos(values: dict, level: str):
+    top_key = max(values, key=lambda k: values.get(k, 0))
+    recs = []
+
+    # OFF(디지털 스위치 오프 느낌)
+    if level == "HIGH":
+        recs.append("📵 30분 OFF (알림 끄고 폰은 멀리)")
+    elif level == "MEDIUM":
+        recs.append("📵 20분 OFF (방해금지 켜기)")
+    else:
+        recs.append("📵 10분 OFF (쉬는 습관 만들기)")
+
+    # 패턴 맞춤
+    if top_key in ["gaming"]:
+        recs += [np.random.choice(OFFLINE_RECO_POOL["movement"]), np.random.choice(OFFLINE_RECO_POOL["focus"])]
+    elif top_key in ["youtube", "social"]:
+        recs += [np.random.choice(OFFLINE_RECO_POOL["eyes"]), np.random.choice(OFFLINE_RECO_POOL["calm"])]
+    elif top_key in ["study_video"]:
+        recs += [np.random.choice(OFFLINE_RECO_POOL["focus"]), np.random.choice(OFFLINE_RECO_POOL["calm"])]
+    elif top_key in ["creation", "decorate"]:
+        recs += [np.random.choice(OFFLINE_RECO_POOL["creative"]), np.random.choice(OFFLINE_RECO_POOL["movement"])]
+    else:
+        recs += [np.random.choice(OFFLINE_RECO_POOL["calm"]), np.random.choice(OFFLINE_RECO_POOL["movement"])]
+
+    # 하나 더
+    recs.append(np.random.choice(OFFLINE_RECO_POOL["social"]))
+    return recs, top_key
@@ -0,0 +1,186 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from bench_data import resolve_segment, view_percentile
+from log_import import AGE_RANGE, DAYTYPES, FOCUS_LEVELS, GENDERS, MINUTES_RANGE, MOODS, SLEEP_LEVELS
+from scoring import CATEGORY_KEYS, LEVEL_CUTOFFS, LEVELS, SCORE_DIVISOR, VIDEO_BUCKETS, score_batch
+
+
+# =====================================================
+# 합성 코호트 (Streamlit 없이 import 가능)
+# - 벤치마크 분포에서 “그럴듯한 하루 기록”을 수백만 개 뽑음(행 단위 루프 없음)
+#   · 영상 시청(youtube) 분: 또래 그룹 시청 분포(구간 %)의 역CDF, 구간 안은 균등
+#   · 학습 비율: 또래 그룹 학습 목적 평균(%)을 평균으로 하는 베타 분포
+#   · 나머지 비학습 카테고리: NONSTUDY_MIX를 평균으로 하는 디리클레 분포로 나눔
+#   · 하루 합계는 DAY_MAX_MIN 이하(영상 분은 그대로 두고 나머지를 줄임)
+# - calibrate(): 점수 기준(/6.2, 35/65)이 이 코호트에서 어떤 분포가 되는지 요약
+# - cohort_log(): 저장소/리포트 부하 테스트용 기록(날짜·닉네임·프로필 포함)
+# =====================================================
+
+# 비학습 시간 안에서 카테고리별 평균 비중(가정값, 합 = 1). 벤치마크에는 영상 시청만 있으므로
+# 영상 비중으로 비학습 총량을 역산하고, 나머지 카테고리는 이 비중으로 나눔
+NONSTUDY_MIX = {
+    "youtube": 0.30,
+    "gaming": 0.18,
+    "social": 0.15,
+    "chat": 0.12,
+    "music": 0.10,
+    "web": 0.08,
+    "decorate": 0.04,
+    "creation": 0.03,
+}
+MIX_CONCENTRATION = 20.0     # 디리클레 집중도(클수록 사람 간 차이가 작음)
+STUDY_CONCENTRATION = 12.0   # 학습 비율 베타 분포 집중도
+MIN_VIDEO_SHARE = 0.05       # 영상 비중이 너무 작을 때 비학습 총량이 폭주하지 않게
+DAY_MAX_MIN = 960            # 하루 합계 상한(깨어 있는 16시간)
+MINUTE_STEP = 5              # 슬라이더 단위
+PERCENTILES = [5, 10, 25, 50, 75, 90, 95, 99]
+
+
+def _round_step(m: np.ndarray) -> np.ndarray:
+    lo, hi = MINUTES_RANGE
+    return np.clip(np.round(m / MINUTE_STEP) * MINUTE_STEP, lo, hi)
+
+def sample_minutes(n: int, peer: dict, rng: np.random.Generator) -> np.ndarray:
+    """또래 그룹 1개(segment_index 항목)에서 n명의 하루 카테고리 분 → (n, 9) 행렬(CATEGORY_KEYS 순)"""
+    edges, cum = peer["view_cdf"]
+    video = np.interp(rng.uniform(0.0, 100.0, size=n), cum, edges)
+
+    keys = list(NONSTUDY_MIX)
+    mix = rng.dirichlet(np.array([NONSTUDY_MIX[k] for k in keys]) * MIX_CONCENTRATION, size=n)
+    y = keys.index("youtube")
+    mean = min(max(peer["study_mean"] / 100.0, 1e-3), 1 - 1e-3)
+    study_share = rng.beta(mean * STUDY_CONCENTRATION, (1 - mean) * STUDY_CONCENTRATION, size=n)
+
+    # 비학습 총량 = 영상 ÷ 영상 비중. 학습까지 더한 하루 합계가 상한을 넘지 않게 자름(영상보다 작아지지는 않음)
+    # 상한은 반올림으로 늘어날 수 있는 만큼(카테고리마다 반 단위) 미리 빼 둠
+    day_max = DAY_MAX_MIN - MINUTE_STEP / 2 * len(CATEGORY_KEYS)
+    nonstudy_cap = np.maximum(video, day_max * (1.0 - study_share))
+    nonstudy_total = np.clip(video / np.maximum(mix[:, y], MIN_VIDEO_SHARE), video, nonstudy_cap)
+    study = np.minimum(nonstudy_total * study_share / (1.0 - study_share), np.maximum(day_max - nonstudy_total, 0.0))
+
+    # 영상 외 비학습 시간은 나머지 비중끼리 다시 정규화해서 나눔 → 비학습 합계가 정확히 nonstudy_total
+    rest = np.delete(mix, y, axis=1)
+    rest = rest / rest.sum(axis=1, keepdims=True)
+    m = np.zeros((n, len(CATEGORY_KEYS)))
+    for j, k in enumerate(k for k in keys if k != "youtube"):
+        m[:, CATEGORY_KEYS.index(k)] = (nonstudy_total - video) * rest[:, j]
+    m[:, CATEGORY_KEYS.index("study_video")] = study
+    m = _round_step(m)
+    # 영상은 내림: 구간 경계(VIDEO_BUCKET_EDGES)가 단위의 배수라 뽑은 시청 구간이 그대로 유지됨
+    lo, hi = MINUTES_RANGE
+    m[:, CATEGORY_KEYS.index("youtube")] = np.clip(np.floor(video / MINUTE_STEP) * MINUTE_STEP, lo, hi)
+    return m
+
+def sample_profiles(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """나이(AGE_RANGE 균등) + 성별(남/여 반반, 일부 비공개)"""
+    age = rng.integers(AGE_RANGE[0], AGE_RANGE[1] + 1, size=n)
+    gender = np.array(GENDERS, dtype=object)[rng.choice(len(GENDERS), size=n, p=[0.47, 0.47, 0.06])]
+    return pd.DataFrame({"age": age, "gender": gender})
+
+def _sample_by_profile(prof: pd.DataFrame, segments: dict, rng: np.random.Generator, segment: tuple | None = None):
+    """프로필 행마다 또래 그룹에서 뽑음((나이, 성별) 조합마다 1번씩 벡터화) → (분 행렬, bench_above_share, bench_study_mean)"""
+    n = len(prof)
+    m = np.zeros((n, len(CATEGORY_KEYS)))
+    above = np.zeros(n)
+    study_mean = np.zeros(n)
+    if segment:
+        plan = [(segment, np.arange(n))]
+    else:
+        plan = [
+            (resolve_segment(segments, int(a), g), ix)
+            for (a, g), ix in prof.groupby(["age", "gender"]).indices.items()
+        ]
+    for key, ix in plan:
+        peer = segments[key]
+        m[ix] = sample_minutes(len(ix), peer, rng)
+        above[ix] = 100.0 - view_percentile(m[ix, CATEGORY_KEYS.index("youtube")], peer["view_cdf"])
+        study_mean[ix] = peer["study_mean"]
+    return m.astype(np.int64), above.round(2), study_mean.round(2)
+
+def sample_cohort(n: int, segments: dict, seed: int = 0, segment: tuple | None = None) -> pd.DataFrame:
+    """
+    n개 하루 기록(카테고리 분 + age/gender + bench_*).
+    segment를 주면 그 그룹만, 없으면 프로필마다 resolve_segment로 또래 그룹을 골라 뽑음
+    """
+    rng = np.random.default_rng(seed)
+    prof = sample_profiles(n, rng)
+    m, above, study_mean = _sample_by_profile(prof, segments, rng, segment)
+    df = pd.DataFrame(m, columns=CATEGORY_KEYS)
+    df["age"] = prof["age"]
+    df["gender"] = prof["gender"]
+    df["bench_above_share"] = above
+    df["bench_study_mean"] = study_mean
+    return df
+
+
+# =====================================================
+# 보정 리포트
+# =====================================================
+def calibrate(cohort: pd.DataFrame, peer: dict | None = None) -> dict:
+    """
+    코호트를 배치 점수화 → 레벨 비중(%), 점수/총합 퍼센타일, 시청 구간 비중
+    (지금 SCORE_DIVISOR/LEVEL_CUTOFFS가 벤치마크 인구에서 어떻게 나뉘는지 확인용).
+    peer(segment_index 항목)를 주면 그 그룹의 시청 분포/학습 평균을 나란히 넣음
+    """
+    scored = score_batch(cohort)
+    out = {
+        "n": len(scored),
+        "score_divisor": SCORE_DIVISOR,
+        "level_cutoffs": list(LEVEL_CUTOFFS),
+        "level_share": {lv: round(float((scored["level"] == lv).mean() * 100), 2) for lv in LEVELS},
+        "score_percentiles": dict(zip((f"p{q}" for q in PERCENTILES), np.percentile(scored["score"], PERCENTILES).tolist())),
+        "total_min_percentiles": dict(zip((f"p{q}" for q in PERCENTILES), np.percentile(scored["total_min"], PERCENTILES).tolist())),
+        "study_ratio_mean": round(float(scored["study_ratio"].mean()), 2),
+        "video_bucket_share": {b: round(float((scored["video_bucket"] == b).mean() * 100), 2) for b in VIDEO_BUCKETS},
+    }
+    if peer:
+        out["bench_label"] = peer["label"]
+        out["bench_view_dist"] = peer["view_dist"]
+        out["bench_study_mean"] = peer["study_mean"]
+    return out
+
+
+# =====================================================
+# 부하 테스트용 기록
+# =====================================================
+def cohort_log(n_rows: int, n_nicknames: int, segments: dict, seed: int = 0, days: int = 365) -> pd.DataFrame:
+    """
+    저장소(LogStore.extend)에 바로 넣을 수 있는 LOG 형식 기록 n_rows개.
+    닉네임마다 프로필(나이/성별)이 고정되고, 앱 기본 닉네임 “나”를 항상 포함
+    """
+    rng = np.random.default_rng(seed + 1)
+    n_nicknames = max(n_nicknames, 1)
+    nicks = np.array(["나"] + [f"user{i:05d}" for i in range(n_nicknames - 1)], dtype=object)
+    prof = sample_profiles(n_nicknames, rng)
+    who = rng.integers(0, n_nicknames, size=n_rows)
+
+    row_prof = prof.iloc[who].reset_index(drop=True)
+    m, above, study_mean = _sample_by_profile(row_prof, segments, rng)
+    df = pd.DataFrame(m, columns=CATEGORY_KEYS)
+
+    today = date.today()
+    day_offsets = rng.integers(0, days, size=n_rows)
+    day_list = [today - timedelta(days=int(d)) for d in range(days)]
+    day_labels = np.array([d.isoformat() for d in day_list], dtype=object)
+    day_weekend = np.array([d.weekday() >= 5 for d in day_list])
+    df["date"] = day_labels[day_offsets]
+    df["time"] = "12:00:00"
+    df["nickname"] = nicks[who]
+    df["avatar"] = "🧑‍🚀"
+    df["age"] = row_prof["age"].to_numpy()
+    df["gender"] = row_prof["gender"].to_numpy()
+    df["daytype"] = np.where(day_weekend[day_offsets], DAYTYPES[1], DAYTYPES[0])
+    df["mood"] = np.array(MOODS, dtype=object)[rng.integers(0, len(MOODS), size=n_rows)]
+    df["focus"] = np.array(FOCUS_LEVELS, dtype=object)[rng.integers(0, len(FOCUS_LEVELS), size=n_rows)]
+    df["sleep"] = np.array(SLEEP_LEVELS, dtype=object)[rng.integers(0, len(SLEEP_LEVELS), size=n_rows)]
+
+    scored = score_batch(df)
+    df = pd.concat([df, scored], axis=1)
+    df["study_ratio"] = df["study_ratio"].round(2)
+    df["video_min"] = df["youtube"]
+    df["bench_above_share"] = above
+    df["bench_study_mean"] = study_mean
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
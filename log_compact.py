@@ -0,0 +1,83 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from log_store import LogStore
+from trends import TREND_WINDOW
+
+
+# =====================================================
+# 백그라운드 기록 정리 (Streamlit 없이 import 가능)
+# - 주기마다 LogStore.compact() 한 번: 지난 날짜는 (닉네임, 날짜)별 마지막 기록만,
+#   보관 기간(keep_days)보다 오래된 주는 주간 요약(log_weekly)으로 접음 → 기록 크기에 상한
+# - 행을 지우는 작업이라 기본은 꺼짐: 서버 환경변수 DIGI_KEEP_DAYS=<일>(TREND_WINDOW 이상)일 때만 켬
+# - 지우는 행은 먼저 <DB 이름>_archive/*.parquet로 백업(LogStore.compact, 최근 BACKUP_KEEP개만 남김)
+#   → python cli.py restore <파일>로 그대로 되돌림
+# - 첫 정리는 START_DELAY 뒤(새 워커의 첫 화면을 늦추지 않게)
+# - 같은 작업을 CLI에서도 실행: python cli.py compact
+# =====================================================
+KEEP_DAYS_ENV = "DIGI_KEEP_DAYS"
+KEEP_DAYS = 180                 # cli.py compact 기본값: 이보다 오래된 하루 기록은 주간 요약으로
+COMPACT_INTERVAL = 6 * 3600     # 초
+START_DELAY = 60.0              # 초
+RETRY_DELAY = 300.0             # 실패 후 다시 시도까지(초)
+
+
+def keep_days_from_env() -> int | None:
+    """DIGI_KEEP_DAYS → 자동 정리 보관 기간(일). 없거나 0/off면 None(자동 정리 안 함)"""
+    raw = os.environ.get(KEEP_DAYS_ENV, "").strip().lower()
+    if raw in ("", "0", "off", "false"):
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{KEEP_DAYS_ENV}는 일 수(정수)여야 해요: {raw!r}") from None
+
+
+class Compactor:
+    """LogStore 정리 스레드. stats()로 마지막 실행 결과를 확인"""
+
+    def __init__(self, store: LogStore, keep_days: int | None = KEEP_DAYS, interval: float = COMPACT_INTERVAL,
+                 start_delay: float = START_DELAY):
+        if keep_days is not None and keep_days < TREND_WINDOW:
+            raise ValueError(f"keep_days는 추세 창({TREND_WINDOW}일) 이상이어야 해요: {keep_days}")
+        self.store = store
+        self.keep_days = keep_days
+        self.interval = interval
+        self.start_delay = start_delay
+        self._stop = threading.Event()
+        self._stats = {"runs": 0, "errors": 0, "last_error": None, "last_run": None, "last_ms": None,
+                       "last_result": None}
+        self._thread = threading.Thread(target=self._run, name="log-compactor", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def run_once(self) -> dict | None:
+        """지금 한 번 정리. 실패하면 None(에러는 stats에 남김)"""
+        t0 = time.perf_counter()
+        try:
+            result = self.store.compact(date.today().isoformat(), keep_days=self.keep_days)
+        except (sqlite3.Error, OSError, ImportError) as e:  # 백업(.parquet)을 못 쓰면 아무것도 안 지움
+            self._stats["errors"] += 1
+            self._stats["last_error"] = f"{type(e).__name__}: {e}"
+            return None
+        self._stats["runs"] += 1
+        self._stats["last_run"] = time.time()
+        self._stats["last_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+        self._stats["last_result"] = result
+        return result
+
+    def _run(self):
+        wait = self.start_delay
+        while not self._stop.wait(wait):
+            wait = self.interval if self.run_once() is not None else RETRY_DELAY
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=10)
+
+    def stats(self) -> dict:
+        return {**self._stats, "keep_days": self.keep_days, "interval_s": self.interval}
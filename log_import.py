@@ -0,0 +1,174 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from bench_data import TOTAL_SEGMENT, detect_encoding, read_csv_best_effort, resolve_segment, view_percentile
+from log_store import LOG_COLUMNS
+from scoring import CATEGORY_KEYS, score_batch
+
+
+# =====================================================
+# 지난 기록 일괄 가져오기 (Streamlit 없이 import 가능 → 화면/CLI 공용)
+# - 날짜별 카테고리 분(分) CSV → 검증/보정(벡터화) → 배치 점수 계산
+# - (date, nickname) 해시 키로 중복 제거: 같은 날짜+닉네임이면 마지막 행만 남김
+# - 저장은 LogStore.import_rows()가 한 트랜잭션으로 처리
+# =====================================================
+MINUTES_RANGE = (0, 600)   # 탭1 슬라이더 범위(분)
+AGE_RANGE = (10, 19)
+NICKNAME_MAX = 12
+GENDERS = ["남", "여", "기타/비공개"]
+DAYTYPES = ["주중", "주말"]
+MOODS = ["🙂 좋아", "😐 보통", "🙁 별로"]
+FOCUS_LEVELS = ["🔥 잘됨", "➖ 보통", "🫥 안됨"]
+SLEEP_LEVELS = ["😴 충분", "😪 보통", "🥱 부족"]
+DEFAULT_GENDER = "기타/비공개"
+DEDUPE_KEYS = ["date", "nickname"]
+SCORE_COLUMNS = ["total_min", "score", "level", "study_ratio", "video_bucket", "video_min",
+                 "view_pct", "bench_above_share", "bench_study_mean"]
+
+
+def read_import_csv(src) -> pd.DataFrame:
+    """경로 또는 업로드 파일(바이트/파일 객체) → DataFrame (인코딩 자동 감지)"""
+    if isinstance(src, (str, os.PathLike)):
+        df = read_csv_best_effort(os.fspath(src))
+    else:
+        raw = src if isinstance(src, bytes) else src.read()
+        name = getattr(src, "name", "업로드 파일")
+        try:
+            df = pd.read_csv(io.BytesIO(raw), encoding=detect_encoding(raw, name))
+        except ValueError:
+            raise
+        except Exception:
+            raise ValueError(f"CSV를 읽지 못했어요: {name}")
+    df.columns = [str(c).strip().lstrip("﻿") for c in df.columns]
+    return df
+
+def _choice(col: pd.Series | None, n: int, options: list[str], default=None) -> pd.Series:
+    """허용된 값만 남기고 나머지는 default"""
+    if col is None:
+        return pd.Series([default] * n, dtype=object)
+    col = col.astype("string").str.strip()
+    return col.where(col.isin(options), default).astype(object)
+
+def hash_keys(df: pd.DataFrame) -> pd.Series:
+    """(date, nickname) → uint64 해시 (중복 판정용 키)"""
+    return pd.util.hash_pandas_object(df[DEDUPE_KEYS], index=False)
+
+def _peer_groups(age: pd.Series, gender: pd.Series, segments: dict):
+    """(나이, 성별) 조합마다 1번 세그먼트 판정 → (또래 그룹, 그 조합의 행 인덱스)"""
+    profile = pd.DataFrame({"age": age, "gender": gender}).astype(object)
+    profile = profile.where(profile.notna(), None)
+    for (a, g), idx in profile.groupby(["age", "gender"], dropna=False).groups.items():
+        yield segments[resolve_segment(segments, None if pd.isna(a) else int(a), None if pd.isna(g) else g)], idx
+
+def peer_view_percentile(age: pd.Series, gender: pd.Series, video_min: pd.Series, segments: dict) -> pd.Series:
+    """행마다 그 프로필의 또래 그룹 기준 시청 퍼센타일(탭1 비교 포인트와 같은 기준, 반올림 없음)"""
+    out = pd.Series(np.nan, index=video_min.index)
+    for peer, idx in _peer_groups(age, gender, segments):
+        out.loc[idx] = view_percentile(video_min.loc[idx].to_numpy(dtype=float), peer["view_cdf"])
+    return out
+
+def bench_columns(age: pd.Series, gender: pd.Series, video_min: pd.Series, segments: dict) -> pd.DataFrame:
+    """
+    프로필별 비교 집단 → bench_above_share / bench_study_mean
+    (세그먼트 판정은 (나이, 성별) 조합마다 1번, 퍼센타일은 그 조합 행 전체를 한 번에)
+    """
+    out = pd.DataFrame({"bench_above_share": np.nan, "bench_study_mean": np.nan}, index=video_min.index)
+    for peer, idx in _peer_groups(age, gender, segments):
+        pct = view_percentile(video_min.loc[idx].to_numpy(dtype=float), peer["view_cdf"])
+        out.loc[idx, "bench_above_share"] = np.round(100.0 - pct, 2)
+        out.loc[idx, "bench_study_mean"] = round(peer["study_mean"], 2)
+    return out
+
+def prepare_import(raw: pd.DataFrame, segments: dict | None = None) -> tuple[pd.DataFrame, dict]:
+    """
+    CSV 원본 → 저장할 행(LOG_COLUMNS 순서)과 요약 리포트
+    - 날짜를 읽을 수 없거나 닉네임이 비었거나 카테고리 값이 하나도 없는 행은 버림
+    - 카테고리 분은 슬라이더 범위(MINUTES_RANGE)로 자르고 정수로 반올림
+    - 선택형 값(성별/주중·주말/기분/집중/수면)은 화면 보기 중 하나만 허용
+    - 점수/레벨/학습 비율/시청 구간은 현재 기준으로 다시 계산(CSV에 있던 값은 무시)
+    - segments(bench_data.segment_index)를 주면 비교 집단 값도 채움
+    """
+    n = len(raw)
+    report = {"rows": n, "invalid": 0, "clipped_cells": 0, "duplicates": 0, "kept": 0}
+    if n == 0:
+        return pd.DataFrame(columns=LOG_COLUMNS), report
+
+    raw = raw.reset_index(drop=True)
+    get = raw.get
+
+    day = pd.to_datetime(get("date"), errors="coerce", format="mixed") if "date" in raw else pd.Series(pd.NaT, index=raw.index)
+    nick = get("nickname", pd.Series(pd.NA, index=raw.index)).astype("string").str.strip().str.slice(0, NICKNAME_MAX)
+    minutes = raw.reindex(columns=CATEGORY_KEYS).apply(pd.to_numeric, errors="coerce")
+
+    valid = (day.notna() & nick.notna() & nick.ne("") & minutes.notna().any(axis=1)).to_numpy()
+    report["invalid"] = int((~valid).sum())
+
+    lo, hi = MINUTES_RANGE
+    m = minutes.to_numpy(dtype=float)[valid]
+    report["clipped_cells"] = int(((m < lo) | (m > hi)).sum())
+    m = np.clip(np.nan_to_num(m, nan=0.0), lo, hi).round().astype(np.int64)
+
+    src = raw.loc[valid].reset_index(drop=True)
+    day = day[valid].reset_index(drop=True)
+    k = len(src)
+
+    age = pd.to_numeric(src.get("age"), errors="coerce") if "age" in src else pd.Series(np.nan, index=src.index)
+    age = age.round().where(age.between(*AGE_RANGE)).astype("Int64")
+    weekend = np.where(day.dt.dayofweek.to_numpy() >= 5, DAYTYPES[1], DAYTYPES[0])
+    daytype = _choice(src.get("daytype"), k, DAYTYPES)
+    daytype = daytype.where(daytype.notna(), pd.Series(weekend, index=src.index))
+
+    out = pd.DataFrame(m, columns=CATEGORY_KEYS)
+    out["date"] = day.dt.strftime("%Y-%m-%d")
+    out["time"] = src["time"].astype("string").str.strip().astype(object) if "time" in src else None
+    out["nickname"] = nick[valid].reset_index(drop=True).astype(object)
+    out["avatar"] = src["avatar"].astype(object) if "avatar" in src else None
+    out["age"] = age
+    out["gender"] = _choice(src.get("gender"), k, GENDERS, DEFAULT_GENDER)
+    out["daytype"] = daytype
+    out["mood"] = _choice(src.get("mood"), k, MOODS)
+    out["focus"] = _choice(src.get("focus"), k, FOCUS_LEVELS)
+    out["sleep"] = _choice(src.get("sleep"), k, SLEEP_LEVELS)
+
+    scored = score_batch(out[CATEGORY_KEYS])
+    out = out.join(scored)
+    out["study_ratio"] = out["study_ratio"].round(2)
+    out["video_min"] = out["youtube"]
+    if segments:
+        out = out.join(bench_columns(out["age"], out["gender"], out["video_min"], segments))
+
+    # 같은 날짜+닉네임이면 파일 안에서 마지막 행만 남김(해시 키)
+    dup = hash_keys(out).duplicated(keep="last").to_numpy()
+    report["duplicates"] = int(dup.sum())
+    out = out.loc[~dup].reset_index(drop=True)
+    report["kept"] = len(out)
+    return out.reindex(columns=LOG_COLUMNS), report
+
+
+# =====================================================
+# 배치 재점수화 (cli.py score: 청크마다 호출)
+# =====================================================
+def score_records(raw: pd.DataFrame, segments: dict | None = None) -> pd.DataFrame:
+    """
+    기록 청크 → 원래 컬럼 + SCORE_COLUMNS(현재 기준으로 다시 계산, 같은 이름의 예전 값은 덮어씀)
+    - 행은 버리거나 보정하지 않음(빈 카테고리 값은 0분)
+    - view_pct: 전체 또래 시청 분포에서 나보다 적게 보는 비율(%)
+    - bench_*: 프로필(age/gender)별 비교 집단. segments가 없으면 빈 값
+    """
+    raw = raw.rename(columns=lambda c: str(c).strip().lstrip("\ufeff"))
+    scored = score_batch(raw)
+    scored["study_ratio"] = scored["study_ratio"].round(2)
+    scored["video_min"] = np.trunc(raw.reindex(columns=["youtube"]).apply(pd.to_numeric, errors="coerce")
+                                   .fillna(0).to_numpy()[:, 0]).astype(np.int64)
+    if segments:
+        scored["view_pct"] = np.round(view_percentile(scored["video_min"].to_numpy(dtype=float),
+                                                      segments[TOTAL_SEGMENT]["view_cdf"]), 1)
+        age = pd.to_numeric(raw["age"], errors="coerce") if "age" in raw else pd.Series(np.nan, index=raw.index)
+        age = age.round().where(age.between(*AGE_RANGE)).astype("Int64")
+        gender = _choice(raw.get("gender"), len(raw), GENDERS).set_axis(raw.index)
+        scored = scored.join(bench_columns(age, gender, scored["video_min"], segments))
+    out = raw.drop(columns=[c for c in SCORE_COLUMNS if c in raw.columns])
+    return out.join(scored.reindex(columns=SCORE_COLUMNS))
@@ -0,0 +1,887 @@
+import gzip
+import io
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from bench_data import read_csv_best_effort
+from scoring import CATEGORY_KEYS, LEVELS, VIDEO_BUCKETS, score_batch
+from trends import TREND_WINDOW, build_state, update_day, update_quests
+
+
+# =====================================================
+# 기록 저장소 (SQLite WAL, Streamlit 없이 import 가능)
+# - append는 행 1개 INSERT → 기록이 쌓여도 저장 비용 일정
+# - (nickname, date) 인덱스로 닉네임/날짜 조회
+# - WAL + busy_timeout → 여러 세션이 동시에 저장해도 서로 덮어쓰지 않음
+# - 예전 digi_balance_log.csv는 처음 한 번만 옮겨옴(원본 파일은 그대로 둠)
+# =====================================================
+LOG_DB = "digi_balance_log.db"
+LEGACY_LOG_CSV = "digi_balance_log.csv"
+ARCHIVE_SUFFIX = "_archive"   # compact가 지우는 원본 행 백업 폴더(DB 이름 + 접미사, .parquet)
+BACKUP_KEEP = 30              # 백업 폴더에 남길 최근 백업 파일 수(compact가 끝날 때 오래된 것부터 지움)
+EXPORT_CHUNK_ROWS = 20_000
+
+# (컬럼, SQLite 타입) — 저장 순서 = CSV 내려받기 컬럼 순서
+LOG_SCHEMA = [
+    ("date", "TEXT"),
+    ("time", "TEXT"),
+    ("nickname", "TEXT"),
+    ("avatar", "TEXT"),
+    ("age", "INTEGER"),
+    ("gender", "TEXT"),
+    ("daytype", "TEXT"),
+    ("mood", "TEXT"),
+    ("focus", "TEXT"),
+    ("sleep", "TEXT"),
+    ("total_min", "INTEGER"),
+    ("score", "INTEGER"),
+    ("level", "TEXT"),
+    ("study_ratio", "REAL"),
+    ("video_bucket", "TEXT"),
+    ("video_min", "INTEGER"),
+    ("bench_above_share", "REAL"),
+    ("bench_study_mean", "REAL"),
+] + [(k, "INTEGER") for k in CATEGORY_KEYS]
+LOG_COLUMNS = [c for c, _ in LOG_SCHEMA]
+NUMERIC_COLUMNS = [c for c, t in LOG_SCHEMA if t in ("INTEGER", "REAL")]
+
+# 읽을 때 적용하는 고정 pandas 스키마
+# - 반복되는 문자열(enum 성격) → category (level/video_bucket은 순서 있는 고정 범주)
+# - 분/점수/나이 → 작은 nullable 정수, 비율 → float32, date → datetime64
+LOG_DTYPES = {
+    "date": "datetime64[ns]",
+    "time": "string",
+    "nickname": "string",
+    "avatar": "category",
+    "age": "Int8",
+    "gender": "category",
+    "daytype": "category",
+    "mood": "category",
+    "focus": "category",
+    "sleep": "category",
+    "total_min": "Int16",
+    "score": "Int8",
+    "level": pd.CategoricalDtype(LEVELS, ordered=True),
+    "study_ratio": "float32",
+    "video_bucket": pd.CategoricalDtype(VIDEO_BUCKETS, ordered=True),
+    "video_min": "Int16",
+    "bench_above_share": "float32",
+    "bench_study_mean": "float32",
+    **{k: "Int16" for k in CATEGORY_KEYS},
+}
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """SQLite/CSV에서 읽은 프레임 → LOG_DTYPES (있는 컬럼만)"""
+    out = {}
+    for c in df.columns:
+        dtype = LOG_DTYPES.get(c)
+        col = df[c]
+        if dtype is None:
+            out[c] = col
+        elif c == "date":
+            out[c] = pd.to_datetime(col, errors="coerce")
+        elif c in NUMERIC_COLUMNS:
+            num = pd.to_numeric(col, errors="coerce")
+            if str(dtype).startswith("Int"):
+                num = num.round()
+            out[c] = num.astype(dtype)
+        else:
+            out[c] = col.astype(dtype)
+    return pd.DataFrame(out, index=df.index)
+
+# 롤업 전체 재계산(마이그레이션 백필 / 일괄 작업 후 사용)
+# - daily_latest: (닉네임, 날짜)별 마지막 기록 id
+# - user_summary: 닉네임별 기록 수/기록 일수/기간 + 일별 최신 기록 기준 합계
+_ROLLUP_REBUILD_SQL = """
+DELETE FROM daily_latest;
+DELETE FROM user_summary;
+INSERT INTO daily_latest (nickname, date, log_id)
+    SELECT nickname, date, MAX(id) FROM log
+    WHERE nickname IS NOT NULL AND date IS NOT NULL
+    GROUP BY nickname, date;
+INSERT INTO user_summary (nickname, entries, days, first_date, last_date, sum_total_min, sum_score, last_id)
+    SELECT d.nickname,
+           (SELECT COUNT(*) FROM log x WHERE x.nickname = d.nickname),
+           COUNT(*), MIN(d.date), MAX(d.date),
+           COALESCE(SUM(l.total_min), 0), COALESCE(SUM(l.score), 0), MAX(d.log_id)
+    FROM daily_latest d JOIN log l ON l.id = d.log_id
+    GROUP BY d.nickname;
+"""
+
+# 전체 사용자 코호트 집계(닉네임별 날짜별 마지막 기록 기준)
+# - (나이, 성별, 주중/주말, 레벨, 기분, 수면) 조합마다 행 1개: 합계/제곱합/점수 히스토그램(10점 구간)
+# - 빈 값은 키에서 ''(나이는 -1)로 저장 → 조합 키가 NULL 없이 유일
+COHORT_DIMS = ["age", "gender", "daytype", "level", "mood", "sleep"]
+SCORE_BINS = 10
+_COHORT_SUMS = ["sum_total_min", "sum_score", "sum_score_sq"] + [f"sum_{k}" for k in CATEGORY_KEYS]
+_COHORT_HIST = [f"h{i}" for i in range(SCORE_BINS)]
+
+_COHORT_KEY_SQL = ", ".join(
+    "COALESCE(l.age, -1)" if d == "age" else f"COALESCE(l.{d}, '')" for d in COHORT_DIMS
+)
+_SCORE_BIN_SQL = f"MIN(MAX(COALESCE(l.score, 0) / 10, 0), {SCORE_BINS - 1})"
+_COHORT_REBUILD_SQL = (
+    "DELETE FROM cohort_agg;"
+    f"INSERT INTO cohort_agg ({', '.join(COHORT_DIMS)}, n, {', '.join(_COHORT_SUMS)}, {', '.join(_COHORT_HIST)}) "
+    f"SELECT {_COHORT_KEY_SQL}, COUNT(*), "
+    "COALESCE(SUM(l.total_min), 0), COALESCE(SUM(l.score), 0), COALESCE(SUM(l.score * l.score), 0), "
+    + ", ".join(f'COALESCE(SUM(l."{k}"), 0)' for k in CATEGORY_KEYS) + ", "
+    + ", ".join(f"SUM({_SCORE_BIN_SQL} = {i})" for i in range(SCORE_BINS))
+    + f" FROM daily_latest d JOIN log l ON l.id = d.log_id GROUP BY {_COHORT_KEY_SQL};"
+)
+# 보관(compact): 보관 기간이 지난 날짜별 마지막 기록 → log_archive_days((닉네임, 날짜)별 값 1행)
+# - (닉네임, 날짜)가 키라 같은 날이 다시 접혀 들어오면 교체 → 다시 돌려도 두 번 더해지지 않음
+# - log_weekly는 그 주간 롤업((닉네임, 주 시작 월요일)별 합계, 평균은 읽을 때 days로 나눔)
+#   바뀐 주(temp.touched_weeks)만 log_archive_days에서 처음부터 다시 합산
+_ARCHIVE_VALUES = ["total_min", "score"] + CATEGORY_KEYS
+_WEEKLY_SUMS = [f"sum_{c}" for c in _ARCHIVE_VALUES]
+_WEEK_SQL = "date({}.date, 'weekday 0', '-6 days')"
+_ARCHIVE_WHERE_SQL = "date(d.date) IS NOT NULL AND d.date < ?"
+# compact가 지우는 log 행: 지난 날짜의 중복(오늘 이전, 날짜별 마지막 기록이 아님) / 보관 기간이 지난 행
+_DEDUPE_ROWS_SQL = ("nickname IS NOT NULL AND date IS NOT NULL AND date < ? "
+                    "AND id NOT IN (SELECT log_id FROM daily_latest)")
+_EXPIRED_ROWS_SQL = "nickname IS NOT NULL AND date(date) IS NOT NULL AND date < ?"
+# compact 백업 파일 컬럼(restore가 원래 id 그대로 다시 넣음) / 하루 기록이 log에 다시 있는 보관 날짜
+_BACKUP_COLUMNS = ["id", "entry_id"] + LOG_COLUMNS
+_LOGGED_DAY_SQL = "EXISTS (SELECT 1 FROM log l WHERE l.nickname = a.nickname AND l.date = a.date)"
+_ARCHIVE_DAYS_SQL = (
+    f"INSERT OR REPLACE INTO log_archive_days (nickname, date, {', '.join(_ARCHIVE_VALUES)}) "
+    "SELECT d.nickname, d.date, " + ", ".join(f'COALESCE(l."{c}", 0)' for c in _ARCHIVE_VALUES)
+    + f" FROM daily_latest d JOIN log l ON l.id = d.log_id WHERE {_ARCHIVE_WHERE_SQL}"
+)
+_TOUCHED_WEEKS_SQL = (
+    "CREATE TEMP TABLE IF NOT EXISTS touched_weeks (nickname TEXT, week TEXT, PRIMARY KEY (nickname, week));"
+    "DELETE FROM temp.touched_weeks;"
+)
+_REWEEK_SQL = (
+    "DELETE FROM log_weekly WHERE (nickname, week) IN (SELECT nickname, week FROM temp.touched_weeks);"
+    f"INSERT INTO log_weekly (nickname, week, days, {', '.join(_WEEKLY_SUMS)}) "
+    "SELECT t.nickname, t.week, COUNT(*), " + ", ".join(f'SUM(a."{c}")' for c in _ARCHIVE_VALUES)
+    + " FROM temp.touched_weeks t JOIN log_archive_days a "
+    "ON a.nickname = t.nickname AND a.date >= t.week AND a.date < date(t.week, '+7 days') "
+    "GROUP BY t.nickname, t.week;"
+    "DROP TABLE temp.touched_weeks;"
+)
+
+# 기록이 바뀔 때마다 1씩 올라가는 버전(meta.data_version) → 화면 쪽 공유 캐시의 무효화 키
+_BUMP_VERSION_SQL = (
+    "INSERT INTO meta(key, value) VALUES ('data_version', '1') "
+    "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;"
+)
+# 추세 상태는 일괄 작업 뒤 지우기만 함 → 닉네임별로 처음 조회할 때 다시 만듦(user_trend)
+_ALL_ROLLUPS_SQL = _ROLLUP_REBUILD_SQL + _COHORT_REBUILD_SQL + "DELETE FROM trend_state;" + _BUMP_VERSION_SQL
+
+# PRAGMA user_version 기반 스키마 마이그레이션(순서대로 한 번씩 실행)
+_MIGRATIONS = [
+    # v1: 기본 테이블 + (nickname, date) 인덱스 + 메타
+    "CREATE TABLE IF NOT EXISTS log (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    + ", ".join(f'"{c}" {t}' for c, t in LOG_SCHEMA)
+    + ");"
+    "CREATE INDEX IF NOT EXISTS idx_log_nick_date ON log(nickname, date);"
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);",
+    # v2: 리포트용 롤업(저장할 때마다 갱신)
+    "CREATE TABLE IF NOT EXISTS daily_latest (nickname TEXT NOT NULL, date TEXT NOT NULL, "
+    "log_id INTEGER NOT NULL, PRIMARY KEY (nickname, date));"
+    "CREATE TABLE IF NOT EXISTS user_summary (nickname TEXT PRIMARY KEY, entries INTEGER NOT NULL, "
+    "days INTEGER NOT NULL, first_date TEXT, last_date TEXT, sum_total_min INTEGER NOT NULL, "
+    "sum_score INTEGER NOT NULL, last_id INTEGER);"
+    + _ROLLUP_REBUILD_SQL,
+    # v3: 닉네임 파티션 스캔용 (nickname, id) 인덱스 → 한 사용자 기록을 저장 순서대로 정렬 없이 읽음
+    "CREATE INDEX IF NOT EXISTS idx_log_nick_id ON log(nickname, id);",
+    # v4: 전체 사용자 코호트 집계(저장할 때마다 갱신)
+    "CREATE TABLE IF NOT EXISTS cohort_agg (age INTEGER NOT NULL, "
+    + ", ".join(f"{d} TEXT NOT NULL" for d in COHORT_DIMS[1:])
+    + ", n INTEGER NOT NULL DEFAULT 0, "
+    + ", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in _COHORT_SUMS + _COHORT_HIST)
+    + f", PRIMARY KEY ({', '.join(COHORT_DIMS)}));"
+    + _COHORT_REBUILD_SQL,
+    # v5: 행마다 고유 entry_id(쓰기 큐 저널 재생 시 같은 행이 두 번 들어가지 않게). 예전 행은 NULL
+    "ALTER TABLE log ADD COLUMN entry_id TEXT;"
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_log_entry_id ON log(entry_id);",
+    # v6: 닉네임별 추세 상태(JSON, 저장할 때마다 O(1) 갱신) + 날짜별 퀘스트 완료 수
+    "CREATE TABLE IF NOT EXISTS trend_state (nickname TEXT PRIMARY KEY, state TEXT NOT NULL);"
+    "CREATE TABLE IF NOT EXISTS quest_log (nickname TEXT NOT NULL, date TEXT NOT NULL, "
+    "done INTEGER NOT NULL, total INTEGER NOT NULL, PRIMARY KEY (nickname, date));",
+    # v7: 보관 주간 요약(compact로 접힌 예전 기록)
+    "CREATE TABLE IF NOT EXISTS log_weekly (nickname TEXT NOT NULL, week TEXT NOT NULL, days INTEGER NOT NULL, "
+    + ", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in _WEEKLY_SUMS)
+    + ", PRIMARY KEY (nickname, week));",
+    # v8: 보관한 날짜별 값(log_weekly는 여기서 다시 합산). v7에서 이미 접힌 주는 날짜별 값이 없어 그대로 둠
+    "CREATE TABLE IF NOT EXISTS log_archive_days (nickname TEXT NOT NULL, date TEXT NOT NULL, "
+    + ", ".join(f'"{c}" INTEGER NOT NULL DEFAULT 0' for c in _ARCHIVE_VALUES)
+    + ", PRIMARY KEY (nickname, date));",
+]
+
+
+def _project(columns: list[str] | None) -> list[str]:
+    """컬럼 투영: 스키마 순서를 유지하고 모르는 컬럼은 에러"""
+    if columns is None:
+        return LOG_COLUMNS
+    unknown = set(columns) - set(LOG_COLUMNS)
+    if unknown:
+        raise ValueError(f"알 수 없는 컬럼: {sorted(unknown)}")
+    return [c for c in LOG_COLUMNS if c in columns]
+
+def read_parquet_log(path: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """export_parquet로 만든 파일을 필요한 컬럼만 읽음(columns가 없으면 파일에 있는 컬럼 전부)"""
+    return apply_schema(pd.read_parquet(path, columns=None if columns is None else _project(columns)))
+
+def _clean(v):
+    """CSV에서 온 빈 문자열/NaN → NULL"""
+    if v is None or v == "":
+        return None
+    try:
+        if pd.isna(v):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if hasattr(v, "item"):
+        return v.item()  # numpy 스칼라 → 파이썬 값
+    return v
+
+
+class LogStore:
+    """digi_balance_log 저장소: append / 조회 / 예전 CSV 이전"""
+
+    def __init__(self, path: str = LOG_DB, legacy_csv: str | None = LEGACY_LOG_CSV):
+        self.path = path
+        self._init_db()
+        if legacy_csv:
+            self.migrate_from_csv(legacy_csv)
+
+    # -------------------------------------------------
+    # 연결/초기화
+    # -------------------------------------------------
+    @contextmanager
+    def _connect(self, immediate: bool = False):
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            yield con
+            con.execute("COMMIT")
+        except BaseException:
+            if con.in_transaction:
+                con.execute("ROLLBACK")
+            raise
+        finally:
+            con.close()
+
+    def _init_db(self):
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("BEGIN IMMEDIATE")
+            version = con.execute("PRAGMA user_version").fetchone()[0]
+            for i, script in enumerate(_MIGRATIONS[version:], start=version + 1):
+                self._run_script(con, script)
+                con.execute(f"PRAGMA user_version={i}")
+            con.execute("COMMIT")
+        except BaseException:
+            if con.in_transaction:
+                con.execute("ROLLBACK")
+            raise
+        finally:
+            con.close()
+
+    @staticmethod
+    def _run_script(con, script: str):
+        for stmt in filter(None, (s.strip() for s in script.split(";"))):
+            con.execute(stmt)
+
+    # -------------------------------------------------
+    # 쓰기
+    # -------------------------------------------------
+    def _insert_rows(self, con, rows: list[dict]) -> int:
+        cols = ", ".join(f'"{c}"' for c in LOG_COLUMNS)
+        marks = ", ".join("?" for _ in LOG_COLUMNS)
+        con.executemany(
+            f"INSERT INTO log ({cols}) VALUES ({marks})",
+            ([_clean(r.get(c)) for c in LOG_COLUMNS] for r in rows),
+        )
+        return len(rows)
+
+    def _rollup_row(self, con, log_id: int, row: dict):
+        """
+        새 기록 1개를 롤업에 반영(O(1))
+        - 같은 (닉네임, 날짜)에 이전 기록이 있으면 그 값을 빼고 새 값으로 교체
+        """
+        nick, day = _clean(row.get("nickname")), _clean(row.get("date"))
+        if nick is None or day is None:
+            return
+        total = _clean(row.get("total_min")) or 0
+        score = _clean(row.get("score")) or 0
+
+        prev_cols = ["total_min", "score"] + COHORT_DIMS + CATEGORY_KEYS
+        prev = con.execute(
+            "SELECT " + ", ".join(f'l."{c}"' for c in prev_cols) + " FROM daily_latest d JOIN log l ON l.id = d.log_id "
+            "WHERE d.nickname = ? AND d.date = ?",
+            (nick, day),
+        ).fetchone()
+        new_day = prev is None
+        prev_total, prev_score = (0, 0) if new_day else (prev[0] or 0, prev[1] or 0)
+        if not new_day:
+            self._cohort_add(con, dict(zip(prev_cols, prev)), -1)
+        self._cohort_add(con, row, +1)
+        self._trend_update(con, nick, lambda state: update_day(state, day, row))
+
+        con.execute(
+            "INSERT INTO daily_latest (nickname, date, log_id) VALUES (?, ?, ?) "
+            "ON CONFLICT(nickname, date) DO UPDATE SET log_id = excluded.log_id",
+            (nick, day, log_id),
+        )
+        con.execute(
+            "INSERT INTO user_summary (nickname, entries, days, first_date, last_date, sum_total_min, sum_score, last_id) "
+            "VALUES (?, 1, 1, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(nickname) DO UPDATE SET "
+            "entries = entries + 1, days = days + ?, "
+            "first_date = MIN(first_date, excluded.first_date), last_date = MAX(last_date, excluded.last_date), "
+            "sum_total_min = sum_total_min + ?, sum_score = sum_score + ?, last_id = excluded.last_id",
+            (nick, day, day, total, score, log_id,
+             1 if new_day else 0, total - prev_total, score - prev_score),
+        )
+
+    @staticmethod
+    def _cohort_add(con, row: dict, sign: int):
+        """코호트 집계에 하루 기록 1개를 더하거나(+1) 뺌(-1)"""
+        key = []
+        for d in COHORT_DIMS:
+            v = _clean(row.get(d))
+            key.append((-1 if v is None else int(v)) if d == "age" else ("" if v is None else str(v)))
+        total = _clean(row.get("total_min")) or 0
+        score = _clean(row.get("score")) or 0
+        cats = [_clean(row.get(k)) or 0 for k in CATEGORY_KEYS]
+        h = f"h{min(max(int(score) // 10, 0), SCORE_BINS - 1)}"
+        cols = ["n"] + _COHORT_SUMS + [h]
+        vals = [sign * v for v in [1, total, score, score * score, *cats, 1]]
+        con.execute(
+            f"INSERT INTO cohort_agg ({', '.join(COHORT_DIMS + cols)}) "
+            f"VALUES ({', '.join('?' for _ in COHORT_DIMS + cols)}) "
+            f"ON CONFLICT({', '.join(COHORT_DIMS)}) DO UPDATE SET "
+            + ", ".join(f"{c} = {c} + excluded.{c}" for c in cols),
+            key + vals,
+        )
+
+    @staticmethod
+    def _trend_update(con, nick: str, fn):
+        """
+        저장된 추세 상태에 fn 적용(O(1)). 상태가 아직 없으면 그대로 둠(처음 조회할 때 만듦),
+        fn이 None을 돌려주면(날짜 순서가 어긋남) 지워서 다음 조회 때 다시 만들게 함
+        """
+        hit = con.execute("SELECT state FROM trend_state WHERE nickname = ?", (nick,)).fetchone()
+        if hit is None:
+            return
+        state = fn(json.loads(hit[0]))
+        if state is None:
+            con.execute("DELETE FROM trend_state WHERE nickname = ?", (nick,))
+        else:
+            con.execute("UPDATE trend_state SET state = ? WHERE nickname = ?", (json.dumps(state), nick))
+
+    def record_quests(self, nickname: str, day: str, done: int, total: int):
+        """그날 퀘스트 완료 수 저장(같은 날은 덮어씀) + 추세 상태의 퀘스트 연속 일수 갱신"""
+        with self._connect(immediate=True) as con:
+            con.execute(
+                "INSERT INTO quest_log (nickname, date, done, total) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(nickname, date) DO UPDATE SET done = excluded.done, total = excluded.total",
+                (nickname, day, int(done), int(total)),
+            )
+            self._trend_update(con, nickname, lambda state: update_quests(state, day, int(done), int(total)))
+
+    def append(self, row: dict) -> bool:
+        """행 1개 추가 + 롤업 갱신(O(1)). 실패하면 False"""
+        try:
+            self.append_many([row])
+            return True
+        except sqlite3.Error:
+            return False
+
+    def append_many(self, rows: list[dict]) -> int:
+        """
+        여러 행을 한 트랜잭션으로 추가 + 행마다 롤업 갱신(O(행 수)). 새로 들어간 행 수를 돌려줌
+        - entry_id가 이미 있는 행은 건너뜀(같은 배치를 다시 넣어도 안전)
+        - 실패하면 sqlite3.Error를 그대로 올림(전부 롤백)
+        """
+        cols = LOG_COLUMNS + ["entry_id"]
+        names = ", ".join(f'"{c}"' for c in cols)
+        marks = ", ".join("?" for _ in cols)
+        sql = f"INSERT OR IGNORE INTO log ({names}) VALUES ({marks})"
+        inserted = 0
+        with self._connect(immediate=True) as con:
+            for row in rows:
+                cur = con.execute(sql, [_clean(row.get(c)) for c in cols])
+                if cur.rowcount == 1:
+                    self._rollup_row(con, cur.lastrowid, row)
+                    inserted += 1
+            if inserted:
+                con.execute(_BUMP_VERSION_SQL)
+        return inserted
+
+    def _insert_frame(self, con, df: pd.DataFrame, columns: list[str] = LOG_COLUMNS, ignore: bool = False) -> int:
+        """df의 columns를 log에 넣고 들어간 행 수를 돌려줌(ignore=True면 id/entry_id가 이미 있는 행은 건너뜀)"""
+        cols = ", ".join(f'"{c}"' for c in columns)
+        marks = ", ".join("?" for _ in columns)
+        frame = df.reindex(columns=columns)
+        frame = frame.astype(object).where(frame.notna(), None)
+        verb = "INSERT OR IGNORE" if ignore else "INSERT"
+        return con.executemany(f"{verb} INTO log ({cols}) VALUES ({marks})",
+                               frame.itertuples(index=False, name=None)).rowcount
+
+    def extend(self, df: pd.DataFrame) -> int:
+        """여러 행을 한 트랜잭션으로 추가(+ 롤업 재계산). 추가한 행 수를 돌려줌"""
+        if df.empty:
+            return 0
+        with self._connect(immediate=True) as con:
+            n = self._insert_frame(con, df)
+            self._run_script(con, _ALL_ROLLUPS_SQL)
+        return n
+
+    def import_rows(self, df: pd.DataFrame, replace: bool = True) -> dict:
+        """
+        일괄 가져오기(log_import.prepare_import 결과)를 한 트랜잭션으로 저장
+        - 가져올 (nickname, date) 키를 임시 테이블에 넣고 (nickname, date) 인덱스로 기존 행과 맞춤
+        - replace=True: 같은 키의 기존 기록을 지우고 새 행으로 교체(compact로 보관된 날짜면 보관 값도 지우고
+          그 주 요약을 다시 합산 → 다음 compact 때 새 값으로 다시 보관) / False: 이미 있는 키(보관 포함)는 건너뜀
+        """
+        result = {"inserted": 0, "replaced": 0, "skipped": 0}
+        if df.empty:
+            return result
+        with self._connect(immediate=True) as con:
+            con.execute("CREATE TEMP TABLE IF NOT EXISTS import_keys (nickname TEXT, date TEXT, PRIMARY KEY (nickname, date))")
+            con.execute("DELETE FROM temp.import_keys")
+            con.executemany(
+                "INSERT OR IGNORE INTO temp.import_keys (nickname, date) VALUES (?, ?)",
+                df[["nickname", "date"]].itertuples(index=False, name=None),
+            )
+            existing = "SELECT l.id FROM temp.import_keys k JOIN log l ON l.nickname = k.nickname AND l.date = k.date"
+            archived = "JOIN log_archive_days a ON a.nickname = k.nickname AND a.date = k.date"
+            if replace:
+                result["replaced"] = con.execute(f"DELETE FROM log WHERE id IN ({existing})").rowcount
+                self._run_script(con, _TOUCHED_WEEKS_SQL)
+                con.execute(
+                    f"INSERT OR IGNORE INTO temp.touched_weeks (nickname, week) "
+                    f"SELECT a.nickname, {_WEEK_SQL.format('a')} FROM temp.import_keys k {archived}"
+                )
+                result["replaced"] += con.execute(
+                    "DELETE FROM log_archive_days WHERE (nickname, date) IN (SELECT nickname, date FROM temp.import_keys)"
+                ).rowcount
+                self._run_script(con, _REWEEK_SQL)
+            else:
+                taken = pd.read_sql_query(
+                    "SELECT k.nickname, k.date FROM temp.import_keys k "
+                    "JOIN log l ON l.nickname = k.nickname AND l.date = k.date "
+                    f"UNION SELECT k.nickname, k.date FROM temp.import_keys k {archived}",
+                    con,
+                )
+                if not taken.empty:
+                    keep = ~df.set_index(["nickname", "date"]).index.isin(taken.set_index(["nickname", "date"]).index)
+                    result["skipped"] = int((~keep).sum())
+                    df = df.loc[keep]
+            result["inserted"] = self._insert_frame(con, df)
+            con.execute("DROP TABLE temp.import_keys")
+            self._run_script(con, _ALL_ROLLUPS_SQL)
+        return result
+
+    def rebuild_rollups(self):
+        """일괄 작업(재점수/이전) 뒤 롤업을 처음부터 다시 계산"""
+        with self._connect(immediate=True) as con:
+            self._run_script(con, _ALL_ROLLUPS_SQL)
+
+    def rescore_all(self) -> int:
+        """
+        가중치/기준이 바뀌었을 때 저장된 모든 행을 배치 계산으로 다시 점수화
+        (카테고리 값이 하나도 없는 행은 건너뜀). 갱신한 행 수를 돌려줌
+        """
+        cats = ", ".join(f'"{k}"' for k in CATEGORY_KEYS)
+        with self._connect(immediate=True) as con:
+            df = pd.read_sql_query(f"SELECT id, {cats} FROM log", con)
+            df = df[df[CATEGORY_KEYS].notna().any(axis=1)]
+            if df.empty:
+                return 0
+            scored = score_batch(df)
+            con.executemany(
+                "UPDATE log SET total_min = ?, score = ?, level = ?, study_ratio = ?, video_bucket = ? WHERE id = ?",
+                zip(
+                    scored["total_min"].tolist(),
+                    scored["score"].tolist(),
+                    scored["level"].tolist(),
+                    scored["study_ratio"].round(2).tolist(),
+                    scored["video_bucket"].tolist(),
+                    df["id"].tolist(),
+                ),
+            )
+            self._run_script(con, _ALL_ROLLUPS_SQL)
+        return len(df)
+
+    def migrate_from_csv(self, csv_path: str) -> int:
+        """예전 CSV 로그를 한 번만 옮겨옴. 옮긴 행 수를 돌려줌(이미 옮겼으면 0)"""
+        if not os.path.exists(csv_path):
+            return 0
+        with self._connect(immediate=True) as con:
+            done = con.execute("SELECT value FROM meta WHERE key = 'csv_migrated'").fetchone()
+            if done:
+                return 0
+            try:
+                df = read_csv_best_effort(csv_path)
+            except ValueError:
+                df = pd.DataFrame()
+            n = self._insert_rows(con, df.to_dict("records")) if not df.empty else 0
+            self._run_script(con, _ALL_ROLLUPS_SQL)
+            con.execute(
+                "INSERT INTO meta(key, value) VALUES ('csv_migrated', ?)",
+                (f"{os.path.abspath(csv_path)}:{n}",),
+            )
+        return n
+
+    # -------------------------------------------------
+    # 정리(compaction) / 보관
+    # -------------------------------------------------
+    def compact(self, today: str, keep_days: int | None = None, backup: bool = True,
+                backup_keep: int | None = BACKUP_KEEP) -> dict:
+        """
+        기록 정리를 한 트랜잭션으로 처리하고 줄어든 행 수를 돌려줌
+        - today(ISO 날짜) 이전 날짜는 (닉네임, 날짜)별 마지막 기록 1개만 남김(오늘 기록은 그대로)
+        - keep_days를 주면 today 기준 그보다 오래된 주(월요일 시작, 주 단위로 맞춤)의 하루 기록을
+          log_archive_days(날짜별 값)/log_weekly(주간 합계)로 접고 원본 행은 지움(날짜 형식이 아닌 예전 행은 그대로 둠).
+          이미 보관된 날짜는 새 값으로 교체 → 몇 번을 돌려도 결과가 같음
+        - backup=True면 지우기 전에 지울 행을 archive_dir()에 .parquet로 먼저 씀(쓰기에 실패하면 아무것도 안 지움).
+          끝나면 백업은 최근 backup_keep개만 남김(None이면 전부). 되살리기: python cli.py restore <파일>.parquet
+          (restore: 원래 id 그대로 다시 넣음 — import처럼 합치거나 교체하지 않음)
+        - 전체 통계/닉네임 요약은 남은 기록 기준으로 다시 계산, 추세 상태는 다음 조회 때 다시 만듦
+        """
+        if backup_keep is not None and backup_keep < 1:
+            raise ValueError(f"남길 백업 수는 1 이상이어야 해요: {backup_keep}")
+        cutoff = None
+        if keep_days is not None:
+            if keep_days < TREND_WINDOW:
+                raise ValueError(f"keep_days는 추세 창({TREND_WINDOW}일) 이상이어야 해요: {keep_days}")
+            oldest = pd.Timestamp(today) - pd.Timedelta(days=keep_days)
+            cutoff = (oldest - pd.Timedelta(days=oldest.dayofweek)).strftime("%Y-%m-%d")
+
+        result = {"rows_before": 0, "deduped": 0, "archived_days": 0, "archived_rows": 0, "rows_after": 0,
+                  "cutoff": cutoff, "backup": None, "pruned_backups": 0}
+        with self._connect(immediate=True) as con:
+            result["rows_before"] = con.execute("SELECT COUNT(*) FROM log").fetchone()[0]
+            if backup:
+                result["backup"] = self._backup_rows(con, self.archive_dir(), today, cutoff)
+            result["deduped"] = con.execute(f"DELETE FROM log WHERE {_DEDUPE_ROWS_SQL}", (today,)).rowcount
+            if cutoff is not None:
+                result["archived_days"] = con.execute(
+                    f"SELECT COUNT(*) FROM daily_latest d WHERE {_ARCHIVE_WHERE_SQL}", (cutoff,)
+                ).fetchone()[0]
+                if result["archived_days"]:
+                    self._run_script(con, _TOUCHED_WEEKS_SQL)
+                    con.execute(
+                        f"INSERT OR IGNORE INTO temp.touched_weeks (nickname, week) "
+                        f"SELECT d.nickname, {_WEEK_SQL.format('d')} FROM daily_latest d WHERE {_ARCHIVE_WHERE_SQL}",
+                        (cutoff,),
+                    )
+                    con.execute(_ARCHIVE_DAYS_SQL, (cutoff,))
+                    self._run_script(con, _REWEEK_SQL)
+                    result["archived_rows"] = con.execute(
+                        f"DELETE FROM log WHERE {_EXPIRED_ROWS_SQL}", (cutoff,)
+                    ).rowcount
+            if result["deduped"] or result["archived_rows"]:
+                self._run_script(con, _ALL_ROLLUPS_SQL)
+            result["rows_after"] = result["rows_before"] - result["deduped"] - result["archived_rows"]
+        if backup and backup_keep is not None:
+            result["pruned_backups"] = len(self.prune_backups(backup_keep))
+        return result
+
+    def archive_dir(self) -> str:
+        return os.path.splitext(self.path)[0] + ARCHIVE_SUFFIX
+
+    def prune_backups(self, keep: int) -> list[str]:
+        """archive_dir()의 compact 백업 중 최근 keep개만 남기고 지움(파일 이름의 시각 순). 지운 경로 목록"""
+        if keep < 1:
+            raise ValueError(f"남길 백업 수는 1 이상이어야 해요: {keep}")
+        folder = self.archive_dir()
+        if not os.path.isdir(folder):
+            return []
+        names = sorted(f for f in os.listdir(folder) if f.startswith("log-") and f.endswith(".parquet"))
+        doomed = [os.path.join(folder, f) for f in names[:-keep]]
+        for path in doomed:
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # 다른 프로세스가 먼저 지움
+                pass
+        return doomed
+
+    def restore(self, path: str) -> dict:
+        """
+        compact 백업(.parquet)을 저장돼 있던 값 그대로 되돌림 — import와 달리 중복 정리/재점수/교체 없음
+        - 원래 id로 다시 넣음 → 같은 날 남아 있는 기록과의 순서(날짜별 마지막 기록)가 compact 전과 같음
+        - id/entry_id가 이미 있는 행은 건너뜀 → 같은 파일을 두 번 되돌려도 그대로
+        - 되돌린 날짜가 보관(log_archive_days)돼 있었으면 보관 값을 지우고 그 주 요약을 다시 합산
+        """
+        df = pd.read_parquet(path)
+        if "id" not in df.columns:
+            raise ValueError(f"compact 백업 파일이 아니에요(원래 id 없음): {path}")
+        result = {"restored": 0, "skipped": 0, "unarchived": 0}
+        if df.empty:
+            return result
+        with self._connect(immediate=True) as con:
+            result["restored"] = self._insert_frame(con, df, columns=_BACKUP_COLUMNS, ignore=True)
+            result["skipped"] = len(df) - result["restored"]
+            if result["restored"]:
+                self._run_script(con, _TOUCHED_WEEKS_SQL)
+                con.execute(
+                    f"INSERT OR IGNORE INTO temp.touched_weeks (nickname, week) "
+                    f"SELECT a.nickname, {_WEEK_SQL.format('a')} FROM log_archive_days a WHERE {_LOGGED_DAY_SQL}"
+                )
+                result["unarchived"] = con.execute(f"DELETE FROM log_archive_days AS a WHERE {_LOGGED_DAY_SQL}").rowcount
+                self._run_script(con, _REWEEK_SQL)
+                self._run_script(con, _ALL_ROLLUPS_SQL)
+        return result
+
+    @staticmethod
+    def _backup_rows(con, archive_dir: str, today: str, cutoff: str | None) -> str | None:
+        """compact가 지울 행을 archive_dir/log-<시각>.parquet로 씀. 지울 행이 없으면 None"""
+        where, params = f"({_DEDUPE_ROWS_SQL})", [today]
+        if cutoff is not None:
+            where += f" OR ({_EXPIRED_ROWS_SQL})"
+            params.append(cutoff)
+        # 저장된 값 그대로(원래 id/entry_id, 날짜 문자열, 타입 축소 없음) → restore로 그대로 되돌림
+        cols = ", ".join(f'"{c}"' for c in _BACKUP_COLUMNS)
+        doomed = pd.read_sql_query(f"SELECT {cols} FROM log WHERE {where} ORDER BY id", con, params=params).convert_dtypes()
+        if doomed.empty:
+            return None
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"log-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.parquet")
+        doomed.to_parquet(path, index=False, compression="zstd")
+        return path
+
+    def vacuum(self):
+        """지운 행이 차지하던 파일 공간 반환(트랜잭션 밖에서, 잠시 DB 전체를 잠금)"""
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            con.execute("VACUUM")
+        finally:
+            con.close()
+
+    # -------------------------------------------------
+    # 읽기
+    # -------------------------------------------------
+    @staticmethod
+    def _log_query(columns, nickname=None, date=None, date_from=None, date_to=None) -> tuple[str, list]:
+        """log 테이블 SELECT 문 + 파라미터(날짜는 ISO 문자열이라 문자열 비교로 범위 필터)"""
+        where, params = [], []
+        if nickname is not None:
+            where.append("nickname = ?")
+            params.append(nickname)
+        if date is not None:
+            where.append("date = ?")
+            params.append(date)
+        if date_from is not None:
+            where.append("date >= ?")
+            params.append(str(date_from))
+        if date_to is not None:
+            where.append("date <= ?")
+            params.append(str(date_to))
+        sql = "SELECT " + ", ".join(f'"{c}"' for c in _project(columns)) + " FROM log"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return sql + " ORDER BY id", params
+
+    def fetch(self, nickname: str | None = None, date: str | None = None,
+              columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        저장 순서대로 조회(LOG_DTYPES 적용). nickname을 주면 그 닉네임 파티션만 인덱스로 읽음
+        (다른 사용자 기록은 건드리지 않음). columns를 주면 그 컬럼만 SQL에서 읽음
+        """
+        return self._select_log(*self._log_query(columns, nickname=nickname, date=date))
+
+    def iter_chunks(self, nickname: str | None = None, date_from=None, date_to=None,
+                    columns: list[str] | None = None, chunksize: int = EXPORT_CHUNK_ROWS):
+        """조건에 맞는 기록을 chunksize 행씩 나눠 읽음(한 번에 메모리에 올리지 않음)"""
+        sql, params = self._log_query(columns, nickname=nickname, date_from=date_from, date_to=date_to)
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            for chunk in pd.read_sql_query(sql, con, params=params, chunksize=chunksize):
+                yield apply_schema(chunk)
+        finally:
+            con.close()
+
+    def write_csv(self, out, nickname: str | None = None, date_from=None, date_to=None,
+                  compress: bool = False, chunksize: int = EXPORT_CHUNK_ROWS) -> int:
+        """
+        CSV(utf-8-sig, 엑셀 호환)를 바이너리 파일 객체 out에 청크 단위로 씀.
+        compress=True면 gzip. 쓴 행 수를 돌려줌
+        """
+        sink = gzip.GzipFile(fileobj=out, mode="wb", mtime=0) if compress else out
+        text = io.TextIOWrapper(sink, encoding="utf-8-sig", newline="")
+        n = 0
+        try:
+            for i, chunk in enumerate(self.iter_chunks(nickname, date_from, date_to, chunksize=chunksize)):
+                chunk.to_csv(text, index=False, header=(i == 0), date_format="%Y-%m-%d")
+                n += len(chunk)
+            if n == 0:
+                text.write(",".join(LOG_COLUMNS) + "\n")
+            text.flush()
+        finally:
+            text.detach()  # out은 호출한 쪽에서 닫음
+            if compress:
+                sink.close()
+        return n
+
+    def _select_log(self, sql: str, params: list) -> pd.DataFrame:
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            df = pd.read_sql_query(sql, con, params=params)
+        finally:
+            con.close()
+        return apply_schema(df)
+
+    def user_summaries(self) -> pd.DataFrame:
+        """
+        매니페스트: 닉네임별 기록 수/기록 일수/기간/평균(롤업)
+        — 닉네임 수(+보관 주 수)만큼만 읽고 기록 본문은 읽지 않음
+        - compact로 보관된 주(log_weekly)도 합침 → 예전 기록만 남은 닉네임도 빠지지 않음
+          entries는 하루 기록(log) 행 수, archived_days는 그중 보관된 날 수, 보관 구간 기간은 주 단위
+        """
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            return pd.read_sql_query(
+                "SELECT nickname, SUM(entries) AS entries, SUM(days) AS days, "
+                "MIN(first_date) AS first_date, MAX(last_date) AS last_date, "
+                "CAST(SUM(sum_total_min) AS REAL) / SUM(days) AS avg_total_min, "
+                "CAST(SUM(sum_score) AS REAL) / SUM(days) AS avg_score, "
+                "SUM(archived_days) AS archived_days "
+                "FROM (SELECT nickname, entries, days, first_date, last_date, sum_total_min, sum_score, "
+                "0 AS archived_days FROM user_summary "
+                "UNION ALL SELECT nickname, 0, SUM(days), MIN(week), MAX(date(week, '+6 days')), "
+                "SUM(sum_total_min), SUM(sum_score), SUM(days) FROM log_weekly GROUP BY nickname) "
+                "GROUP BY nickname ORDER BY nickname",
+                con,
+            )
+        finally:
+            con.close()
+
+    def user_daily(self, nickname: str, columns: list[str] | None = None) -> pd.DataFrame:
+        """해당 닉네임의 날짜별 마지막 기록(날짜순) — 그 사용자 기록 수에 비례"""
+        cols = ", ".join(f'l."{c}"' for c in _project(columns))
+        return self._select_log(
+            f"SELECT {cols} FROM daily_latest d JOIN log l ON l.id = d.log_id "
+            "WHERE d.nickname = ? ORDER BY d.date",
+            [nickname],
+        )
+
+    def user_weekly(self, nickname: str | None = None) -> pd.DataFrame:
+        """
+        compact로 접힌 예전 기록: 주(월요일)별 기록 일수와 하루 평균(total_min/score/카테고리).
+        nickname이 없으면 모든 닉네임(nickname 열 포함, 내보내기용)
+        """
+        sums = ", ".join(_WEEKLY_SUMS)
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            if nickname is None:
+                df = pd.read_sql_query(f"SELECT nickname, week, days, {sums} FROM log_weekly ORDER BY nickname, week", con)
+            else:
+                df = pd.read_sql_query(
+                    f"SELECT week, days, {sums} FROM log_weekly WHERE nickname = ? ORDER BY week", con, params=[nickname]
+                )
+        finally:
+            con.close()
+        out = df[[c for c in ("nickname", "week", "days") if c in df]].copy()
+        for c in _WEEKLY_SUMS:
+            out[c[len("sum_"):]] = df[c] / df["days"]
+        return out
+
+    def export_parquet(self, path: str, nickname: str | None = None, columns: list[str] | None = None) -> int:
+        """
+        고정 스키마 그대로 Parquet(열 기반, 범주형은 사전 인코딩)으로 내보냄.
+        pyarrow 필요(streamlit 설치 시 함께 설치됨). 내보낸 행 수를 돌려줌
+        """
+        df = self.fetch(nickname=nickname, columns=columns)
+        df.to_parquet(path, index=False, compression="zstd")
+        return len(df)
+
+    def cohort_stats(self, by: list[str]) -> pd.DataFrame:
+        """
+        전체 사용자 코호트 집계를 by 차원(COHORT_DIMS 중)으로 묶어 읽음 — 기록 수가 아니라
+        조합 수(최대 수천 행)에 비례. 빈 값 그룹은 NA
+        → n / mean_total_min / mean_score / std_score / mean_<카테고리> / h0..h9(점수 10점 구간 인원)
+        """
+        unknown = set(by) - set(COHORT_DIMS)
+        if unknown:
+            raise ValueError(f"알 수 없는 차원: {sorted(unknown)}")
+        group = ", ".join(by)
+        sql = (
+            f"SELECT {group + ', ' if by else ''}SUM(n) AS n, "
+            + ", ".join(f"SUM({c}) AS {c}" for c in _COHORT_SUMS + _COHORT_HIST)
+            + " FROM cohort_agg"
+            + (f" GROUP BY {group} HAVING SUM(n) > 0 ORDER BY {group}" if by else " HAVING SUM(n) > 0")
+        )
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            raw = pd.read_sql_query(sql, con)
+        finally:
+            con.close()
+
+        out = raw[by].copy()
+        for d in by:
+            out[d] = out[d].where(out[d] != (-1 if d == "age" else ""), pd.NA)
+        n = raw["n"].astype(float)
+        out["n"] = raw["n"]
+        out["mean_total_min"] = raw["sum_total_min"] / n
+        out["mean_score"] = raw["sum_score"] / n
+        out["std_score"] = np.sqrt(np.maximum(raw["sum_score_sq"] / n - out["mean_score"] ** 2, 0.0))
+        for k in CATEGORY_KEYS:
+            out[f"mean_{k}"] = raw[f"sum_{k}"] / n
+        for h in _COHORT_HIST:
+            out[h] = raw[h]
+        return out
+
+    def user_trend(self, nickname: str) -> dict:
+        """
+        닉네임 추세 상태(trends.py). 저장된 상태가 있으면 행 1개만 읽음,
+        없으면(처음/일괄 작업 뒤) 그 사용자의 날짜별 기록으로 한 번 만들어 저장
+        """
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            hit = con.execute("SELECT state FROM trend_state WHERE nickname = ?", (nickname,)).fetchone()
+        finally:
+            con.close()
+        if hit is not None:
+            return json.loads(hit[0])
+
+        cols = ["date", "total_min", "score", "level"] + CATEGORY_KEYS
+        with self._connect(immediate=True) as con:
+            con.row_factory = sqlite3.Row
+            daily = con.execute(
+                "SELECT " + ", ".join(f'l."{c}"' for c in cols) + " FROM daily_latest d JOIN log l ON l.id = d.log_id "
+                "WHERE d.nickname = ? ORDER BY d.date",
+                (nickname,),
+            ).fetchall()
+            quests = con.execute(
+                "SELECT date, done, total FROM quest_log WHERE nickname = ? ORDER BY date", (nickname,)
+            ).fetchall()
+            state = build_state([dict(r) for r in daily], [tuple(q) for q in quests])
+            con.execute(
+                "INSERT OR REPLACE INTO trend_state (nickname, state) VALUES (?, ?)",
+                (nickname, json.dumps(state)),
+            )
+        return state
+
+    def data_version(self) -> int:
+        """기록이 바뀔 때마다 올라가는 번호(행 1개만 읽음). 아직 아무것도 안 썼으면 0"""
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            hit = con.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        finally:
+            con.close()
+        return int(hit[0]) if hit else 0
+
+    def count(self) -> int:
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            return con.execute("SELECT COUNT(*) FROM log").fetchone()[0]
+        finally:
+            con.close()
@@ -0,0 +1,220 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+from log_store import LogStore
+
+
+# =====================================================
+# 쓰기 큐 (write-behind, Streamlit 없이 import 가능)
+# - submit(row): entry_id를 붙여 저널(JSONL)에 쓰고 fsync → 큐에 넣고 바로 돌아옴
+# - 백그라운드 스레드가 모아서(최대 BATCH_SIZE행 / FLUSH_INTERVAL초) 한 트랜잭션으로 저장
+# - 프로세스가 죽어도 저널에 남은 행은 다음 시작 때 다시 넣음(entry_id 고유 인덱스 → 중복 없음)
+# - 큐가 가득 차면 호출한 쪽에서 바로 저장(배압) → 메모리가 끝없이 늘지 않음
+#   바로 저장도 실패하면 재시도 목록(_retry)에 넣고 백그라운드 스레드가 먼저 다시 시도
+# - 저널은 DB 1개당 파일 1개: Streamlit 서버 프로세스 1개가 쓰는 것을 가정
+# =====================================================
+MAX_QUEUE = 1000
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5    # 초
+RETRY_DELAY = 2.0       # 저장 실패 후 다시 시도까지(초)
+LATENCY_HISTORY = 200
+
+
+def journal_path(db_path: str) -> str:
+    return db_path + ".journal"
+
+
+class LogWriter:
+    """LogStore 앞단의 비동기 저장 큐. stats()로 큐 깊이/저장 지연을 확인"""
+
+    def __init__(self, store: LogStore, journal: str | None = None, max_queue: int = MAX_QUEUE,
+                 batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.store = store
+        self.journal = journal or journal_path(store.path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._journal_lock = threading.Lock()
+        self._pending = 0                      # 저널에 있고 아직 DB에 없는 행 수
+        self._stop = threading.Event()
+        self._latencies = deque(maxlen=LATENCY_HISTORY)
+        self._latency_lock = threading.Lock()  # stats()가 다른 스레드에서 읽음
+        self._stats = {"submitted": 0, "flushed_rows": 0, "flushes": 0, "sync_writes": 0,
+                       "replayed": 0, "errors": 0, "last_error": None, "last_flush": None}
+
+        self._retry = deque()                  # 저널에는 있는데 저장에 실패한 행(스레드가 먼저 다시 시도)
+        self._stats["replayed"] = self.replay()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -------------------------------------------------
+    # 저널
+    # -------------------------------------------------
+    def _journal_append(self, row: dict):
+        line = json.dumps(row, ensure_ascii=False, default=_json_default) + "\n"
+        with self._journal_lock:
+            with open(self.journal, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending += 1
+
+    def _journal_done(self, n: int):
+        """n행이 DB에 들어감 → 남은 행이 없으면 저널을 비움"""
+        with self._journal_lock:
+            self._pending -= n
+            if self._pending == 0:
+                try:
+                    os.truncate(self.journal, 0)
+                except OSError:
+                    pass
+
+    def replay(self) -> int:
+        """시작할 때 저널에 남은 행을 저장(이미 들어간 entry_id는 건너뜀). 새로 넣은 행 수"""
+        if not os.path.exists(self.journal):
+            return 0
+        rows = []
+        with open(self.journal, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue  # 쓰다 만 마지막 줄
+        if not rows:
+            return 0
+        try:
+            n = self.store.append_many(rows)
+        except sqlite3.Error as e:
+            # 저널은 그대로 두고 백그라운드 스레드가 다시 시도
+            self._error(e)
+            with self._journal_lock:
+                self._pending += len(rows)
+            self._retry.extend(rows)
+            return 0
+        os.truncate(self.journal, 0)
+        return n
+
+    # -------------------------------------------------
+    # 쓰기
+    # -------------------------------------------------
+    def submit(self, row: dict) -> bool:
+        """행 1개 저장 요청. 저널에 안전하게 쓰였으면 True(DB 반영은 잠시 뒤, 실패해도 저널에서 다시 시도)"""
+        row = {**row, "entry_id": row.get("entry_id") or uuid.uuid4().hex}
+        try:
+            self._journal_append(row)
+        except OSError as e:
+            self._error(e)
+            return False
+        self._stats["submitted"] += 1
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # 배압: 큐가 밀려 있으면 이 행은 호출한 쪽에서 바로 저장
+            self._stats["sync_writes"] += 1
+            if not self._write([row]):
+                self._retry.append(row)  # 저널에 있으니 잃어버리지 않음 → 스레드가 다시 시도
+        return True
+
+    def _write(self, batch: list[dict]) -> bool:
+        t0 = time.perf_counter()
+        try:
+            self.store.append_many(batch)
+        except sqlite3.Error as e:
+            self._error(e)
+            return False
+        with self._latency_lock:
+            self._latencies.append((time.perf_counter() - t0) * 1000.0)
+        self._stats["flushes"] += 1
+        self._stats["flushed_rows"] += len(batch)
+        self._stats["last_flush"] = time.time()
+        self._journal_done(len(batch))
+        return True
+
+    def _error(self, e: Exception):
+        self._stats["errors"] += 1
+        self._stats["last_error"] = f"{type(e).__name__}: {e}"
+
+    def _drain(self, first=None) -> list[dict]:
+        """재시도 목록 먼저, 그다음 큐에서 최대 batch_size행"""
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size and self._retry:
+            batch.append(self._retry.popleft())
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        retry = []
+        while not self._stop.is_set():
+            if retry:
+                batch = retry
+            elif self._retry:
+                batch = self._drain()
+            else:
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batch = self._drain(first)
+            if self._write(batch):
+                retry = []
+            else:
+                retry = batch  # 저널에 남아 있으니 잃어버리지 않음. 잠시 뒤 다시
+                self._stop.wait(RETRY_DELAY)
+        self._retry.extendleft(reversed(retry))  # 남은 행은 close()가 저장
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """큐가 빌 때까지 기다림(테스트/종료용). 시간 안에 비면 True"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._journal_lock:
+                if self._pending == 0:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def close(self):
+        """남은 행을 모두 저장하고 스레드 종료"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=10)
+        while True:
+            batch = self._drain()
+            if not batch or not self._write(batch):
+                break
+
+    # -------------------------------------------------
+    # 상태
+    # -------------------------------------------------
+    def stats(self) -> dict:
+        with self._latency_lock:
+            lat = np.array(self._latencies) if self._latencies else None
+        return {
+            **self._stats,
+            "queue_depth": self._queue.qsize(),
+            "pending": self._pending,
+            "flush_ms_last": round(float(lat[-1]), 2) if lat is not None else None,
+            "flush_ms_p50": round(float(np.percentile(lat, 50)), 2) if lat is not None else None,
+            "flush_ms_p95": round(float(np.percentile(lat, 95)), 2) if lat is not None else None,
+        }
+
+
+def _json_default(v):
+    """numpy 스칼라 → 파이썬 값"""
+    if hasattr(v, "item"):
+        return v.item()
+    raise TypeError(f"JSON으로 바꿀 수 없는 값: {type(v).__name__}")
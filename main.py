@@ -1,19 +1,37 @@
 
+import functools
+import io
 import os
 from datetime import date, datetime
+import threading
 import time
 
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+
+from bench_data import (
+    GENDER_SEGMENTS, GRADE_FILE, REQUIRED_BENCH_FILES, bench_mtimes, build_view_cdf, grade_lookup,
+    load_benchmarks, load_grade_risk, resolve_segment, segment_index, view_percentile,
+)
+from coaching import CATEGORIES, LABEL_MAP, level_badge, pick_recos, suggest_off_plan
+from log_import import (
+    AGE_RANGE, DAYTYPES, DEFAULT_GENDER, FOCUS_LEVELS, GENDERS, MINUTES_RANGE, MOODS, NICKNAME_MAX, SLEEP_LEVELS,
+    peer_view_percentile, prepare_import, read_import_csv,
+)
+from log_store import COHORT_DIMS, LEGACY_LOG_CSV, LOG_DB, SCORE_BINS, LogStore
+from log_compact import KEEP_DAYS_ENV, Compactor, keep_days_from_env
+from log_writer import LogWriter
+from trends import SHORT_WINDOW, TREND_WINDOW, low_streak, quest_streak, rolling_means
+from timing import SPANS_FILE, RerunTimer, env_enabled, recent, span_stats
+from scoring import CATEGORY_KEYS, LEVELS, level_from_score, minutes_sum, rescore_log, study_ratio, video_bucket, weighted_score
 
 
 # =====================================================
-# 🔥 0) 필수 벤치마크 파일(선택 아님)
+# 🔥 0) 필수 벤치마크 파일(선택 아님) → bench_data.REQUIRED_BENCH_FILES
+# 기록: SQLite(LOG_DB), 예전 CSV(LEGACY_LOG_CSV)는 처음 한 번 자동 이전
 # =====================================================
-REQUIRED_BENCH_FILES = ["online viewing.csv", "daily_usage.csv"]
-LOG_FILE = "digi_balance_log.csv"
 
 
 # =====================================================
@@ -26,6 +44,53 @@ TAGLINE_2 = "오늘 기록하고, 내 패턴을 예쁘게 확인해요 ✨"
 st.set_page_config(page_title=APP_NAME, page_icon="🌱", layout="centered")
 
 
+# =====================================================
+# ⏱️ 구간 타이밍(옵트인: 서버 환경변수 DIGI_PROFILE=1일 때만, 디버그 패널도 그때만 보임)
+# - 타이머는 rerun마다 세션에 1개 → 다른 세션/지난 rerun 타이머에 섞이지 않음
+# - 프래그먼트만 다시 실행될 때는 timed_fragment가 그 프래그먼트 이름으로 타이머를 따로 열고 닫음
+# =====================================================
+PROFILE_ON = env_enabled()
+TIMER_KEY = "_rerun_timer"
+st.session_state[TIMER_KEY] = RerunTimer(enabled=PROFILE_ON)
+
+def timer() -> RerunTimer:
+    return st.session_state[TIMER_KEY]
+
+def timed_fragment(scope: str):
+    """프래그먼트 함수에 붙임(@st.fragment 안쪽). 전체 rerun 중이면 그 rerun 타이머를 그대로 씀"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            current = st.session_state.get(TIMER_KEY)
+            if current is not None and not current.finished:
+                return fn(*args, **kwargs)
+            t = st.session_state[TIMER_KEY] = RerunTimer(enabled=PROFILE_ON, scope=scope)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                t.finish()
+        return run
+    return decorate
+
+def render_debug_panel():
+    """이번 rerun 타이밍을 기록하고, 켜져 있을 때만 사이드바에 표로 보여줌"""
+    timer().finish()
+    if not PROFILE_ON:
+        return
+    records = recent()
+    with st.sidebar.expander("⏱️ rerun 타이밍 (debug)", expanded=True):
+        st.dataframe(span_stats(records), use_container_width=True)
+        st.caption(f"최근 {len(records)}회 rerun 기준 · 전체 기록: {SPANS_FILE}")
+    with st.sidebar.expander("💾 쓰기 큐 (debug)"):
+        st.json(get_log_writer().stats())
+    with st.sidebar.expander("🧹 기록 정리 (debug)"):
+        compactor = get_compactor()
+        if compactor is None:
+            st.caption(f"꺼짐 ({KEEP_DAYS_ENV} 미설정)")
+        else:
+            st.json(compactor.stats())
+
+
 # =====================================================
 # 🔥 2) 트렌디 CSS (카드/필/간격/모바일 느낌)
 # =====================================================
@@ -84,17 +149,12 @@ st.markdown(
 )
 
 
+timer().lap("css_header")
+
+
 # =====================================================
 # 유틸: 파일 로딩/체크
 # =====================================================
-def read_csv_best_effort(path: str) -> pd.DataFrame:
-    for enc in ["utf-8-sig", "utf-8", "cp949"]:
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception:
-            continue
-    raise ValueError(f"CSV 인코딩을 읽지 못했어요: {path}")
-
 def require_bench_files():
     missing = [f for f in REQUIRED_BENCH_FILES if not os.path.exists(f)]
     if missing:
@@ -108,211 +168,239 @@ def require_bench_files():
 
 require_bench_files()
 
-raw_view = read_csv_best_effort("online viewing.csv")
-raw_usage = read_csv_best_effort("daily_usage.csv")
-
 
 # =====================================================
-# 🔥 4) 입력 카테고리(세부화 / 시각화 가능)
+# 🔥 4) 입력 카테고리 / 5) 추천 활동 풀 → coaching.py
 # =====================================================
-CATEGORIES = [
-    ("gaming",      "🎮 게임",               "게임 플레이/모바일 게임/콘솔"),
-    ("youtube",     "📺 유튜브·영상",         "유튜브/넷플릭스/숏폼 포함"),
-    ("social",      "📸 인스타·SNS",           "인스타/틱톡/DM/피드"),
-    ("study_video", "🧠 동영상 강의(학습)",    "인강/강의/학습 영상"),
-    ("creation",    "🎬 영상 제작",           "촬영/편집/업로드/자막/썸네일"),
-    ("decorate",    "✨ 꾸미미·편집",         "스토리 꾸미기/프로필/스티커/템플릿"),
-    ("chat",        "💬 채팅·메신저",         "카톡/DM/단체채팅"),
-    ("music",       "🎧 음악",               "스트리밍/플리"),
-    ("web",         "🌐 웹서핑",             "검색/커뮤니티/뉴스/쇼핑"),
-]
-LABEL_MAP = {k: label for k, label, _ in CATEGORIES}
 
 
 # =====================================================
-# 🔥 5) 추천 활동 풀(영상 말고 다양)
+# 🔥 6) 벤치마크 (화면에 “공공데이터”라는 말은 안 씀)
+# - 파싱은 bench_data.py, 여기서는 프로세스 전역 캐시만 담당
+# - 캐시 키는 파일 (mtime, 크기) → CSV가 바뀌면 자동으로 다시 로드
+#   (fingerprint는 밑줄 없이: 밑줄로 시작하는 인자는 Streamlit이 캐시 키에서 뺌)
 # =====================================================
-OFFLINE_RECO_POOL = {
-    "movement": ["산책 10분 🚶", "스트레칭 5분 🧘", "스쿼트 15회 🏋️", "계단 오르기 5분 🪜"],
-    "eyes": ["20-20-20 눈 휴식 👀", "먼 곳 보기 2분 🌿", "물 마시고 창밖 보기 2분 💧"],
-    "focus": ["책 10페이지 📖", "책상 정리 5분 🧹", "투두 3개 적기 ✍️", "타이머 15분 집중 ⏳"],
-    "social": ["친구/가족 안부 한 줄 💬", "대화 산책 🚶‍♀️", "감사한 일 1개 공유 💛"],
-    "creative": ["낙서/스케치 5분 🎨", "사진 찍기(밖에서) 📷", "짧은 일기 3줄 📝"],
-    "calm": ["호흡 1분 🌬️", "음악 들으며 눈 감기 5분 🎧", "미니 명상 2분 🫧"],
-}
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_benchmarks(fingerprint: tuple) -> dict:
+    bench = dict(load_benchmarks())
+    bench["view_cdf"] = build_view_cdf(bench["view_dist"])  # 퍼센타일용 누적분포(1회 계산)
+    bench["segments"] = segment_index(bench)                # 응답자 특성별 인덱스(1회 계산)
+    return bench
+
+def bench() -> dict:
+    """벤치마크(처음 쓰는 곳에서 로드 → 헤더/슬라이더가 먼저 그려짐, 이후 프로세스 캐시)"""
+    return get_benchmarks(bench_mtimes())
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_grade_risk(fingerprint: tuple) -> dict:
+    """학년별 과의존 위험군 비율 → {나이: (학년, 비율 표)} (파일이 없으면 빈 dict)"""
+    table = load_grade_risk()
+    return grade_lookup(table) if table else {}
+
+def grade_risk() -> dict:
+    return get_grade_risk(bench_mtimes([GRADE_FILE]) if os.path.exists(GRADE_FILE) else ())
 
 
 # =====================================================
-# 🔥 6) 벤치마크 파싱 (화면에 “공공데이터”라는 말은 안 씀)
+# 🔥 7) 점수/레벨 로직(학습/제작 덜 페널티)
+# - 점수 계산(단건/배치)은 scoring.py, 레벨 배지/OFF 계획/추천(9번 기능)은 coaching.py
 # =====================================================
-def parse_viewing_distribution(df: pd.DataFrame) -> dict:
-    """
-    online viewing.csv:
-    - 0행에 구간 라벨
-    - 전체/소계/소계 행의 2022 분포(%) 사용
-    """
-    bins = list(df.iloc[0, 3:9].astype(str).values)
-    mask = (df["응답자특성별(1)"] == "전체") & (df["응답자특성별(2)"] == "소계") & (df["응답자특성별(3)"] == "소계")
-    row = df[mask]
-    if row.empty:
-        row = df.iloc[[1]]
-    vals = row.iloc[0, 3:9].astype(float).values
-    return dict(zip(bins, vals))
-
-def parse_study_share(df: pd.DataFrame) -> tuple[float, float]:
-    """
-    daily_usage.csv:
-    전체/소계/소계 행의 평균(%)
-    - 2022.5: 학습 목적 평균(%)
-    - 2022.11: 비학습 목적 평균(%)
-    """
-    mask = (df["응답자특성별(1)"] == "전체") & (df["응답자특성별(2)"] == "소계") & (df["응답자특성별(3)"] == "소계")
-    row = df[mask]
-    if row.empty:
-        row = df.iloc[[2]]
-    study_mean = float(row.iloc[0]["2022.5"])
-    nonstudy_mean = float(row.iloc[0]["2022.11"])
-    return study_mean, nonstudy_mean
 
-BENCH_VIEW_DIST = parse_viewing_distribution(raw_view)
-BENCH_STUDY_MEAN, BENCH_NONSTUDY_MEAN = parse_study_share(raw_usage)
+
+# =====================================================
+# 🔥 9-0) 오늘의 퀘스트 (프래그먼트)
+# - 체크박스를 눌러도 이 블록만 다시 실행 → 코칭 버튼 아래 내용이 유지됨
+# - 완료 수가 바뀔 때만 DB(quest_log)에 기록 → 올클리어 연속 일수 추세에 반영
+# =====================================================
+@st.fragment
+@timed_fragment("quest")
+def quest_panel(recos: tuple, nickname: str):
+    st.markdown("<div class='card'><div class='big'>✅ 오늘의 퀘스트</div><div class='muted'>완료하면 체크해보자!</div></div>", unsafe_allow_html=True)
+    today_key = date.today().isoformat()
+    quest_done = 0
+    for i, r in enumerate(recos, 1):
+        checked = st.checkbox(f"퀘스트 {i}: {r}", key=f"quest_{today_key}_{nickname}_{i}")
+        quest_done += 1 if checked else 0
+
+    # 처음 그릴 때(모두 미완료)는 저장하지 않음 → 다른 세션에서 남긴 완료 기록을 0으로 덮지 않게
+    saved_key = f"quest_saved_{today_key}_{nickname}"
+    if st.session_state.setdefault(saved_key, quest_done) != quest_done:
+        st.session_state[saved_key] = quest_done
+        get_log_store().record_quests(nickname, today_key, quest_done, len(recos))
+
+    if quest_done == len(recos):
+        st.success("완벽해요! 오늘 퀘스트 올클리어 🎉")
+        st.balloons()
+    elif quest_done > 0:
+        st.info(f"좋아요! {quest_done}/{len(recos)}개 완료했어요 👏")
 
 
 # =====================================================
-# 🔥 7) 점수/레벨 로직(학습/제작 덜 페널티)
+# 🔥 9-1) OFF 타이머 (서버 스레드를 붙잡지 않음)
+# - 서버는 시작/종료 시각만 세션에 저장
+# - 남은 시간 표시는 브라우저(JS)가 1초마다 갱신
+# - 종료 시각에 프래그먼트가 한 번만 깨어나서 완료 처리
 # =====================================================
-def minutes_sum(values: dict) -> int:
-    return int(sum(max(0, int(v)) for v in values.values()))
-
-def weighted_score(values: dict) -> int:
-    w = {
-        "gaming": 1.20,
-        "youtube": 1.05,
-        "social": 1.10,
-        "study_video": 0.40,   # 학습은 덜 페널티
-        "creation": 0.55,      # 제작도 덜 페널티
-        "decorate": 0.90,
-        "chat": 0.75,
-        "music": 0.35,
-        "web": 0.80,
-    }
-    total = 0.0
-    for k, v in values.items():
-        total += float(v) * w.get(k, 1.0)
-    score = int(np.clip(total / 6.2, 0, 100))
-    return score
-
-def level_from_score(score: int) -> str:
-    if score < 35: return "LOW"
-    if score < 65: return "MEDIUM"
-    return "HIGH"
-
-def level_badge(level: str):
-    if level == "LOW": return "🟢 안정", "good"
-    if level == "MEDIUM": return "🟡 주의", "warn"
-    return "🔴 과다", "bad"
-
-def suggest_off_plan(level: str, total_min: int) -> str:
-    if level == "LOW": return "추천: 90분 사용 → 10분 OFF"
-    if level == "MEDIUM": return "추천: 60분 사용 → 15분 OFF"
-    if total_min >= 420: return "추천: 40분 사용 → 20분 OFF (오늘은 강하게 쉬자)"
-    return "추천: 45분 사용 → 20분 OFF"
-
-def study_ratio(values: dict) -> float:
-    total = minutes_sum(values)
-    if total <= 0:
-        return 0.0
-    return float(values.get("study_video", 0) / total * 100.0)
-
-
-# =====================================================
-# 🔥 8) 벤치마크 비교용 함수(자연스러운 근거 한 줄)
-# =====================================================
-def video_bucket(video_min: int) -> str:
-    if video_min < 10: return "10분 미만"
-    if video_min < 30: return "10분 이상~30분 미만"
-    if video_min < 60: return "30분 이상~1시간 미만"
-    if video_min < 120: return "1시간 이상~2시간 미만"
-    if video_min < 360: return "2시간 이상~6시간 미만"
-    return "6시간 이상"
-
-def approx_above_share(bucket: str, dist: dict) -> float:
-    """
-    분포(%)에서 '내 구간 이상(더 많이 보는 구간 포함)' 비율을 계산
-    → 화면에는 “근거 한 줄”로만 보여줌
-    """
-    order = [
-        "10분 미만",
-        "10분 이상~30분 미만",
-        "30분 이상~1시간 미만",
-        "1시간 이상~2시간 미만",
-        "2시간 이상~6시간 미만",
-        "6시간 이상",
-    ]
-    if bucket not in order:
-        return float("nan")
-    idx = order.index(bucket)
-    return float(sum(float(dist.get(b, 0.0)) for b in order[idx:]))
-
-
-# =====================================================
-# 🔥 9) 추천/퀘스트 생성 (3번 기능)
-# =====================================================
-def pick_recos(values: dict, level: str):
-    top_key = max(values, key=lambda k: values.get(k, 0))
-    recs = []
-
-    # OFF(디지털 스위치 오프 느낌)
-    if level == "HIGH":
-        recs.append("📵 30분 OFF (알림 끄고 폰은 멀리)")
-    elif level == "MEDIUM":
-        recs.append("📵 20분 OFF (방해금지 켜기)")
-    else:
-        recs.append("📵 10분 OFF (쉬는 습관 만들기)")
-
-    # 패턴 맞춤
-    if top_key in ["gaming"]:
-        recs += [np.random.choice(OFFLINE_RECO_POOL["movement"]), np.random.choice(OFFLINE_RECO_POOL["focus"])]
-    elif top_key in ["youtube", "social"]:
-        recs += [np.random.choice(OFFLINE_RECO_POOL["eyes"]), np.random.choice(OFFLINE_RECO_POOL["calm"])]
-    elif top_key in ["study_video"]:
-        recs += [np.random.choice(OFFLINE_RECO_POOL["focus"]), np.random.choice(OFFLINE_RECO_POOL["calm"])]
-    elif top_key in ["creation", "decorate"]:
-        recs += [np.random.choice(OFFLINE_RECO_POOL["creative"]), np.random.choice(OFFLINE_RECO_POOL["movement"])]
-    else:
-        recs += [np.random.choice(OFFLINE_RECO_POOL["calm"]), np.random.choice(OFFLINE_RECO_POOL["movement"])]
+def render_countdown(remaining: int):
+    components.html(
+        f"""
+        <div id="off" style="font-family:sans-serif; padding:12px 16px; border-radius:10px;
+             background:rgba(28,131,225,0.1); color:#0054a3;">📵 OFF 중…</div>
+        <script>
+          const end = Date.now() + {remaining} * 1000;
+          const el = document.getElementById("off");
+          function tick() {{
+            const left = Math.max(0, Math.round((end - Date.now()) / 1000));
+            const mm = String(Math.floor(left / 60)).padStart(2, "0");
+            const ss = String(left % 60).padStart(2, "0");
+            el.textContent = left > 0 ? `📵 OFF 중… ${{mm}}:${{ss}}` : "⏳ 마무리 중…";
+            if (left > 0) setTimeout(tick, 1000);
+          }}
+          tick();
+        </script>
+        """,
+        height=60,
+    )
 
-    # 하나 더
-    recs.append(np.random.choice(OFFLINE_RECO_POOL["social"]))
-    return recs, top_key
+@st.fragment
+@timed_fragment("off_timer")
+def off_timer_panel():
+    st.markdown("<div class='card'><div class='big'>⏳ OFF 타이머</div><div class='muted'>짧게 쉬고 돌아오면 집중이 확 올라가요</div></div>", unsafe_allow_html=True)
+    minutes = st.select_slider("타이머 길이(분)", options=[5, 10, 15, 20, 30], value=10)
+
+    col_t1, col_t2 = st.columns([1, 1])
+    with col_t1:
+        start_timer = st.button("타이머 시작")
+    with col_t2:
+        fast_demo = st.button("데모(10초)")  # 테스트용
+
+    if start_timer or fast_demo:
+        seconds = 10 if fast_demo else int(minutes * 60)
+        now = time.time()
+        st.session_state["off_timer"] = {"start": now, "end": now + seconds, "done": False}
+
+    off = st.session_state.get("off_timer")
+    if not off:
+        return
+
+    # 이미 끝난 타이머: 자동 rerun 없이 결과만 보여줌
+    # (run_every 프래그먼트를 만들지 않으면 Streamlit이 남아 있던 자동 rerun도 멈춤)
+    left = off["end"] - time.time()
+    if left <= 0:
+        finish_off_timer(off)
+        return
+
+    # 남은 시간만큼 뒤에 한 번 자동 rerun (그 사이 서버 작업 없음)
+    @st.fragment(run_every=int(left) + 1)
+    @timed_fragment("off_timer")
+    def off_timer_status():
+        t = st.session_state.get("off_timer")
+        if not t:
+            return
+        remaining = int(t["end"] - time.time())
+        if remaining > 0:
+            render_countdown(remaining)
+            return
+        finish_off_timer(t)
+
+    off_timer_status()
+
+def finish_off_timer(off: dict):
+    st.success("끝! 돌아온 걸 환영해요 ✨ (물 한 잔 추천 💧)")
+    if not off["done"]:
+        off["done"] = True
+        st.toast("OFF 완료 🎉", icon="🌱")
 
 
 # =====================================================
 # 10) 기록 저장/로드(지난 기록 비교용)
+# - 세션마다 전체 기록을 불러두지 않음: 닉네임 목록은 매니페스트(user_summary),
+#   기록은 선택한 닉네임 파티션만 읽음
+# - 지난 날짜 중복 기록/보관 기간이 지난 기록은 정리 스레드(get_compactor, DIGI_KEEP_DAYS로 켬)가 주기적으로 접음
+# =====================================================
+@st.cache_resource(show_spinner=False)
+def get_log_store() -> LogStore:
+    return LogStore(LOG_DB, legacy_csv=LEGACY_LOG_CSV)
+
+@st.cache_resource(show_spinner=False)
+def get_log_writer() -> LogWriter:
+    """프로세스 공용 쓰기 큐(백그라운드 스레드). 만들 때 지난 저널을 먼저 재생"""
+    return LogWriter(get_log_store())
+
+@st.cache_resource(show_spinner=False)
+def get_compactor() -> Compactor | None:
+    """프로세스 공용 기록 정리 스레드(중복 정리 + 오래된 기록 주간 요약, log_compact.py). DIGI_KEEP_DAYS가 없으면 None"""
+    keep_days = keep_days_from_env()
+    return None if keep_days is None else Compactor(get_log_store(), keep_days=keep_days)
+
+def save_local_log(row: dict) -> bool:
+    """저널(fsync)에 쓰고 바로 돌아옴 — DB 반영은 쓰기 큐 스레드가 모아서 처리"""
+    return get_log_writer().submit(row)
+
+def import_log_csv(uploaded, replace: bool) -> tuple[dict, dict]:
+    """업로드한 지난 기록 CSV → 검증/보정/배치 점수 → 한 트랜잭션 저장"""
+    rows, report = prepare_import(read_import_csv(uploaded), segments=bench()["segments"])
+    return report, get_log_store().import_rows(rows, replace=replace)
+
+def export_weekly_csv(nickname) -> io.BytesIO:
+    """보관 주간 요약(compact로 접힌 예전 기록) CSV — 주 수만큼이라 작음"""
+    buf = io.BytesIO()
+    get_log_store().user_weekly(nickname).to_csv(buf, index=False, encoding="utf-8-sig")
+    buf.seek(0)
+    return buf
+
+def export_log_csv(nickname, date_from: str, date_to: str, compress: bool) -> io.BytesIO:
+    """다운로드 버튼을 눌렀을 때만 실행. 청크 단위로 써서 DataFrame 전체/CSV 문자열을 동시에 들고 있지 않음"""
+    buf = io.BytesIO()
+    get_log_store().write_csv(buf, nickname=nickname, date_from=date_from, date_to=date_to, compress=compress)
+    buf.seek(0)
+    return buf
+
+
+# =====================================================
+# 10-1) 리포트 차트 캐시
+# - 그린 데이터 내용(해시)이 같으면 PNG를 다시 그리지 않음(LRU, 최대 32개)
+# - 전역 plt 상태 대신 Figure 객체를 만들고 저장 직후 바로 비움
+# - matplotlib은 차트를 처음 그릴 때 import(시작 시간에서 약 0.5초 빠짐)
 # =====================================================
-def load_local_log() -> pd.DataFrame:
-    if os.path.exists(LOG_FILE):
-        try:
-            return read_csv_best_effort(LOG_FILE)
-        except Exception:
-            return pd.DataFrame()
-    return pd.DataFrame()
+def _figure_png(fig) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    fig.clear()
+    return buf.getvalue()
 
-def save_local_log(df: pd.DataFrame) -> bool:
-    try:
-        df.to_csv(LOG_FILE, index=False, encoding="utf-8-sig")
-        return True
-    except Exception:
-        return False
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_pie_png(values: tuple, labels: tuple) -> bytes:
+    from matplotlib.figure import Figure
 
-if "log_df" not in st.session_state:
-    st.session_state["log_df"] = load_local_log()
+    fig = Figure()
+    ax = fig.subplots()
+    ax.pie(values, labels=labels, autopct="%1.0f%%")
+    return _figure_png(fig)
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_line_png(dates: tuple, series: tuple, ylabel: str) -> bytes:
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
+    ax.plot(dates, series, marker="o")
+    ax.set_xlabel("Date")
+    ax.set_ylabel(ylabel)
+    fig.autofmt_xdate()
+    return _figure_png(fig)
+
+
+# 쓰기 큐는 첫 실행에서 바로 만듦 → 지난 실행이 죽으면서 남긴 저널을 리포트보다 먼저 재생
+get_log_writer()
 
 # =====================================================
 # 🔥 11) 탭
 # =====================================================
-tab1, tab2 = st.tabs(["✨ 오늘 기록", "📊 리포트·비교"])
+COACHING_KEY = "coaching"   # 마지막 코칭 결과(탭1) — 폼 제출이 아닌 rerun에서도 다시 그림
+
+# on_change="rerun": 선택된 탭을 서버가 알 수 있음 → 리포트/통계는 열려 있을 때만 계산(tab.open)
+tab1, tab2, tab3 = st.tabs(["✨ 오늘 기록", "📊 리포트·비교", "👥 전체 통계"], key="view", on_change="rerun")
 
 
 # =====================================================
@@ -328,43 +416,52 @@ with tab1:
     avatars = ["🧑‍🎤", "🧑‍🚀", "🧑‍💻", "🧑‍🎨", "🧑‍🍳", "🧑‍🏫", "🧑‍🔬", "🧑‍🎧", "🧑‍🌿"]
     c1, c2, c3, c4 = st.columns([1.3, 1.1, 1.6, 1.1])
     with c1:
-        nickname = st.text_input("닉네임", value="나", max_chars=12)
+        nickname = st.text_input("닉네임", value="나", max_chars=NICKNAME_MAX)
     with c2:
         avatar = st.selectbox("아바타", avatars, index=1)
     with c3:
-        gender = st.segmented_control("성별", options=["남", "여", "기타/비공개"], default="기타/비공개")
+        gender = st.segmented_control("성별", options=GENDERS, default=DEFAULT_GENDER)
     with c4:
-        age = st.selectbox("나이", list(range(10, 20)), index=6)
+        age = st.selectbox("나이", list(range(AGE_RANGE[0], AGE_RANGE[1] + 1)), index=6)
 
-    daytype = st.segmented_control("오늘은?", options=["주중", "주말"], default="주중")
+    daytype = st.segmented_control("오늘은?", options=DAYTYPES, default=DAYTYPES[0])
 
     # 🔥 (1) 무드 체크
     st.markdown("<div class='card'><div class='big'>🫧 오늘 컨디션</div><div class='subtle'>한 줄만 체크해도 패턴이 더 잘 보여요</div></div>", unsafe_allow_html=True)
     m1, m2, m3 = st.columns(3)
     with m1:
-        mood = st.selectbox("기분", ["🙂 좋아", "😐 보통", "🙁 별로"])
+        mood = st.selectbox("기분", MOODS)
     with m2:
-        focus = st.selectbox("집중", ["🔥 잘됨", "➖ 보통", "🫥 안됨"])
+        focus = st.selectbox("집중", FOCUS_LEVELS)
     with m3:
-        sleep = st.selectbox("수면", ["😴 충분", "😪 보통", "🥱 부족"])
+        sleep = st.selectbox("수면", SLEEP_LEVELS)
 
     # 디지털 활동 입력(세부)
-    st.markdown("<div class='card'><div class='big'>📲 오늘의 디지털 활동</div><div class='subtle'>분 단위로 세부 입력 → 자동 분석</div></div>", unsafe_allow_html=True)
+    st.markdown("<div class='card'><div class='big'>📲 오늘의 디지털 활동</div><div class='subtle'>분 단위로 세부 입력 → ‘입력 반영하기’로 한 번에 분석</div></div>", unsafe_allow_html=True)
 
+    # 9개 슬라이더는 폼으로 묶음 → 움직이는 동안은 rerun 없음, “입력 반영하기”를 누를 때 1번만 계산
+    # 코칭 버튼도 같은 폼의 제출 버튼 → 반영하지 않은 슬라이더 값으로 저장되는 일이 없음
     values = {}
-    left, right = st.columns(2)
-    with left:
-        values["gaming"] = st.slider("🎮 게임 (분)", 0, 600, 60, 5)
-        values["youtube"] = st.slider("📺 유튜브·영상 (분)", 0, 600, 90, 5)
-        values["social"] = st.slider("📸 인스타·SNS (분)", 0, 600, 60, 5)
-        values["study_video"] = st.slider("🧠 동영상 강의(학습) (분)", 0, 600, 40, 5)
-    with right:
-        values["creation"] = st.slider("🎬 영상 제작 (분)", 0, 600, 0, 5)
-        values["decorate"] = st.slider("✨ 꾸미미·편집 (분)", 0, 600, 10, 5)
-        values["chat"] = st.slider("💬 채팅·메신저 (분)", 0, 600, 20, 5)
-        values["music"] = st.slider("🎧 음악 (분)", 0, 600, 30, 5)
-        values["web"] = st.slider("🌐 웹서핑 (분)", 0, 600, 20, 5)
-
+    with st.form("activity_form", border=False):
+        left, right = st.columns(2)
+        with left:
+            values["gaming"] = st.slider("🎮 게임 (분)", *MINUTES_RANGE, 60, 5)
+            values["youtube"] = st.slider("📺 유튜브·영상 (분)", *MINUTES_RANGE, 90, 5)
+            values["social"] = st.slider("📸 인스타·SNS (분)", *MINUTES_RANGE, 60, 5)
+            values["study_video"] = st.slider("🧠 동영상 강의(학습) (분)", *MINUTES_RANGE, 40, 5)
+        with right:
+            values["creation"] = st.slider("🎬 영상 제작 (분)", *MINUTES_RANGE, 0, 5)
+            values["decorate"] = st.slider("✨ 꾸미미·편집 (분)", *MINUTES_RANGE, 10, 5)
+            values["chat"] = st.slider("💬 채팅·메신저 (분)", *MINUTES_RANGE, 20, 5)
+            values["music"] = st.slider("🎧 음악 (분)", *MINUTES_RANGE, 30, 5)
+            values["web"] = st.slider("🌐 웹서핑 (분)", *MINUTES_RANGE, 20, 5)
+        b1, b2 = st.columns(2)
+        with b1:
+            st.form_submit_button("📊 입력 반영하기", use_container_width=True)
+        with b2:
+            coach = st.form_submit_button("🧠 오늘 코칭 받기", use_container_width=True)
+
+    timer().lap("tab1.inputs")
     total_min = minutes_sum(values)
     score = weighted_score(values)
     level = level_from_score(score)
@@ -394,6 +491,8 @@ with tab1:
         unsafe_allow_html=True
     )
 
+    timer().lap("tab1.kpi")
+
     # (5) TOP3 자동 문장
     sorted_cats = sorted(values.items(), key=lambda x: x[1], reverse=True)
     top3 = [(k, v) for k, v in sorted_cats if v > 0][:3]
@@ -408,86 +507,59 @@ with tab1:
     ratio_df = pd.DataFrame({"비율(%)": [s_ratio, e_ratio]}, index=["학습(동영상 강의)", "오락/기타"])
     st.bar_chart(ratio_df)
 
+    timer().lap("tab1.top3_ratio")
+
     # (8) “근거 한 줄” — 자연스러운 벤치마크 표시(공공데이터 언급 없음)
     video_min = int(values["youtube"])
     bucket = video_bucket(video_min)
-    above_share = approx_above_share(bucket, BENCH_VIEW_DIST)
+    # 프로필(나이/성별)에 가장 가까운 또래 그룹과 비교
+    segments = bench()["segments"]
+    peer = segments[resolve_segment(segments, age, gender)]
+    view_pct = view_percentile(video_min, peer["view_cdf"])
+    above_share = 100.0 - view_pct
 
-    st.markdown("<div class='card'><div class='big'>📌 오늘의 비교 포인트</div><div class='muted'>내 기록이 어느 쪽에 가까운지 참고용으로 보여줘요</div></div>", unsafe_allow_html=True)
+    st.markdown(f"<div class='card'><div class='big'>📌 오늘의 비교 포인트</div><div class='muted'>비교 그룹: <b>{peer['label']}</b> · 내 기록이 어느 쪽에 가까운지 참고용으로 보여줘요</div></div>", unsafe_allow_html=True)
     st.write(f"- 영상 시청: **{video_min}분** → 구간 **{bucket}**")
-    if not np.isnan(above_share):
-        st.write(f"- 같은 구간 이상(더 많이 보는 쪽 포함) 비율: **약 {above_share:.1f}%**")
-        st.caption("※ 분포 기반의 참고 지표(정확한 퍼센타일은 아님)")
+    st.write(f"- 나보다 더 많이 보는 비율: **약 {above_share:.1f}%** (내 위치: 하위 {view_pct:.0f}%)")
+    gender_seg = segments.get(GENDER_SEGMENTS.get(gender))
+    if gender_seg is not None and gender_seg is not peer:
+        st.write(f"- 같은 성별({gender_seg['label']}) 기준 더 많이 보는 비율: **약 {100.0 - view_percentile(video_min, gender_seg['view_cdf']):.1f}%**")
+    st.caption("※ 구간 분포를 구간 안에서 고르게 나눠 계산한 참고 지표")
 
     # 학습비율 벤치마크 한 줄
-    st.write(f"- 학습 비율: **{s_ratio:.1f}%** (참고 평균: 학습 **{BENCH_STUDY_MEAN:.1f}%**, 비학습 **{BENCH_NONSTUDY_MEAN:.1f}%**)")
+    st.write(f"- 학습 비율: **{s_ratio:.1f}%** (참고 평균: 학습 **{peer['study_mean']:.1f}%**, 비학습 **{peer['nonstudy_mean']:.1f}%**)")
+
+    # 같은 학년대 과의존 위험군 비율(미리 계산한 표에서 나이로 조회)
+    grades = grade_risk()
+    if age in grades:
+        grade, risk = grades[age]
+        phone, net = risk["smartphone"], risk["internet"]
+        st.write(
+            f"- 같은 학년대(**{grade}**) 과의존 위험·주의군: 스마트폰 **{phone['at_risk_pct']:.1f}%** "
+            f"(위험 {phone['risk_pct']:.1f}%) · 인터넷 **{net['at_risk_pct']:.1f}%** (위험 {net['risk_pct']:.1f}%)"
+        )
+        if gender in ("남", "여"):
+            share_key = "male_pct" if gender == "남" else "female_pct"
+            st.write(f"- 그중 {'남학생' if gender == '남' else '여학생'} 비중: 스마트폰 **{phone[share_key]:.0f}%** · 인터넷 **{net[share_key]:.0f}%**")
+
+    timer().lap("tab1.compare")
 
     # =================================================
     # 분석/코칭
+    # - 코칭 결과는 session_state에 보관 → 탭 전환/타이머 버튼처럼 폼 제출이 아닌 rerun에도
+    #   코칭 카드/퀘스트/OFF 타이머가 그대로 남음 (저장은 코칭 버튼을 누른 실행에서 1번만)
+    # - 날짜나 닉네임이 바뀌면 지난 코칭은 버림
     # =================================================
-    if st.button("🧠 오늘 코칭 받기", use_container_width=True):
-        st.markdown("<div class='card'><div class='big'>🎯 오늘의 코칭</div><div class='muted'>오늘 패턴에 맞춘 퀘스트를 준비했어요</div></div>", unsafe_allow_html=True)
-
+    today_key = date.today().isoformat()
+    if coach:
         # 추천 생성
         recos, top_key = pick_recos(values, level)
-        top_label = LABEL_MAP.get(top_key, top_key)
-
-        st.markdown(
-            f"""
-            <div class="card">
-              <div class="big">📍 오늘 TOP 패턴</div>
-              <div class="muted"><b>{top_label}</b> 비중이 가장 커요. 그래서 이 패턴에 맞춘 추천을 골랐어요.</div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-
-        # (3) 퀘스트 체크(완료 체크)
-        st.markdown("<div class='card'><div class='big'>✅ 오늘의 퀘스트</div><div class='muted'>완료하면 체크해보자!</div></div>", unsafe_allow_html=True)
-        quest_done = 0
-        quest_keys = []
-        today_key = date.today().isoformat()
-        for i, r in enumerate(recos, 1):
-            key = f"quest_{today_key}_{nickname}_{i}"
-            quest_keys.append(key)
-            checked = st.checkbox(f"퀘스트 {i}: {r}", key=key)
-            quest_done += 1 if checked else 0
-
-        if quest_done == len(recos):
-            st.success("완벽해요! 오늘 퀘스트 올클리어 🎉")
-            st.balloons()
-        elif quest_done > 0:
-            st.info(f"좋아요! {quest_done}/{len(recos)}개 완료했어요 👏")
-
-        # (7) OFF 타이머 (간단 + 실제 카운트다운)
-        st.markdown("<div class='card'><div class='big'>⏳ OFF 타이머</div><div class='muted'>짧게 쉬고 돌아오면 집중이 확 올라가요</div></div>", unsafe_allow_html=True)
-        minutes = st.select_slider("타이머 길이(분)", options=[5, 10, 15, 20, 30], value=10)
-
-        col_t1, col_t2 = st.columns([1, 1])
-        with col_t1:
-            start_timer = st.button("타이머 시작")
-        with col_t2:
-            fast_demo = st.button("데모(10초)")  # 테스트용
-
-        if start_timer or fast_demo:
-            seconds = 10 if fast_demo else int(minutes * 60)
-            ph = st.empty()
-            end = time.time() + seconds
-            while True:
-                remaining = int(end - time.time())
-                if remaining <= 0:
-                    break
-                mm = remaining // 60
-                ss = remaining % 60
-                ph.info(f"📵 OFF 중… {mm:02d}:{ss:02d}")
-                time.sleep(1)
-            ph.success("끝! 돌아온 걸 환영해요 ✨ (물 한 잔 추천 💧)")
-            st.toast("OFF 완료 🎉", icon="🌱")
+        st.session_state[COACHING_KEY] = {"date": today_key, "nickname": nickname, "recos": tuple(recos), "top_key": top_key}
 
         # 기록 저장(로컬 + 세션)
         now = datetime.now().strftime("%H:%M:%S")
         row = {
-            "date": date.today().isoformat(),
+            "date": today_key,
             "time": now,
             "nickname": nickname,
             "avatar": avatar,
@@ -503,52 +575,182 @@ with tab1:
             "study_ratio": round(s_ratio, 2),
             "video_bucket": bucket,
             "video_min": video_min,
-            "bench_above_share": round(float(above_share), 2) if not np.isnan(above_share) else "",
-            "bench_study_mean": round(BENCH_STUDY_MEAN, 2),
+            "bench_above_share": round(above_share, 2),
+            "bench_study_mean": round(peer["study_mean"], 2),
             **values
         }
 
-        df = st.session_state["log_df"].copy()
-        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+        # 쓰기 큐에 행 1개만 넣음 (같은 날짜+닉네임은 리포트에서 마지막 기록만 사용)
+        saved = save_local_log(row)
 
-        # 같은 날짜+닉네임이면 최신 기록으로 덮어쓰기(옵션)
-        # df = df.drop_duplicates(subset=["date", "nickname"], keep="last").reset_index(drop=True)
+    coaching = st.session_state.get(COACHING_KEY)
+    if coaching and (coaching["date"], coaching["nickname"]) != (today_key, nickname):
+        del st.session_state[COACHING_KEY]
+        coaching = None
 
-        st.session_state["log_df"] = df
-        save_local_log(df)
+    if coaching:
+        st.markdown("<div class='card'><div class='big'>🎯 오늘의 코칭</div><div class='muted'>오늘 패턴에 맞춘 퀘스트를 준비했어요</div></div>", unsafe_allow_html=True)
+        top_label = LABEL_MAP.get(coaching["top_key"], coaching["top_key"])
 
-        st.success("저장 완료! ‘리포트·비교’ 탭에서 지난 기록과 비교할 수 있어요.")
+        st.markdown(
+            f"""
+            <div class="card">
+              <div class="big">📍 오늘 TOP 패턴</div>
+              <div class="muted"><b>{top_label}</b> 비중이 가장 커요. 그래서 이 패턴에 맞춘 추천을 골랐어요.</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
 
-    st.caption("※ 기록은 로컬 CSV(digi_balance_log.csv)로 저장을 시도하며, 리포트에서 내려받을 수 있어요.")
+        # (3) 퀘스트 체크(완료 체크) — 프래그먼트라 체크해도 코칭 화면이 사라지지 않음
+        quest_panel(coaching["recos"], coaching["nickname"])
+
+        # (7) OFF 타이머 (논블로킹: 프래그먼트 + 브라우저 카운트다운)
+        off_timer_panel()
+
+    if coach:
+        if saved:
+            st.success("저장 완료! ‘리포트·비교’ 탭에서 지난 기록과 비교할 수 있어요.")
+        else:
+            st.error(f"기록을 저장하지 못했어요: {get_log_writer().stats()['last_error']}")
+        timer().lap("tab1.coaching_save")
+
+    st.caption("※ 기록은 로컬 DB(digi_balance_log.db)에 저장되며, 리포트에서 CSV로 내려받을 수 있어요.")
 
 
 # =====================================================
 # TAB 2: 리포트·비교 (지난 기록 비교)
 # =====================================================
-with tab2:
+REPORT_DAILY_COLUMNS = ["date", "total_min", "score", "study_ratio", "mood", "sleep", *CATEGORY_KEYS]
+REPORT_ENTRY_COLUMNS = ["date", "time", "level", "video_min", "age", "gender", *REPORT_DAILY_COLUMNS[1:]]
+LOG_CACHE_ENTRIES = 64   # 공유 캐시에 남겨 두는 닉네임 수(현재 버전 기준)
+
+# 공유 읽기 캐시(프로세스 전체에서 1벌)
+# - 키에 기록 버전(meta.data_version)을 넣음 → 누가 저장하면 다음 조회 때 새로 읽음
+# - 버전이 올라가면 fresh_version이 지난 버전 항목을 한 번에 비움(옛 DataFrame이 메모리에 남지 않게)
+# - cache_resource라 세션마다 복사하지 않고 같은 DataFrame을 나눠 씀
+#   → 화면 코드는 읽기만(열 추가/변경 금지). 세션은 필터한 결과만 잠깐 들고 감
+@st.cache_resource(show_spinner=False)
+def _seen_versions() -> dict:
+    """캐시 묶음별로 마지막으로 본 기록 버전(프로세스 전체 1벌)"""
+    return {"lock": threading.Lock(), "seen": {}}
+
+def fresh_version(group: str, *caches) -> int:
+    """기록 버전을 읽고, 이 묶음이 본 것보다 새 버전이면 caches의 지난 버전 항목을 비움"""
+    version = get_log_store().data_version()
+    state = _seen_versions()
+    with state["lock"]:
+        seen = state["seen"].get(group)
+        if seen is None or version > seen:
+            if seen is not None:
+                for cache in caches:
+                    cache.clear()
+            state["seen"][group] = version
+    return version
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def shared_summaries(version: int) -> pd.DataFrame:
+    return get_log_store().user_summaries()
+
+@st.cache_resource(max_entries=LOG_CACHE_ENTRIES, show_spinner=False)
+def shared_entries(nickname: str, version: int) -> pd.DataFrame:
+    """기록 목록: 현재 기준 재점수 + 시청 퍼센타일(행마다 그 프로필의 또래 그룹 기준 — 탭1과 같음), 최근 기록부터"""
+    entries = rescore_log(get_log_store().fetch(nickname=nickname, columns=REPORT_ENTRY_COLUMNS))
+    entries["view_pct"] = peer_view_percentile(
+        entries["age"], entries["gender"], entries["video_min"].fillna(0), bench()["segments"]).round(1)
+    return entries.sort_values(["date", "time"], ascending=[False, False])
+
+@st.cache_resource(max_entries=LOG_CACHE_ENTRIES, show_spinner=False)
+def shared_weekly(nickname: str, version: int) -> pd.DataFrame:
+    return get_log_store().user_weekly(nickname)
+
+@st.cache_resource(max_entries=LOG_CACHE_ENTRIES, show_spinner=False)
+def shared_daily(nickname: str, version: int) -> pd.DataFrame:
+    """날짜별 마지막 기록(롤업 daily_latest): 현재 기준 재점수 + 날짜 파싱"""
+    user_df = rescore_log(get_log_store().user_daily(nickname, columns=REPORT_DAILY_COLUMNS))
+    user_df["date"] = pd.to_datetime(user_df["date"], errors="coerce")
+    user_df = user_df.dropna(subset=["date"])
+    user_df["date_str"] = user_df["date"].dt.date.astype(str)
+    return user_df
+
+
+@st.fragment
+@timed_fragment("report")
+def report_view(nickname: str):
+    """
+    리포트 탭 본문 (프래그먼트)
+    - 탭이 열려 있을 때만 호출 → 탭1 슬라이더를 움직여도 여기는 계산하지 않음
+    - 닉네임/날짜 선택·내보내기 등 리포트 안의 입력은 이 함수만 다시 실행
+    """
     st.markdown("<div class='card'><div class='big'>📊 리포트 · 지난 기록 비교</div><div class='subtle'>전 기록과 비교해서 변화가 보이게</div></div>", unsafe_allow_html=True)
 
-    log_df = st.session_state["log_df"].copy()
-    if log_df.empty:
+    # 지난 기록 일괄 가져오기(날짜별 카테고리 분 CSV)
+    with st.expander("⬆️ 지난 기록 CSV 가져오기"):
+        st.caption("date, nickname, 카테고리별 분(gaming, youtube, …) 컬럼이 필요해요. 같은 날짜+닉네임은 하루 1개로 정리돼요.")
+        uploaded = st.file_uploader("CSV 파일", type=["csv"])
+        replace = st.checkbox("같은 날짜+닉네임 기록이 이미 있으면 새 값으로 바꾸기", value=True)
+        if uploaded is not None and st.button("가져오기", use_container_width=True):
+            try:
+                report, result = import_log_csv(uploaded, replace)
+                st.success(
+                    f"{result['inserted']:,}행 저장 (교체 {result['replaced']:,} · 건너뜀 {result['skipped']:,} · "
+                    f"버린 행 {report['invalid']:,} · 범위 보정 {report['clipped_cells']:,}칸 · 파일 내 중복 {report['duplicates']:,})"
+                )
+            except ValueError as e:
+                st.error(f"가져오지 못했어요: {e}")
+
+    # 닉네임 목록/요약은 롤업(user_summary + 보관 주간 요약)에서만 읽음 → 전체 기록을 훑지 않음
+    store = get_log_store()
+    version = fresh_version("report", shared_summaries, shared_entries, shared_weekly, shared_daily)
+    summaries = shared_summaries(version)
+    if summaries.empty:
         st.info("아직 저장된 기록이 없어요. ‘오늘 기록’에서 코칭 받기까지 눌러 저장해보세요 🙂")
-        st.stop()
+        return
 
-    # 날짜 정리
-    log_df["date"] = pd.to_datetime(log_df["date"], errors="coerce")
-    log_df = log_df.dropna(subset=["date"]).sort_values("date")
+    nicknames = summaries["nickname"].tolist()
+    default_idx = nicknames.index(nickname) if nickname in nicknames else len(nicknames)-1
+    selected_nick = st.selectbox("비교할 닉네임", nicknames, index=default_idx)
+    summ = summaries.set_index("nickname").loc[selected_nick]
+    st.markdown(
+        f"""
+        <div class="card">
+          <span class="pill">기록 <b>{int(summ['entries'])}개</b></span>
+          <span class="pill">기록한 날 <b>{int(summ['days'])}일</b></span>
+          <span class="pill">하루 평균 <b>{summ['avg_total_min']:.0f}분</b></span>
+          <span class="pill">평균 점수 <b>{summ['avg_score']:.0f}</b></span>
+          {f"<span class='pill'>보관 <b>{int(summ['archived_days'])}일</b></span>" if summ['archived_days'] else ""}
+          <div class="muted tiny" style="margin-top:8px;">{summ['first_date']} ~ {summ['last_date']}</div>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-    # 기록 목록(핵심만)
+    timer().lap("tab2.summary")
+
+    # 기록 목록(선택 닉네임만, 현재 기준으로 배치 재계산 + 시청 퍼센타일)
+    entries = shared_entries(selected_nick, version)
+    weekly = shared_weekly(selected_nick, version)  # 정리(compact)로 접힌 예전 기록: 주마다 하루 평균
     st.markdown("<div class='card'><div class='big'>🗂️ 기록 목록</div><div class='muted'>최근 기록부터 쌓여요</div></div>", unsafe_allow_html=True)
-    cols = [c for c in ["date","time","nickname","total_min","score","level","study_ratio","mood","sleep"] if c in log_df.columns]
-    st.dataframe(log_df[cols].sort_values(["date","time"], ascending=[False, False]), use_container_width=True, hide_index=True)
+    if entries.empty and not weekly.empty:
+        # 하루 기록이 모두 보관된 닉네임 → 주간 요약을 대신 보여줌
+        st.caption("하루 기록은 모두 보관됐어요. 주마다 하루 평균으로 보여줘요.")
+        st.dataframe(
+            weekly[["week", "days", "total_min", "score"]].sort_values("week", ascending=False).round(0),
+            use_container_width=True, hide_index=True,
+        )
+    else:
+        cols = ["date","time","total_min","score","level","study_ratio","view_pct","mood","sleep"]
+        st.dataframe(
+            entries[cols],
+            use_container_width=True, hide_index=True,
+            column_config={"date": st.column_config.DateColumn("date", format="YYYY-MM-DD")},
+        )
 
-    # 닉네임 선택
-    st.markdown("<div class='card'><div class='big'>🆚 기록 비교</div><div class='muted'>두 날짜를 선택해서 변화(분)를 확인해요</div></div>", unsafe_allow_html=True)
-    nicknames = sorted(log_df["nickname"].dropna().unique().tolist())
-    selected_nick = st.selectbox("비교할 닉네임", nicknames, index=len(nicknames)-1)
+    timer().lap("tab2.records")
 
-    user_df = log_df[log_df["nickname"] == selected_nick].copy().sort_values(["date","time"])
-    user_df["date_str"] = user_df["date"].dt.date.astype(str)
+    # 비교/추세: 날짜별 마지막 기록(롤업 daily_latest)에서 쓰는 컬럼만 읽음
+    st.markdown("<div class='card'><div class='big'>🆚 기록 비교</div><div class='muted'>두 날짜를 선택해서 변화(분)를 확인해요</div></div>", unsafe_allow_html=True)
+    user_df = shared_daily(selected_nick, version)
 
     dates = user_df["date_str"].unique().tolist()
     if len(dates) < 2:
@@ -587,39 +789,159 @@ with tab2:
         st.markdown("<div class='card'><div class='big'>📲 카테고리별 변화(분)</div><div class='muted'>+면 늘고, -면 줄었어요</div></div>", unsafe_allow_html=True)
         st.bar_chart(diffs_df)
 
+        timer().lap("tab2.compare")
+
         # A일 카테고리 파이
         st.markdown("<div class='card'><div class='big'>🍰 기준 날짜(A) 카테고리 비중</div></div>", unsafe_allow_html=True)
-        values_a = [int(A.get(k, 0)) for k in cat_keys]
+        values_a = [int(v) for v in pd.to_numeric(A[cat_keys], errors="coerce").fillna(0)]
         labels = [LABEL_MAP.get(k, k) for k in cat_keys]
         if sum(values_a) == 0:
             st.info("기준 날짜 기록에 시간이 없어요.")
         else:
-            plt.figure()
-            plt.pie(values_a, labels=labels, autopct="%1.0f%%")
-            st.pyplot(plt.gcf(), clear_figure=True)
+            st.image(render_pie_png(tuple(values_a), tuple(labels)))
+
+        timer().lap("tab2.pie")
 
     # 추세 그래프(닉네임 기준)
     st.markdown("<div class='card'><div class='big'>📈 추세</div><div class='muted'>총합/점수 변화 (선택 닉네임)</div></div>", unsafe_allow_html=True)
-    plot_df = user_df.copy()
-    plt.figure()
-    plt.plot(plot_df["date"], plot_df["total_min"], marker="o")
-    plt.xlabel("Date")
-    plt.ylabel("Minutes")
-    st.pyplot(plt.gcf(), clear_figure=True)
-
-    plt.figure()
-    plt.plot(plot_df["date"], plot_df["score"], marker="o")
-    plt.xlabel("Date")
-    plt.ylabel("Score")
-    st.pyplot(plt.gcf(), clear_figure=True)
-
-    # CSV 다운로드
-    st.download_button(
-        "⬇️ 내 기록 CSV 다운로드",
-        data=log_df.assign(date=log_df["date"].dt.date.astype(str)).to_csv(index=False, encoding="utf-8-sig"),
-        file_name="digi_balance_log.csv",
-        mime="text/csv",
-        use_container_width=True
-    )
+    if len(dates) + len(weekly) >= 2:  # 점 하나짜리 선 그래프는 그리지 않음(matplotlib도 로드하지 않음)
+        # 보관 주 + 하루 기록을 날짜순으로(보관된 날짜를 다시 가져오면 하루 기록이 보관 구간 안에 올 수 있음)
+        trend_dates, minutes, scores = zip(*sorted(zip(
+            tuple(pd.to_datetime(weekly["week"]).dt.date) + tuple(user_df["date"].dt.date),
+            tuple(weekly["total_min"].round().astype(int)) + tuple(user_df["total_min"].fillna(0).astype(int)),
+            tuple(weekly["score"].round().astype(int)) + tuple(user_df["score"].fillna(0).astype(int)),
+        )))
+        st.image(render_line_png(trend_dates, minutes, "Minutes"))
+        st.image(render_line_png(trend_dates, scores, "Score"))
+        if not weekly.empty:
+            st.caption(f"{weekly['week'].iloc[-1]} 주까지는 보관된 기록이라 주마다 하루 평균으로 보여줘요")
+
+    # 최근 7일 vs 30일 / 점수 EWMA / 연속 일수: 저장된 추세 상태(닉네임당 행 1개)만 읽음
+    trend = store.user_trend(selected_nick)
+    short, long = rolling_means(trend, SHORT_WINDOW), rolling_means(trend, TREND_WINDOW)
+    if short:
+        today_key = date.today().isoformat()
+        t1, t2, t3, t4 = st.columns(4)
+        t1.metric(f"최근 {SHORT_WINDOW}일 평균", f"{short['total_min']:.0f}분",
+                  f"{short['total_min'] - long['total_min']:+.0f}분 vs {TREND_WINDOW}일", delta_color="inverse")
+        t2.metric("점수 추세(EWMA)", f"{trend['ewma']:.0f}",
+                  f"{trend['ewma'] - trend['ewma_prev']:+.1f}" if trend["ewma_prev"] is not None else None, delta_color="inverse")
+        t3.metric("LOW 연속", f"{low_streak(trend, today_key)}일")
+        t4.metric("퀘스트 올클리어 연속", f"{quest_streak(trend, today_key)}일")
+        cat_trend = pd.DataFrame({
+            "카테고리": [LABEL_MAP.get(k, k) for k in CATEGORY_KEYS],
+            f"최근 {SHORT_WINDOW}일(분)": [round(short[k], 1) for k in CATEGORY_KEYS],
+            f"최근 {TREND_WINDOW}일(분)": [round(long[k], 1) for k in CATEGORY_KEYS],
+        })
+        st.dataframe(cat_trend, use_container_width=True, hide_index=True)
+        st.caption(f"기록한 날 기준 평균 (최근 {SHORT_WINDOW}일 {short['days']}일 · {TREND_WINDOW}일 {long['days']}일)")
+
+    timer().lap("tab2.trend")
+
+    # CSV 내보내기: 버튼을 누를 때만 청크 단위로 생성(rerun마다 만들지 않음)
+    with st.expander("⬇️ 기록 CSV 내보내기"):
+        all_nicks = st.checkbox("모든 닉네임 포함", value=False)
+        span = summaries if all_nicks else summaries[summaries["nickname"] == selected_nick]
+        first_day = pd.to_datetime(span["first_date"]).min().date()
+        last_day = pd.to_datetime(span["last_date"]).max().date()
+        period = st.date_input("기간", value=(first_day, last_day), min_value=first_day, max_value=last_day)
+        date_from, date_to = (tuple(period) + (last_day,))[:2] if period else (first_day, last_day)
+        use_gzip = st.checkbox("gzip으로 압축(.csv.gz)", value=False)
+
+        export_nick = None if all_nicks else selected_nick
+        st.download_button(
+            "⬇️ 내 기록 CSV 다운로드",
+            data=lambda: export_log_csv(export_nick, date_from.isoformat(), date_to.isoformat(), use_gzip),
+            file_name="digi_balance_log.csv.gz" if use_gzip else "digi_balance_log.csv",
+            mime="application/gzip" if use_gzip else "text/csv",
+            on_click="ignore",
+            use_container_width=True
+        )
+        if span["archived_days"].sum():
+            st.caption("오래된 기록은 주 단위로 보관돼 위 CSV에는 없어요. 주간 요약은 따로 내려받을 수 있어요.")
+            st.download_button(
+                "⬇️ 보관된 주간 요약 CSV 다운로드",
+                data=lambda: export_weekly_csv(export_nick),
+                file_name="digi_balance_weekly.csv",
+                mime="text/csv",
+                on_click="ignore",
+                use_container_width=True
+            )
 
     st.caption("팁: Streamlit Cloud는 저장이 초기화될 수 있으니, 기록 CSV는 가끔 내려받아 보관해두면 좋아요.")
+    timer().lap("tab2.download")
+
+
+with tab2:
+    if tab2.open:
+        report_view(nickname)
+
+
+# =====================================================
+# TAB 3: 전체 통계 (모든 닉네임 코호트)
+# - 저장할 때마다 갱신되는 집계 테이블(cohort_agg)만 읽음 → 기록이 수백만 행이어도 조합 수만큼만 읽음
+# =====================================================
+COHORT_DIM_LABELS = {"age": "나이", "gender": "성별", "daytype": "주중/주말", "level": "레벨", "mood": "기분", "sleep": "수면"}
+SCORE_BIN_LABELS = [f"{i * 10}~{i * 10 + 9}" for i in range(SCORE_BINS - 1)] + [f"{(SCORE_BINS - 1) * 10}~100"]
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def shared_cohort_stats(by: tuple, version: int) -> pd.DataFrame:
+    """집계 결과도 기록 버전별로 1벌만(모든 세션 공용, 읽기만)"""
+    return get_log_store().cohort_stats(list(by))
+
+@st.fragment
+@timed_fragment("cohort")
+def cohort_view():
+    st.markdown("<div class='card'><div class='big'>👥 전체 통계</div><div class='subtle'>기록한 모든 친구들의 하루 기록(날짜별 마지막 기록)을 묶어서 봐요</div></div>", unsafe_allow_html=True)
+
+    version = fresh_version("cohort", shared_cohort_stats)
+    dim = st.selectbox("묶는 기준", COHORT_DIMS, index=COHORT_DIMS.index("level"), format_func=COHORT_DIM_LABELS.get)
+    stats = shared_cohort_stats((dim,), version)
+    if stats.empty:
+        st.info("아직 저장된 기록이 없어요.")
+        return
+    stats = stats.set_index(stats[dim].astype(object).where(stats[dim].notna(), "(미입력)").astype(str).rename(dim))
+    if dim == "level":
+        stats = stats.reindex([lv for lv in LEVELS + ["(미입력)"] if lv in stats.index])
+
+    summary = stats[["n", "mean_total_min", "mean_score", "std_score"]].rename(
+        columns={"n": "기록 수", "mean_total_min": "평균 총합(분)", "mean_score": "평균 점수", "std_score": "점수 표준편차"}
+    )
+    st.dataframe(summary.round(1), use_container_width=True)
+
+    st.markdown("<div class='card'><div class='big'>📲 카테고리별 평균(분)</div></div>", unsafe_allow_html=True)
+    cat_means = stats[[f"mean_{k}" for k, _, _ in CATEGORIES]]
+    cat_means.columns = [LABEL_MAP[k] for k, _, _ in CATEGORIES]
+    st.bar_chart(cat_means)
+
+    st.markdown("<div class='card'><div class='big'>🎯 점수 분포</div><div class='muted'>10점 구간별 기록 수</div></div>", unsafe_allow_html=True)
+    hist = stats[[f"h{i}" for i in range(SCORE_BINS)]].T
+    hist.index = SCORE_BIN_LABELS
+    st.bar_chart(hist)
+
+    timer().lap("tab3.groups")
+
+    # 수면·기분과 사용 시간/점수
+    st.markdown("<div class='card'><div class='big'>😴 수면 · 기분과 사용 시간</div><div class='muted'>행: 수면, 열: 기분</div></div>", unsafe_allow_html=True)
+    cross = shared_cohort_stats(("sleep", "mood"), version).dropna(subset=["sleep", "mood"])
+    if cross.empty:
+        st.info("수면/기분을 입력한 기록이 아직 없어요.")
+        return
+    c1, c2 = st.columns(2)
+    with c1:
+        st.caption("평균 총합(분)")
+        st.dataframe(cross.pivot(index="sleep", columns="mood", values="mean_total_min").round(0), use_container_width=True)
+    with c2:
+        st.caption("평균 점수")
+        st.dataframe(cross.pivot(index="sleep", columns="mood", values="mean_score").round(1), use_container_width=True)
+
+    timer().lap("tab3.sleep_mood")
+
+with tab3:
+    if tab3.open:
+        cohort_view()
+
+# 기록 정리 스레드는 첫 화면을 다 그린 뒤 시작(첫 정리도 log_compact.START_DELAY 뒤)
+get_compactor()
+
+render_debug_panel()
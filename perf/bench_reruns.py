@@ -0,0 +1,210 @@
+"""
+헤드리스 rerun 벤치마크 (Streamlit AppTest)
+
+기록 DB 크기별로 main.py 전체 rerun 지연과 최대 메모리를 재서 JSON으로 남김.
+
+    python perf/bench_reruns.py                          # 1천 / 10만 / 100만 행
+    python perf/bench_reruns.py --sizes 1000,100000 --repeat 5
+    python perf/bench_reruns.py --baseline perf/baseline.json --tolerance 0.25
+
+측정 항목(크기마다):
+- cold_run      : 첫 실행(캐시 비어 있음)
+- slider_rerun  : 탭1 슬라이더 값 변경 → “입력 반영하기” 제출 rerun
+- coaching_save : 폼의 “🧠 오늘 코칭 받기” 제출 → 저장까지 rerun
+- report_rerun  : 탭2(리포트)를 연 상태에서 닉네임 선택 변경 후 rerun
+- peak_mem_mb   : 최대 RSS(크기마다 별도 프로세스에서 측정 → 캐시/메모리가 섞이지 않음.
+                  합성 DB는 부모 프로세스에서 미리 만들어 두고, 측정 프로세스는 앱 실행만 함)
+
+--baseline을 주면 p50 지연이 (1 + tolerance)배를 넘는 항목을 회귀로 보고 종료 코드 1.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_data import REQUIRED_BENCH_FILES, load_benchmarks, segment_index  # noqa: E402
+from cohort import cohort_log  # noqa: E402
+from log_store import LOG_DB, LogStore  # noqa: E402
+
+APP = os.path.join(ROOT, "main.py")
+LATENCY_METRICS = ["cold_run", "slider_rerun", "coaching_save", "report_rerun"]
+RESULT_PREFIX = "@@result "
+REPORT_TAB = "📊 리포트·비교"
+SUBMIT_LABEL = "📊 입력 반영하기"
+
+
+# =====================================================
+# 합성 기록 (cohort.py: 벤치마크 분포에서 뽑은 코호트)
+# =====================================================
+def prepare_workdir(n_rows: int, n_nicknames: int) -> str:
+    work = tempfile.mkdtemp(prefix=f"digi_bench_{n_rows}_")
+    for f in REQUIRED_BENCH_FILES:
+        shutil.copy(os.path.join(ROOT, f), work)
+    cwd = os.getcwd()
+    os.chdir(work)  # 벤치마크 CSV 경로는 작업 폴더 기준
+    try:
+        segments = segment_index(load_benchmarks())
+    finally:
+        os.chdir(cwd)
+    LogStore(os.path.join(work, LOG_DB), legacy_csv=None).extend(cohort_log(n_rows, n_nicknames, segments))
+    return work
+
+
+# =====================================================
+# 측정
+# =====================================================
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000.0
+
+def _summary(samples: list[float]) -> dict:
+    s = sorted(samples)
+    return {
+        "n": len(s),
+        "p50_ms": round(statistics.median(s), 2),
+        "p95_ms": round(s[min(len(s) - 1, int(round(0.95 * (len(s) - 1))))], 2),
+        "max_ms": round(s[-1], 2),
+    }
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+def bench_size(work: str, repeat: int) -> dict:
+    """준비된 작업 폴더(prepare_workdir)에서 앱을 돌려 측정. 합성 DB 생성은 측정에 포함하지 않음"""
+    from streamlit.testing.v1 import AppTest
+
+    cwd = os.getcwd()
+    os.chdir(work)
+    try:
+        at = AppTest.from_file(APP, default_timeout=600)
+        samples = {m: [] for m in LATENCY_METRICS}
+
+        samples["cold_run"].append(_timed(at.run))
+        _check(at)
+
+        for i in range(repeat):
+            at.slider[0].set_value(5 * (i % 20 + 1))
+            submit = next(b for b in at.button if b.label == SUBMIT_LABEL)
+            samples["slider_rerun"].append(_timed(lambda: submit.click().run()))
+            _check(at)
+
+        for _ in range(repeat):
+            button = next(b for b in at.button if "코칭" in b.label)
+            samples["coaching_save"].append(_timed(lambda: button.click().run()))
+            _check(at)
+
+        # 리포트 탭은 열려 있을 때만 그려짐. AppTest는 탭 선택을 보내지 않으므로 매번 지정
+        at.session_state["view"] = REPORT_TAB
+        at.run()
+        _check(at)
+        for i in range(repeat):
+            at.session_state["view"] = REPORT_TAB
+            nick_box = next(s for s in at.selectbox if s.label == "비교할 닉네임")
+            options = nick_box.options
+            samples["report_rerun"].append(_timed(lambda: nick_box.set_value(options[i % len(options)]).run()))
+            _check(at)
+
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # 리눅스: KB
+    finally:
+        os.chdir(cwd)
+
+    out = {"peak_mem_mb": round(peak_kb / 1024, 1)}
+    out.update({m: _summary(v) for m, v in samples.items()})
+    return out
+
+def bench_size_isolated(n_rows: int, n_nicknames: int, repeat: int) -> dict:
+    """크기 하나를 새 파이썬 프로세스에서 측정(콜드 스타트/최대 메모리를 분리하기 위함)
+    합성 DB는 여기(부모)에서 만들고 자식에는 작업 폴더만 넘김 → 시딩 메모리가 peak_mem_mb에 섞이지 않음"""
+    work = prepare_workdir(n_rows, n_nicknames)
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--one", work, "--repeat", str(repeat)],
+            capture_output=True, text=True,
+        )
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    lines = [ln for ln in proc.stdout.splitlines() if ln.startswith(RESULT_PREFIX)]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"{n_rows} rows 측정 실패:\n{proc.stderr[-2000:]}")
+    return {"rows": n_rows, "nicknames": n_nicknames, **json.loads(lines[-1][len(RESULT_PREFIX):])}
+
+
+# =====================================================
+# 기준선 비교
+# =====================================================
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    base_by_rows = {r["rows"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = base_by_rows.get(r["rows"])
+        if not b:
+            continue
+        for m in LATENCY_METRICS:
+            cur, old = r[m]["p50_ms"], b.get(m, {}).get("p50_ms")
+            if old and cur > old * (1 + tolerance):
+                regressions.append(f"{r['rows']:>9} rows  {m:<14} {old:>9.1f} → {cur:>9.1f} ms")
+        if b.get("peak_mem_mb") and r["peak_mem_mb"] > b["peak_mem_mb"] * (1 + tolerance):
+            regressions.append(f"{r['rows']:>9} rows  {'peak_mem_mb':<14} {b['peak_mem_mb']:>9.1f} → {r['peak_mem_mb']:>9.1f} MB")
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="1000,100000,1000000", help="기록 행 수 목록(쉼표 구분)")
+    ap.add_argument("--nicknames", type=int, default=1000, help="합성 닉네임 수")
+    ap.add_argument("--repeat", type=int, default=5, help="항목별 반복 횟수")
+    ap.add_argument("--out", default=os.path.join(ROOT, "perf", "bench_results.json"))
+    ap.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    ap.add_argument("--tolerance", type=float, default=0.20, help="허용 증가율(0.2 = 20%%)")
+    ap.add_argument("--one", help=argparse.SUPPRESS)  # 내부용: 자식 프로세스에서 준비된 작업 폴더 하나만 측정
+    args = ap.parse_args(argv)
+
+    if args.one is not None:
+        print(RESULT_PREFIX + json.dumps(bench_size(args.one, args.repeat)))
+        return 0
+
+    results = []
+    for n in (int(x) for x in args.sizes.split(",") if x.strip()):
+        print(f"▶ {n:,} rows …", flush=True)
+        r = bench_size_isolated(n, min(args.nicknames, max(n, 1)), args.repeat)
+        results.append(r)
+        print("  " + "  ".join(f"{m}={r[m]['p50_ms']:.0f}ms" for m in LATENCY_METRICS) + f"  peak={r['peak_mem_mb']}MB")
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("⚠️ 회귀 감지:")
+            print("\n".join(regressions))
+            return 1
+        print("기준선 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
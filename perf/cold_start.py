@@ -0,0 +1,156 @@
+"""
+콜드 스타트 예산 (새 워커 프로세스의 첫 화면까지)
+
+새 파이썬 프로세스에서 main.py 첫 실행(AppTest.run)을 재고, 그 사이에 import된 모듈을
+-X importtime으로 모아 오래 걸린 순서로 보여줌.
+
+    python perf/cold_start.py                        # 5회, 예산(기본 1500ms) 넘으면 종료 코드 1
+    python perf/cold_start.py --repeat 3 --budget-ms 1500 --top 15
+    python perf/cold_start.py --out perf/cold_start.json
+
+측정 항목(프로세스마다):
+- first_run_ms : main.py 첫 실행(모듈 import + 벤치마크 로드 + 탭1 렌더)
+- lazy         : 첫 화면에서 로드되지 않아야 하는 모듈(LAZY_MODULES)이 실제로 안 올라왔는지
+- imports      : 첫 실행 동안 import된 최상위 모듈별 누적 시간(ms)
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "main.py")
+# 작업 폴더로 복사할 벤치마크 CSV(bench_data.REQUIRED_BENCH_FILES + GRADE_FILE).
+# 앱 모듈을 import하면 pandas/numpy가 MARK 전에 올라와 측정에서 빠지므로 여기 따로 적어 둠
+BENCH_FILES = ["online viewing.csv", "daily_usage.csv", "youth_digital_wellbeing_apps_cleaned.csv"]
+DEFAULT_BUDGET_MS = 1500   # pandas/altair import 포함(프로세스 첫 import부터 잼)
+LAZY_MODULES = ["matplotlib", "cohort"]   # 리포트 차트/부하 테스트에서만 필요
+RESULT_PREFIX = "@@result "
+MARK = "@@first_run"
+
+
+# =====================================================
+# 자식 프로세스: 첫 실행 1회
+# =====================================================
+def run_once() -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    work = tempfile.mkdtemp(prefix="digi_cold_")
+    for f in BENCH_FILES:
+        if os.path.exists(os.path.join(ROOT, f)):
+            shutil.copy(os.path.join(ROOT, f), work)
+    cwd = os.getcwd()
+    os.chdir(work)
+    try:
+        at = AppTest.from_file(APP, default_timeout=120)
+        sys.stderr.write(MARK + "\n")
+        sys.stderr.flush()
+        t0 = time.perf_counter()
+        at.run()
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+    return {
+        "first_run_ms": round(elapsed, 1),
+        "lazy": {m: m not in sys.modules for m in LAZY_MODULES},
+    }
+
+
+# =====================================================
+# 부모 프로세스: importtime 파싱 / 요약
+# =====================================================
+def parse_importtime(stderr: str) -> dict:
+    """MARK 뒤(첫 실행 중)에 import된 최상위 모듈 → 누적 시간(ms)"""
+    out = {}
+    lines = stderr.splitlines()
+    start = lines.index(MARK) + 1 if MARK in lines else 0
+    for ln in lines[start:]:
+        if not ln.startswith("import time:") or "|" not in ln:
+            continue
+        _, cumulative, name = ln[len("import time:"):].split("|", 2)
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue  # 하위 모듈은 부모 누적 시간에 포함됨
+        top = name.strip()
+        out[top] = out.get(top, 0.0) + int(cumulative) / 1000.0
+    return out
+
+def measure_isolated() -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--one"],
+        capture_output=True, text=True,
+    )
+    lines = [ln for ln in proc.stdout.splitlines() if ln.startswith(RESULT_PREFIX)]
+    if proc.returncode != 0 or not lines:
+        tail = "\n".join(ln for ln in proc.stderr.splitlines() if not ln.startswith("import time:"))
+        raise RuntimeError(f"측정 실패:\n{tail[-2000:]}")
+    result = json.loads(lines[-1][len(RESULT_PREFIX):])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5, help="새 프로세스 측정 횟수")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="첫 실행 p50 예산(ms)")
+    ap.add_argument("--top", type=int, default=10, help="import 리포트에 보여줄 모듈 수")
+    ap.add_argument("--out", help="결과 JSON 저장 경로")
+    ap.add_argument("--one", action="store_true", help=argparse.SUPPRESS)  # 내부용: 자식 프로세스
+    args = ap.parse_args(argv)
+
+    if args.one:
+        print(RESULT_PREFIX + json.dumps(run_once()))
+        return 0
+
+    runs = []
+    for i in range(args.repeat):
+        r = measure_isolated()
+        runs.append(r)
+        print(f"▶ {i + 1}/{args.repeat}  first_run={r['first_run_ms']:.0f}ms", flush=True)
+
+    first = sorted(r["first_run_ms"] for r in runs)
+    imports = {}
+    for r in runs:
+        for name, ms in r["imports"].items():
+            imports.setdefault(name, []).append(ms)
+    import_p50 = {name: round(statistics.median(v), 1) for name, v in imports.items()}
+    lazy_ok = {m: all(r["lazy"][m] for r in runs) for m in LAZY_MODULES}
+    p50 = statistics.median(first)
+
+    print(f"\n첫 실행 p50 {p50:.0f}ms · max {first[-1]:.0f}ms · 예산 {args.budget_ms:.0f}ms")
+    print(f"첫 실행 중 import 합계(p50): {sum(import_p50.values()):.0f}ms")
+    for name, ms in sorted(import_p50.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {name:<32} {ms:8.1f} ms")
+    print("지연 로드: " + "  ".join(f"{m} {'OK' if ok else '로드됨'}" for m, ok in lazy_ok.items()))
+
+    if args.out:
+        report = {
+            "meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+                     "repeat": args.repeat, "budget_ms": args.budget_ms},
+            "first_run_ms": {"p50": round(p50, 1), "max": first[-1], "runs": first},
+            "imports_ms_p50": import_p50,
+            "lazy": lazy_ok,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.out}")
+
+    failed = []
+    if p50 > args.budget_ms:
+        failed.append(f"첫 실행 p50 {p50:.0f}ms > 예산 {args.budget_ms:.0f}ms")
+    failed += [f"{m}이(가) 첫 화면에서 로드됨" for m, ok in lazy_ok.items() if not ok]
+    if failed:
+        print("⚠️ 예산 초과:\n" + "\n".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
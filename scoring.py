@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+
+# =====================================================
+# 점수/레벨 로직(학습/제작 덜 페널티) — Streamlit 없이 import 가능
+# - 단건(dict) 함수: 화면에서 오늘 기록 1개 계산
+# - 배치 함수: 지난 기록 수천~수백만 행을 한 번에 다시 계산
+#   (배치 결과는 단건 함수와 비트 단위로 같아야 함)
+# =====================================================
+CATEGORY_KEYS = [
+    "gaming", "youtube", "social", "study_video", "creation",
+    "decorate", "chat", "music", "web",
+]
+
+SCORE_WEIGHTS = {
+    "gaming": 1.20,
+    "youtube": 1.05,
+    "social": 1.10,
+    "study_video": 0.40,   # 학습은 덜 페널티
+    "creation": 0.55,      # 제작도 덜 페널티
+    "decorate": 0.90,
+    "chat": 0.75,
+    "music": 0.35,
+    "web": 0.80,
+}
+SCORE_DIVISOR = 6.2
+LEVEL_CUTOFFS = (35, 65)   # score < 35 → LOW, < 65 → MEDIUM, 나머지 HIGH
+LEVELS = ["LOW", "MEDIUM", "HIGH"]
+
+VIDEO_BUCKET_EDGES = [10, 30, 60, 120, 360]
+VIDEO_BUCKETS = [
+    "10분 미만",
+    "10분 이상~30분 미만",
+    "30분 이상~1시간 미만",
+    "1시간 이상~2시간 미만",
+    "2시간 이상~6시간 미만",
+    "6시간 이상",
+]
+
+
+# =====================================================
+# 단건 계산
+# =====================================================
+def minutes_sum(values: dict) -> int:
+    return int(sum(max(0, int(v)) for v in values.values()))
+
+def weighted_score(values: dict) -> int:
+    total = 0.0
+    for k, v in values.items():
+        total += float(v) * SCORE_WEIGHTS.get(k, 1.0)
+    score = int(np.clip(total / SCORE_DIVISOR, 0, 100))
+    return score
+
+def level_from_score(score: int) -> str:
+    if score < LEVEL_CUTOFFS[0]: return "LOW"
+    if score < LEVEL_CUTOFFS[1]: return "MEDIUM"
+    return "HIGH"
+
+def study_ratio(values: dict) -> float:
+    total = minutes_sum(values)
+    if total <= 0:
+        return 0.0
+    return float(values.get("study_video", 0) / total * 100.0)
+
+def video_bucket(video_min: int) -> str:
+    for edge, name in zip(VIDEO_BUCKET_EDGES, VIDEO_BUCKETS):
+        if video_min < edge:
+            return name
+    return VIDEO_BUCKETS[-1]
+
+
+# =====================================================
+# 배치 계산 (행 단위 파이썬 루프 없음)
+# =====================================================
+def minutes_matrix(data) -> np.ndarray:
+    """
+    DataFrame(카테고리 컬럼) 또는 (n, 9) 배열 → CATEGORY_KEYS 순서의 float 행렬
+    - 없는 컬럼/빈 값은 0분으로 봄
+    """
+    if isinstance(data, pd.DataFrame):
+        m = data.reindex(columns=CATEGORY_KEYS).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    else:
+        m = np.asarray(data, dtype=float)
+        if m.ndim != 2 or m.shape[1] != len(CATEGORY_KEYS):
+            raise ValueError(f"분 행렬은 (n, {len(CATEGORY_KEYS)}) 모양이어야 해요: {m.shape}")
+    return np.nan_to_num(m, nan=0.0)
+
+def score_batch(data) -> pd.DataFrame:
+    """
+    여러 날 기록을 한 번에 계산 → total_min / score / level / study_ratio / video_bucket
+    - 가중합은 단건 함수와 같은 순서(카테고리 순)로 열 단위 누적 → 반올림 차이 없음
+    """
+    m = minutes_matrix(data)
+    n = m.shape[0]
+
+    total_min = np.maximum(np.trunc(m), 0).sum(axis=1).astype(np.int64)
+
+    acc = np.zeros(n)
+    for j, k in enumerate(CATEGORY_KEYS):
+        acc = acc + m[:, j] * SCORE_WEIGHTS[k]
+    score = np.clip(acc / SCORE_DIVISOR, 0, 100).astype(np.int64)
+
+    level = np.array(LEVELS, dtype=object)[np.searchsorted(LEVEL_CUTOFFS, score, side="right")]
+
+    study = m[:, CATEGORY_KEYS.index("study_video")]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(total_min > 0, study / total_min * 100.0, 0.0)
+
+    video_min = np.trunc(m[:, CATEGORY_KEYS.index("youtube")])
+    bucket = np.array(VIDEO_BUCKETS, dtype=object)[np.searchsorted(VIDEO_BUCKET_EDGES, video_min, side="right")]
+
+    index = data.index if isinstance(data, pd.DataFrame) else None
+    return pd.DataFrame(
+        {"total_min": total_min, "score": score, "level": level, "study_ratio": ratio, "video_bucket": bucket},
+        index=index,
+    )
+
+def rescore_log(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    저장된 기록을 현재 가중치/기준으로 다시 계산한 사본
+    - 카테고리 값이 하나도 없는 예전 행은 저장된 값을 그대로 둠
+    - study_ratio는 저장 형식과 같게 소수 둘째 자리로 반올림
+    """
+    out = df.copy()
+    present = [k for k in CATEGORY_KEYS if k in out.columns]
+    if out.empty or not present:
+        return out
+    has = out[present].notna().any(axis=1)
+    if not has.any():
+        return out
+    scored = score_batch(out.loc[has])
+    scored["study_ratio"] = scored["study_ratio"].round(2)
+    for c in scored.columns:
+        if c in out.columns:
+            out[c] = scored[c].reindex(out.index).where(has, out[c])
+        else:
+            out[c] = scored[c]
+    return out
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from log_import import prepare_import  # noqa: E402
+from log_store import LogStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    """빈 임시 기록 DB"""
+    return LogStore(str(tmp_path / "log.db"), legacy_csv=None)
+
+@pytest.fixture
+def bench_dir(monkeypatch):
+    """벤치마크 CSV가 있는 저장소 루트에서 실행(없으면 건너뜀)"""
+    from bench_data import REQUIRED_BENCH_FILES
+
+    if not all(os.path.exists(os.path.join(ROOT, f)) for f in REQUIRED_BENCH_FILES):
+        pytest.skip("벤치마크 CSV 없음")
+    monkeypatch.chdir(ROOT)
+    return ROOT
+
+
+def make_rows(nickname: str, dates: list[str], gaming: int = 60, study_video: int = 30) -> pd.DataFrame:
+    """가져오기 형식(prepare_import 결과) 기록 — 날짜마다 1행"""
+    raw = pd.DataFrame({"date": dates, "nickname": nickname, "gaming": gaming, "study_video": study_video,
+                        "youtube": 20})
+    rows, _ = prepare_import(raw)
+    return rows
@@ -0,0 +1,94 @@
+import gzip
+import os
+
+import pytest
+
+from cli import main
+from conftest import make_rows
+from log_store import LogStore, read_parquet_log
+
+
+@pytest.fixture
+def filled(store):
+    store.import_rows(make_rows("민지", ["2026-03-02", "2026-03-03"]))
+    store.import_rows(make_rows("준호", ["2026-03-02"], gaming=120))
+    return store
+
+
+def test_export_parquet_roundtrip(filled, tmp_path):
+    out = tmp_path / "backup.parquet"
+    assert main(["export", str(out), "--db", filled.path]) == 0
+
+    back = read_parquet_log(str(out))
+    before = filled.fetch()
+    assert len(back) == len(before) == 3
+    assert back["nickname"].tolist() == before["nickname"].tolist()
+    assert back["score"].tolist() == before["score"].tolist()
+
+    # 되살리기: .parquet를 그대로 import
+    restored = tmp_path / "restored.db"
+    assert main(["import", str(out), "--db", str(restored), "--no-bench"]) == 0
+    again = LogStore(str(restored), legacy_csv=None).fetch()
+    assert again[["date", "nickname", "gaming", "score"]].equals(before[["date", "nickname", "gaming", "score"]])
+
+def test_export_parquet_columns_and_nickname(filled, tmp_path):
+    out = tmp_path / "me.parquet"
+    assert main(["export", str(out), "--db", filled.path, "--nickname", "준호",
+                 "--columns", "date,nickname,gaming"]) == 0
+    back = read_parquet_log(str(out))
+    assert list(back.columns) == ["date", "nickname", "gaming"]
+    assert back["nickname"].tolist() == ["준호"]
+    assert back["gaming"].tolist() == [120]
+
+def test_export_unknown_column_fails(filled, tmp_path):
+    assert main(["export", str(tmp_path / "x.parquet"), "--db", filled.path, "--columns", "nope"]) == 1
+
+def test_export_csv_gz(filled, tmp_path):
+    out = tmp_path / "all.csv.gz"
+    assert main(["export", str(out), "--db", filled.path]) == 0
+    lines = gzip.decompress(out.read_bytes()).decode("utf-8-sig").splitlines()
+    assert lines[0].startswith("date,")
+    assert len(lines) == 4
+
+def test_score_header_only_input(tmp_path):
+    src = tmp_path / "empty.csv"
+    src.write_text("date,nickname,gaming,youtube\n", encoding="utf-8")
+    out = tmp_path / "scored.csv"
+    assert main(["score", str(src), str(out), "--no-bench"]) == 0
+    lines = out.read_text(encoding="utf-8-sig").splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith("date,nickname,gaming,youtube,")
+
+def test_score_chunks_single_header(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text("nickname,gaming,youtube\n" + "".join(f"u{i},{i},{i * 2}\n" for i in range(7)), encoding="utf-8")
+    out = tmp_path / "scored.csv"
+    assert main(["score", str(src), str(out), "--no-bench", "--chunksize", "3"]) == 0
+    lines = out.read_text(encoding="utf-8-sig").splitlines()
+    assert len(lines) == 8
+    assert sum(ln.startswith("nickname,") for ln in lines) == 1
+
+def test_export_weekly(filled, tmp_path):
+    assert main(["compact", "--db", filled.path, "--keep-days", "30"]) == 0
+    out = tmp_path / "weekly.csv"
+    assert main(["export", str(out), "--db", filled.path, "--weekly"]) == 0
+    lines = out.read_text(encoding="utf-8-sig").splitlines()
+    assert lines[0].startswith("nickname,week,days,total_min,score,")
+    assert len(lines) == 3   # 민지·준호 각 1주
+
+def test_compact_then_restore(filled, tmp_path):
+    before = filled.fetch()
+    assert main(["compact", "--db", filled.path, "--keep-days", "30", "--backup-keep", "1"]) == 0
+    assert filled.count() == 0
+    backups = os.listdir(filled.archive_dir())
+    assert len(backups) == 1
+
+    assert main(["restore", os.path.join(filled.archive_dir(), backups[0]), "--db", filled.path]) == 0
+    after = filled.fetch()
+    assert after["score"].tolist() == before["score"].tolist()
+    assert filled.user_weekly().empty
+
+def test_restore_plain_export_fails(filled, tmp_path):
+    out = tmp_path / "backup.parquet"
+    assert main(["export", str(out), "--db", filled.path]) == 0
+    assert main(["restore", str(out), "--db", filled.path]) == 1
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from bench_data import GENDER_SEGMENTS, TOTAL_SEGMENT, load_benchmarks, segment_index
+from cohort import DAY_MAX_MIN, calibrate, sample_cohort
+from scoring import CATEGORY_KEYS, VIDEO_BUCKETS
+
+N = 100_000
+BUCKET_TOL = 1.0   # 구간 비중 허용 오차(%p)
+STUDY_TOL = 1.5    # 학습 비율 평균 허용 오차(%p)
+
+
+@pytest.fixture
+def segments(bench_dir):
+    return segment_index(load_benchmarks())
+
+
+@pytest.mark.parametrize("key", [TOTAL_SEGMENT, ("학령별", "중학생", "소계"), GENDER_SEGMENTS["여"]])
+def test_bucket_shares_match_benchmark(segments, key):
+    if key not in segments:
+        pytest.skip(f"세그먼트 없음: {key}")
+    peer = segments[key]
+    report = calibrate(sample_cohort(N, segments, seed=3, segment=key), peer)
+
+    bench = np.array([float(peer["view_dist"].get(b, 0.0)) for b in VIDEO_BUCKETS])
+    bench = bench / bench.sum() * 100.0
+    sample = np.array([report["video_bucket_share"][b] for b in VIDEO_BUCKETS])
+    assert np.abs(sample - bench).max() < BUCKET_TOL, dict(zip(VIDEO_BUCKETS, sample - bench))
+    assert abs(report["study_ratio_mean"] - peer["study_mean"]) < STUDY_TOL
+
+def test_day_total_capped(segments):
+    cohort = sample_cohort(N, segments, seed=5)
+    total = cohort[CATEGORY_KEYS].sum(axis=1)
+    assert total.max() <= DAY_MAX_MIN
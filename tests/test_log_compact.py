@@ -0,0 +1,21 @@
+import pytest
+
+from log_compact import KEEP_DAYS_ENV, Compactor, keep_days_from_env
+
+
+@pytest.mark.parametrize("raw, expected", [(None, None), ("", None), ("0", None), ("off", None), ("365", 365)])
+def test_keep_days_from_env(monkeypatch, raw, expected):
+    if raw is None:
+        monkeypatch.delenv(KEEP_DAYS_ENV, raising=False)
+    else:
+        monkeypatch.setenv(KEEP_DAYS_ENV, raw)
+    assert keep_days_from_env() == expected
+
+def test_keep_days_from_env_rejects_garbage(monkeypatch):
+    monkeypatch.setenv(KEEP_DAYS_ENV, "half a year")
+    with pytest.raises(ValueError):
+        keep_days_from_env()
+
+def test_compactor_rejects_short_keep_days(store):
+    with pytest.raises(ValueError):
+        Compactor(store, keep_days=7)
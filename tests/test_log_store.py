@@ -0,0 +1,243 @@
+import os
+import sqlite3
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_rows
+from log_import import MOODS, SLEEP_LEVELS, prepare_import
+from log_store import LogStore, read_parquet_log
+
+TODAY = "2026-10-17"
+KEEP_DAYS = 180
+WEEK = ["2026-01-05", "2026-01-06", "2026-01-07"]   # 월~수 → 보관 대상 주 2026-01-05
+RECENT = ["2026-10-12", "2026-10-13"]
+
+
+def _weekly(store, nickname="민지"):
+    return store.user_weekly(nickname).set_index("week")
+
+def _mixed_workload(store, seed: int, steps: int = 240, late_share: float = 0.1,
+                    start: date = date(2026, 9, 1)) -> list[str]:
+    """
+    append_many 배치로 새 날 기록 / 같은 날 다시 저장 / (late_share 비율로) 지난 날짜 늦은 저장을 섞어 넣음
+    + 퀘스트 기록. 배치 안에 같은 날 기록이 여러 개 들어가기도 함. 닉네임 목록을 돌려줌
+    """
+    rng = np.random.default_rng(seed)
+    nicks = ["민지", "서준", "하윤", "도윤"]
+    last = {}
+    ops = []
+    for step in range(steps):
+        nick = str(rng.choice(nicks))
+        op = rng.random()
+        if nick not in last or op < 0.55:
+            day = last.get(nick, start - timedelta(days=1)) + timedelta(days=int(rng.integers(1, 3)))
+            last[nick] = day
+        elif op < 1.0 - late_share:
+            day = last[nick]                                            # 같은 날 다시 저장
+        else:
+            day = last[nick] - timedelta(days=int(rng.integers(1, 4)))  # 지난 날짜 늦은 저장
+        quest = (last[nick].isoformat(), int(rng.integers(0, 4))) if rng.random() < 0.1 else None
+        ops.append((nick, day.isoformat(), quest, rng.random() < 0.4))
+
+    # 점수 계산은 한 번에(행마다 다른 임시 닉네임 → prepare_import가 같은 날 기록을 합치지 않음)
+    raw = pd.DataFrame({
+        "date": [day for _, day, _, _ in ops], "nickname": [f"n{i}" for i in range(steps)],
+        "time": [f"{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}" for i in range(steps)],
+        "gaming": rng.integers(0, 400, steps), "study_video": rng.integers(0, 200, steps), "youtube": 20,
+        "age": rng.integers(10, 13, steps), "mood": rng.choice(MOODS, steps), "sleep": rng.choice(SLEEP_LEVELS, steps),
+    })
+    rows = prepare_import(raw)[0].set_index("nickname").loc[raw["nickname"]].reset_index().to_dict("records")
+
+    batch = []
+    for row, (nick, _, quest, flush) in zip(rows, ops):
+        batch.append({**row, "nickname": nick})
+        if flush:
+            store.append_many(batch)
+            batch = []
+        if quest:
+            store.record_quests(nick, quest[0], quest[1], 3)
+    store.append_many(batch)
+    return nicks
+
+
+def test_compact_twice_is_noop(store):
+    store.import_rows(make_rows("민지", WEEK + RECENT, gaming=60))
+    first = store.compact(TODAY, keep_days=KEEP_DAYS)
+    assert first["archived_days"] == 3
+    before = _weekly(store)
+
+    again = store.compact(TODAY, keep_days=KEEP_DAYS)
+    assert again["archived_days"] == again["archived_rows"] == 0
+    assert _weekly(store).equals(before)
+    assert before.loc["2026-01-05", "days"] == 3
+    assert len(store.user_daily("민지")) == len(RECENT)
+
+def test_reimport_into_archived_week(store):
+    store.import_rows(make_rows("민지", WEEK, gaming=60))
+    store.compact(TODAY, keep_days=KEEP_DAYS)
+    assert _weekly(store).loc["2026-01-05", "gaming"] == 60
+
+    # 보관된 날짜 하나를 새 값으로 다시 가져오기 → 보관 값은 빠지고 하루 기록으로 돌아옴
+    result = store.import_rows(make_rows("민지", ["2026-01-06"], gaming=150))
+    assert result["replaced"] == 1
+    week = _weekly(store).loc["2026-01-05"]
+    assert week["days"] == 2 and week["gaming"] == 60
+    assert store.user_daily("민지")["gaming"].tolist() == [150]
+
+    # 다시 정리하면 그 날은 새 값으로 한 번만 들어감
+    store.compact(TODAY, keep_days=KEEP_DAYS)
+    week = _weekly(store).loc["2026-01-05"]
+    assert week["days"] == 3
+    assert week["gaming"] * week["days"] == 60 + 150 + 60
+    assert store.user_daily("민지").empty
+
+def test_reimport_same_file_twice(store):
+    rows = make_rows("민지", WEEK, gaming=60)
+    store.import_rows(rows)
+    store.compact(TODAY, keep_days=KEEP_DAYS)
+    before = _weekly(store)
+    store.import_rows(rows)
+    store.compact(TODAY, keep_days=KEEP_DAYS)
+    assert _weekly(store).equals(before)
+
+def test_keep_existing_skips_archived_dates(store):
+    store.import_rows(make_rows("민지", WEEK, gaming=60))
+    store.compact(TODAY, keep_days=KEEP_DAYS)
+    result = store.import_rows(make_rows("민지", ["2026-01-06", "2026-01-08"], gaming=150), replace=False)
+    assert result == {"inserted": 1, "replaced": 0, "skipped": 1}
+    store.compact(TODAY, keep_days=KEEP_DAYS)
+    week = _weekly(store).loc["2026-01-05"]
+    assert week["days"] == 4
+    assert week["gaming"] * week["days"] == 60 * 3 + 150
+
+def test_late_row_for_archived_date_replaces(store):
+    store.import_rows(make_rows("민지", WEEK, gaming=60))
+    store.compact(TODAY, keep_days=KEEP_DAYS)
+    late = make_rows("민지", ["2026-01-05"], gaming=0).iloc[0].to_dict()
+    assert store.append({k: (None if v != v else v) for k, v in late.items()})
+    store.compact(TODAY, keep_days=KEEP_DAYS)
+    week = _weekly(store).loc["2026-01-05"]
+    assert week["days"] == 3
+    assert week["gaming"] * week["days"] == 120
+
+def test_summaries_include_archived_only_users(store):
+    store.import_rows(make_rows("민지", WEEK, gaming=60))
+    store.import_rows(make_rows("준호", WEEK[:1] + RECENT, gaming=30))
+    before = store.user_summaries().set_index("nickname")
+    store.compact(TODAY, keep_days=KEEP_DAYS)
+
+    summ = store.user_summaries().set_index("nickname")
+    assert summ.index.tolist() == ["민지", "준호"]
+    assert summ.loc["민지", "entries"] == 0
+    assert summ.loc["민지", "days"] == 3 and summ.loc["민지", "archived_days"] == 3
+    assert summ.loc["준호", "days"] == 3 and summ.loc["준호", "archived_days"] == 1
+    assert summ.loc["준호", "last_date"] == RECENT[-1]
+    for nick in ("민지", "준호"):
+        assert summ.loc[nick, "avg_total_min"] == pytest.approx(before.loc[nick, "avg_total_min"])
+        assert summ.loc[nick, "avg_score"] == pytest.approx(before.loc[nick, "avg_score"])
+
+def test_compact_backs_up_deleted_rows(store, tmp_path):
+    store.import_rows(make_rows("민지", WEEK + RECENT, gaming=60))
+    store.append({"nickname": "민지", "date": RECENT[0], "time": "09:00:00", "gaming": 5})  # 같은 날 두 번째 기록
+    store.append({"nickname": "민지", "date": RECENT[0], "time": "21:00:00", "gaming": 90})
+    result = store.compact(TODAY, keep_days=KEEP_DAYS)
+    assert result["deduped"] == 2 and result["archived_rows"] == 3
+
+    backup = read_parquet_log(result["backup"])
+    assert os.path.dirname(result["backup"]) == store.archive_dir()
+    assert len(backup) == 5
+    assert sorted(backup["date"].dt.strftime("%Y-%m-%d")) == sorted(WEEK + [RECENT[0]] * 2)
+
+    # 되살리기: 원래 DB로 restore하면 지운 행이 모두 돌아오고 보관됐던 날은 보관 요약에서 빠짐
+    assert store.restore(result["backup"]) == {"restored": 5, "skipped": 0, "unarchived": 3}
+    assert store.count() == 7   # compact 전과 같음
+    assert sorted(store.user_daily("민지")["date"].dt.strftime("%Y-%m-%d")) == sorted(WEEK + RECENT)
+    assert _day(store, "민지", RECENT[0])["gaming"] == 90   # 그날 마지막 기록은 그대로
+    assert store.user_weekly("민지").empty
+
+def test_compact_without_backup(store):
+    store.import_rows(make_rows("민지", WEEK, gaming=60))
+    result = store.compact(TODAY, keep_days=KEEP_DAYS, backup=False)
+    assert result["archived_rows"] == 3 and result["backup"] is None
+    assert not os.path.exists(store.archive_dir())
+
+def _cohort_table(store) -> pd.DataFrame:
+    con = sqlite3.connect(store.path)
+    try:
+        df = pd.read_sql_query("SELECT * FROM cohort_agg ORDER BY age, gender, daytype, level, mood, sleep", con)
+    finally:
+        con.close()
+    # 증분 갱신은 다 빠진 조합을 n = 0 행으로 남김 → 값이 모두 0인지 확인하고 비교에서는 뺌
+    empty = df[df["n"] == 0]
+    assert (empty.drop(columns=["age", "gender", "daytype", "level", "mood", "sleep"]) == 0).all().all()
+    return df[df["n"] != 0].reset_index(drop=True)
+
+def test_incremental_cohort_agg_matches_rebuild(store):
+    _mixed_workload(store, seed=11)
+    incremental = _cohort_table(store)
+    store.rebuild_rollups()
+    pd.testing.assert_frame_equal(incremental, _cohort_table(store), check_dtype=False)
+
+def _trend_states(store) -> dict:
+    con = sqlite3.connect(store.path)
+    try:
+        return dict(con.execute("SELECT nickname, state FROM trend_state").fetchall())
+    finally:
+        con.close()
+
+def test_incremental_trend_state_matches_build_state(store):
+    # 상태를 먼저 만들어 둔 뒤(user_trend) 그 뒤 날짜로 섞인 저장 → 저장할 때마다 증분 갱신
+    nicks = _mixed_workload(store, seed=5, steps=20, late_share=0.0)
+    for nick in nicks:
+        store.user_trend(nick)
+    _mixed_workload(store, seed=6, late_share=0.0, start=date(2026, 11, 1))
+    assert set(_trend_states(store)) == set(nicks)   # 순서가 어긋나 지워진 상태 없음 → 모두 증분 결과
+    incremental = {nick: store.user_trend(nick) for nick in nicks}
+
+    store.rebuild_rollups()                          # trend_state를 비움 → 다음 조회는 build_state로 새로 만듦
+    assert _trend_states(store) == {}
+    assert {nick: store.user_trend(nick) for nick in nicks} == incremental
+
+def _day(store, nickname, day):
+    daily = store.user_daily(nickname)
+    return daily[daily["date"] == day].iloc[0]
+
+def test_restore_same_day_duplicate_keeps_latest(store):
+    store.append({"nickname": "민지", "date": "2026-10-10", "time": "09:00:00", "gaming": 5})
+    store.append({"nickname": "민지", "date": "2026-10-10", "time": "21:00:00", "gaming": 90})
+    result = store.compact(TODAY)
+    assert result["deduped"] == 1 and store.count() == 1
+
+    # 백업에는 지운 09:00 기록만 있음 → 그대로 되돌려도 그날 마지막 기록(21:00)은 바뀌지 않음
+    assert store.restore(result["backup"]) == {"restored": 1, "skipped": 0, "unarchived": 0}
+    assert store.count() == 2
+    assert sorted(store.fetch(nickname="민지")["time"]) == ["09:00:00", "21:00:00"]
+    day = _day(store, "민지", "2026-10-10")
+    assert (day["time"], day["gaming"]) == ("21:00:00", 90)
+
+    # 같은 파일을 다시 되돌려도 그대로
+    assert store.restore(result["backup"]) == {"restored": 0, "skipped": 1, "unarchived": 0}
+    assert store.count() == 2
+
+def test_restore_rejects_plain_export(store, tmp_path):
+    store.import_rows(make_rows("민지", RECENT))
+    path = str(tmp_path / "export.parquet")
+    store.export_parquet(path)
+    with pytest.raises(ValueError):
+        store.restore(path)
+
+def test_compact_prunes_old_backups(store):
+    folder = store.archive_dir()
+    os.makedirs(folder)
+    for i in range(4):
+        open(os.path.join(folder, f"log-2026010{i}-000000-1.parquet"), "wb").close()
+    open(os.path.join(folder, "notes.txt"), "w").close()   # 백업이 아닌 파일은 건드리지 않음
+
+    store.import_rows(make_rows("민지", WEEK))
+    result = store.compact(TODAY, keep_days=KEEP_DAYS, backup_keep=2)
+    assert result["pruned_backups"] == 3
+    assert sorted(os.listdir(folder)) == sorted(["log-20260103-000000-1.parquet",
+                                                 os.path.basename(result["backup"]), "notes.txt"])
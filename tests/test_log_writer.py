@@ -0,0 +1,52 @@
+import sqlite3
+
+import log_writer
+from conftest import make_rows
+from log_writer import LogWriter
+
+
+class FlakyStore:
+    """fail=True인 동안 append_many가 실패하는 LogStore 래퍼"""
+
+    def __init__(self, store):
+        self.store = store
+        self.path = store.path
+        self.fail = True
+
+    def append_many(self, rows):
+        if self.fail:
+            raise sqlite3.OperationalError("database is locked")
+        return self.store.append_many(rows)
+
+
+def _rows(n):
+    df = make_rows("민지", [f"2026-03-{d:02d}" for d in range(1, n + 1)])
+    return [{k: (None if v != v else v) for k, v in r.items()} for r in df.to_dict("records")]
+
+
+def test_full_queue_with_failing_store_keeps_rows(store, monkeypatch):
+    monkeypatch.setattr(log_writer, "RETRY_DELAY", 0.05)
+    flaky = FlakyStore(store)
+    writer = LogWriter(flaky, max_queue=1, flush_interval=0.01)
+    try:
+        rows = _rows(6)
+        submitted = 0
+        for row in rows:
+            assert writer.submit(row)  # 저널에 쓰였으면 DB 저장 실패와 상관없이 True
+            submitted += 1
+            if writer.stats()["sync_writes"]:
+                break
+        stats = writer.stats()
+        assert stats["sync_writes"] == 1
+        assert stats["errors"] >= 1
+        assert stats["pending"] == submitted
+
+        flaky.fail = False
+        assert writer.flush(timeout=5)
+        assert writer.stats()["pending"] == 0
+        assert len(store.fetch()) == submitted
+        with open(writer.journal, encoding="utf-8") as f:
+            assert f.read() == ""
+    finally:
+        flaky.fail = False
+        writer.close()
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scoring import (
+    CATEGORY_KEYS, LEVEL_CUTOFFS, SCORE_DIVISOR, SCORE_WEIGHTS, VIDEO_BUCKET_EDGES,
+    level_from_score, minutes_sum, score_batch, study_ratio, video_bucket, weighted_score,
+)
+
+
+def single(values: dict) -> dict:
+    """화면에서 쓰는 단건 함수로 계산(main.py와 같은 호출 방식)"""
+    score = weighted_score(values)
+    return {
+        "total_min": minutes_sum(values),
+        "score": score,
+        "level": level_from_score(score),
+        "study_ratio": study_ratio(values),
+        "video_bucket": video_bucket(int(values["youtube"])),
+    }
+
+def edge_rows() -> list[dict]:
+    zero = dict.fromkeys(CATEGORY_KEYS, 0)
+    rows = [zero, dict(zero, study_video=-5), dict.fromkeys(CATEGORY_KEYS, -30), dict.fromkeys(CATEGORY_KEYS, 900)]
+    # 시청 구간 경계와 그 바로 아래/위(소수 포함)
+    for edge in VIDEO_BUCKET_EDGES:
+        rows += [dict(zero, youtube=v) for v in (edge - 1, edge - 0.5, edge, edge + 0.5)]
+    # 레벨 경계 점수 근처(가중합이 딱 경계가 되는 분)
+    for cut in LEVEL_CUTOFFS:
+        for k in ("gaming", "web", "study_video"):
+            exact = cut * SCORE_DIVISOR / SCORE_WEIGHTS[k]
+            rows += [dict(zero, **{k: v}) for v in (exact - 0.01, exact, exact + 0.01)]
+    rows.append(dict(zero, study_video=7.5, gaming=-2.25, youtube=-0.5))
+    return rows
+
+def random_rows(n: int, seed: int) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    ints = rng.integers(-60, 721, size=(n, len(CATEGORY_KEYS)))
+    floats = rng.uniform(-60, 720, size=(n, len(CATEGORY_KEYS))).round(2)
+    return [dict(zip(CATEGORY_KEYS, map(float, r))) for r in np.vstack([ints, floats])]
+
+
+@pytest.mark.parametrize("rows", [edge_rows(), random_rows(2000, seed=7)], ids=["edge", "random"])
+def test_score_batch_matches_single(rows):
+    batch = score_batch(pd.DataFrame(rows, columns=CATEGORY_KEYS))
+    expected = pd.DataFrame([single(v) for v in rows])
+    for col in expected.columns:
+        got, want = batch[col].tolist(), expected[col].tolist()
+        bad = [(i, rows[i], g, w) for i, (g, w) in enumerate(zip(got, want)) if g != w]
+        assert not bad, f"{col}: {bad[:3]}"
+
+def test_score_batch_treats_missing_as_zero():
+    values = {"gaming": 120, "study_video": 45}
+    batch = score_batch(pd.DataFrame([{**values, "youtube": None}]))
+    assert batch.iloc[0].to_dict() == single({**dict.fromkeys(CATEGORY_KEYS, 0), **values})
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+# =====================================================
+# rerun 구간별 타이밍 (옵트인)
+# - 켜기: 서버 환경변수 DIGI_PROFILE=1 (URL로는 켤 수 없음 → 디버그 패널이 공개되지 않음)
+# - lap(name): 직전 lap 이후 걸린 시간을 name 구간으로 기록
+#   (main.py 본문을 들여쓰기로 감싸지 않아도 됨)
+# - finish(): 이번 rerun 결과를 프로세스 공용 기록(최근 N개)에 넣고 JSONL로 내보냄
+# - scope: 전체 rerun은 "app", 프래그먼트만 다시 실행된 경우는 프래그먼트 이름
+# - JSONL이 SPANS_MAX_BYTES를 넘으면 .1로 한 번 돌려 놓고 새로 씀(최대 2개 파일)
+# =====================================================
+PROFILE_ENV = "DIGI_PROFILE"
+SPANS_FILE = "digi_spans.jsonl"
+SPANS_MAX_BYTES = 5 * 1024 * 1024
+HISTORY_SIZE = 200
+APP_SCOPE = "app"
+
+_history = deque(maxlen=HISTORY_SIZE)
+_lock = threading.Lock()
+
+
+def env_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0", "false")
+
+
+class RerunTimer:
+    """rerun 1번의 구간 타이밍. 꺼져 있으면 모든 메서드가 아무 일도 안 함"""
+
+    def __init__(self, enabled: bool, export_path: str | None = SPANS_FILE, scope: str = APP_SCOPE):
+        self.enabled = enabled
+        self.scope = scope
+        self.export_path = export_path
+        self.spans = {}
+        self.started = time.time()
+        self._t0 = self._last = time.perf_counter()
+        self._finished = False
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def lap(self, name: str):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.spans[name] = self.spans.get(name, 0.0) + (now - self._last) * 1000.0
+        self._last = now
+
+    def finish(self) -> dict | None:
+        """한 번만 기록됨(중간에 st.stop() 하는 경로에서 먼저 불러도 안전)"""
+        if not self.enabled or self._finished:
+            return None
+        self._finished = True
+        record = {
+            "ts": round(self.started, 3),
+            "scope": self.scope,
+            "total_ms": round((time.perf_counter() - self._t0) * 1000.0, 3),
+            "spans": {k: round(v, 3) for k, v in self.spans.items()},
+        }
+        with _lock:
+            _history.append(record)
+            if self.export_path:
+                try:
+                    _rotate(self.export_path)
+                    with open(self.export_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                except OSError:
+                    pass
+        return record
+
+
+def _rotate(path: str, max_bytes: int = SPANS_MAX_BYTES):
+    """파일이 max_bytes를 넘으면 path.1로 옮김(이전 .1은 덮어씀)"""
+    try:
+        if os.path.getsize(path) < max_bytes:
+            return
+    except OSError:
+        return  # 아직 파일 없음
+    os.replace(path, path + ".1")
+
+def _total_name(record: dict) -> str:
+    scope = record.get("scope", APP_SCOPE)
+    return "total" if scope == APP_SCOPE else f"{scope}.total"
+
+
+def recent() -> list[dict]:
+    with _lock:
+        return list(_history)
+
+
+def span_stats(records: list[dict]) -> pd.DataFrame:
+    """구간별 최근값 / p50 / p95 / 호출 수(ms) — 디버그 패널용 표"""
+    if not records:
+        return pd.DataFrame(columns=["last_ms", "p50_ms", "p95_ms", "n"])
+    totals = list(dict.fromkeys(_total_name(r) for r in records))
+    names = list(dict.fromkeys(k for r in records for k in r["spans"])) + totals
+    rows = {}
+    for name in names:
+        if name in totals:
+            hits = [r["total_ms"] for r in records if _total_name(r) == name]
+        else:
+            hits = [r["spans"][name] for r in records if name in r["spans"]]
+        vals = np.array(hits)
+        last = hits[-1]
+        rows[name] = {
+            "last_ms": round(float(last), 1),
+            "p50_ms": round(float(np.percentile(vals, 50)), 1),
+            "p95_ms": round(float(np.percentile(vals, 95)), 1),
+            "n": int(len(vals)),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
@@ -0,0 +1,109 @@
+from datetime import date as _date
+
+from scoring import CATEGORY_KEYS, level_from_score
+
+
+# =====================================================
+# 닉네임별 추세 상태 (Streamlit 없이 import 가능)
+# - 하루 기록 1개가 들어올 때마다 상태를 O(1)로 갱신(최근 30일 링 + 누적 값)
+#   · 최근 7/30일 평균: 링(최대 TREND_WINDOW일)에 남은 날만 평균 → 기록 일수와 무관하게 상한 고정
+#   · 점수 EWMA: 기록한 날 단위(빈 날은 건너뜀)
+#   · LOW 연속 일수 / 퀘스트 올클리어 연속 일수: 달력상 하루라도 비면 끊김
+# - 같은 날짜를 다시 저장하면 그날 값만 바꿈(“전날까지” 값을 따로 들고 있음)
+# - 상태는 JSON으로 저장 가능한 dict
+# =====================================================
+TREND_WINDOW = 30
+SHORT_WINDOW = 7
+EWMA_ALPHA = 0.3
+RING_FIELDS = ["date", "total_min", "score"] + CATEGORY_KEYS
+
+
+def empty_state() -> dict:
+    return {
+        "days": [],                 # [date, total_min, score, *카테고리] (날짜순, 최근 TREND_WINDOW일)
+        "ewma": None, "ewma_prev": None,
+        "low_streak": 0, "low_streak_prev": 0,
+        "quest_day": None, "quest_streak": 0, "quest_streak_prev": 0,
+    }
+
+def _gap(a: str, b: str) -> int:
+    return (_date.fromisoformat(b) - _date.fromisoformat(a)).days
+
+def _num(v) -> float:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if f != f else f  # NaN → 0
+
+def update_day(state: dict, day: str, row: dict) -> dict | None:
+    """
+    하루 기록 1개 반영. 마지막 날보다 이전 날짜가 오면 None(순서가 어긋남 → 처음부터 다시 계산)
+    """
+    try:
+        _date.fromisoformat(day)
+    except (TypeError, ValueError):
+        return state  # 날짜 형식이 아닌 예전 행은 추세에서 제외
+    days = state["days"]
+    last = days[-1][0] if days else None
+    if last is not None and day < last:
+        return None
+
+    score = _num(row.get("score"))
+    level = row.get("level") or level_from_score(int(score))
+    entry = [day, _num(row.get("total_min")), score] + [_num(row.get(k)) for k in CATEGORY_KEYS]
+
+    if day != last:
+        # 새 날: 어제까지 값을 “전날까지”로 넘김
+        state["ewma_prev"] = state["ewma"]
+        state["low_streak_prev"] = state["low_streak"] if last is not None and _gap(last, day) == 1 else 0
+        days.append(entry)
+        while _gap(days[0][0], day) >= TREND_WINDOW:
+            days.pop(0)
+    else:
+        days[-1] = entry
+
+    prev = state["ewma_prev"]
+    state["ewma"] = score if prev is None else EWMA_ALPHA * score + (1 - EWMA_ALPHA) * prev
+    state["low_streak"] = state["low_streak_prev"] + 1 if level == "LOW" else 0
+    return state
+
+def update_quests(state: dict, day: str, done: int, total: int) -> dict:
+    """그날 퀘스트 완료 수 반영(올클리어한 날이 달력상 이어지면 연속 일수 증가)"""
+    last = state["quest_day"]
+    if last is not None and day < last:
+        return state
+    if day != last:
+        state["quest_streak_prev"] = state["quest_streak"] if last is not None and _gap(last, day) == 1 else 0
+        state["quest_day"] = day
+    state["quest_streak"] = state["quest_streak_prev"] + 1 if total > 0 and done >= total else 0
+    return state
+
+def build_state(daily_rows: list[dict], quest_rows: list[tuple] = ()) -> dict:
+    """지난 기록 전체로 상태를 처음부터 만듦(날짜순 하루 기록 / (date, done, total) 목록)"""
+    state = empty_state()
+    for row in daily_rows:
+        state = update_day(state, row["date"], row)
+    for day, done, total in quest_rows:
+        state = update_quests(state, day, done, total)
+    return state
+
+def rolling_means(state: dict, window: int) -> dict:
+    """마지막 기록일 기준 최근 window일 안에 기록한 날들의 평균(total_min/score/카테고리)"""
+    days = state["days"]
+    if not days:
+        return {}
+    last = days[-1][0]
+    recent = [d for d in days if _gap(d[0], last) < window]
+    out = {f: sum(d[i] for d in recent) / len(recent) for i, f in enumerate(RING_FIELDS) if f != "date"}
+    out["days"] = len(recent)
+    return out
+
+def low_streak(state: dict, today: str) -> int:
+    """오늘 기준 LOW 연속 일수(마지막 기록이 어제/오늘이 아니면 0)"""
+    days = state["days"]
+    return state["low_streak"] if days and _gap(days[-1][0], today) <= 1 else 0
+
+def quest_streak(state: dict, today: str) -> int:
+    last = state["quest_day"]
+    return state["quest_streak"] if last is not None and _gap(last, today) <= 1 else 0